@@ -1,11 +1,14 @@
 import ccxt
 import pandas as pd
 import yaml
-import requests
 import time
 from datetime import datetime
 import threading
 import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from control import ControlServer, Histogram, RestStats  # noqa: E402  (shared with the API bot)
 
 class CryptoMonitor:
     def __init__(self):
@@ -13,11 +16,12 @@ class CryptoMonitor:
         with open('config.yaml', 'r') as file:
             self.config = yaml.safe_load(file)
         
-        # Initialize Gate.io API
-        self.exchange = ccxt.gateio({
+        # Initialize Gate.io API; REST calls are counted for the control endpoint
+        self.rest = RestStats()
+        self.exchange = self.rest.instrument(ccxt.gateio({
             'apiKey': self.config['gateio']['api_key'],
             'secret': self.config['gateio']['api_secret']
-        })
+        }))
         
         # Runtime control
         self.running = True
@@ -25,10 +29,19 @@ class CryptoMonitor:
         self.previous_top_change = set()
         self.previous_top_range = set()
         self.alert_cooldown = {}  # Cooldown tracker for alerts
+        self.paused = threading.Event()
+
+        # Metrics for the control endpoint
+        self.iterations = 0
+        self.iteration_latency = Histogram((1, 5, 10, 30, 60, 120, 300, 600))
+        self.symbols_scanned = 0
+        self.rate_limit_backoffs = 0
+        self.alerts_sent = 0
         
         # Start keyboard input monitoring thread
         self.input_thread = threading.Thread(target=self.check_input, daemon=True)
         self.input_thread.start()
+        self.control = ControlServer.from_config(self, self.config.get('control'))
 
     def check_input(self):
         """Monitor for any keyboard input to stop the program gracefully."""
@@ -36,6 +49,27 @@ class CryptoMonitor:
         self.running = False
         print("\nStopping monitoring gracefully...")
 
+    def pause(self):
+        """Skip iterations until resumed (control endpoint)."""
+        self.paused.set()
+
+    def resume(self):
+        self.paused.clear()
+
+    def stop(self):
+        self.running = False
+
+    def metrics(self):
+        """[(name, type, help, samples)] for control.render; runs on the control thread."""
+        return [
+            ('monitor_iterations_total', 'counter', 'Completed ranking iterations', self.iterations),
+            ('monitor_iteration_seconds', 'histogram', 'Duration of one ranking pass', self.iteration_latency),
+            ('monitor_symbols_scanned', 'gauge', 'Symbols ranked in the last iteration', self.symbols_scanned),
+            ('monitor_rate_limit_backoffs_total', 'counter', 'RateLimitExceeded backoffs', self.rate_limit_backoffs),
+            ('monitor_alerts_total', 'counter', 'Alerts sent', self.alerts_sent),
+            ('monitor_paused', 'gauge', 'Whether iterations are paused', int(self.paused.is_set())),
+        ] + self.rest.metrics('monitor')
+
     def get_price_data(self, symbol, timeframe='1m', limit=60):
         """Fetch OHLCV data for a symbol."""
         try:
@@ -43,6 +77,7 @@ class CryptoMonitor:
             return pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         except ccxt.RateLimitExceeded:
             print("Rate limit hit - implementing backoff")
+            self.rate_limit_backoffs += 1
             time.sleep(60)
             return None
         except Exception as e:
@@ -80,6 +115,7 @@ class CryptoMonitor:
                 'price_range': price_range
             })
 
+        self.symbols_scanned = len(rankings)
         df_rankings = pd.DataFrame(rankings)
         top_change = df_rankings.nlargest(self.config['monitoring']['top_n'], 'price_change')
         top_range = df_rankings.nlargest(self.config['monitoring']['top_n'], 'price_range')
@@ -93,6 +129,7 @@ class CryptoMonitor:
                 return
         
         try:
+            import requests  # only needed once an alert fires
             requests.post(
                 f"https://ntfy.sh/{self.config['notifications']['ntfy_topic']}",
                 data=message.encode('utf-8'),
@@ -103,6 +140,7 @@ class CryptoMonitor:
                 }
             )
             self.alert_cooldown[symbol] = time.time()
+            self.alerts_sent += 1
         except Exception as e:
             print(f"Failed to send alert: {str(e)}")
 
@@ -152,11 +190,15 @@ class CryptoMonitor:
                 if max_iterations > 0 and iteration >= max_iterations:
                     print("Reached maximum iterations. Stopping...")
                     break
+                if self.paused.is_set():
+                    time.sleep(1)
+                    continue
                 
                 print(f"\n{datetime.now().isoformat()} - Iteration {iteration+1}")
                 print(f"{'Infinite mode' if max_iterations == 0 else f'Iteration {iteration+1}/{max_iterations}'}")
                 
                 try:
+                    started = time.perf_counter()
                     top_change, top_range = self.get_rankings()
                     
                     print("\nTop Price Changes:")
@@ -165,6 +207,8 @@ class CryptoMonitor:
                     print(top_range[['symbol', 'price_range']].head(25).to_string(index=False))
                     
                     self.check_alerts(top_change, top_range)
+                    self.iteration_latency.observe(time.perf_counter() - started)
+                    self.iterations += 1
                     
                     if not self.running:
                         break
@@ -189,6 +233,8 @@ class CryptoMonitor:
         except Exception as e:
             print(f"Critical error: {str(e)}")
         finally:
+            if self.control:
+                self.control.stop()
             print("Monitoring stopped")
 
 if __name__ == "__main__":
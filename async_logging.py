@@ -0,0 +1,126 @@
+"""
+Non-blocking logging shared by the UI (testing/) and API (test/) bots.
+
+Loggers on the trading and WebSocket threads only put the LogRecord on a
+queue. One QueueListener thread formats it and does the file and console
+I/O, so a slow disk or terminal never stalls a tick or an order. Records
+are enqueued unformatted: the %-args of a call like
+logger.debug("Open orders: %s", orders) are only rendered on the listener
+thread, and not at all when the level is disabled. The flip side is that
+args must not be mutated after the call.
+
+Settings under `logging` in config.yaml:
+  enabled   false drops every handler
+  file      log file path ("" for none)
+  console   also log to stderr (default true)
+  level     root level
+  format    text (default) or json, one object per line with any extra= fields
+  levels    per-subsystem levels by logger name, e.g. {GateIOWebSocketClient: WARNING}
+  queue_size  records buffered for the listener; beyond that new records are
+            dropped and counted instead of blocking the caller (0 = unbounded)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, thread, msg plus extra= fields."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formats the message on the calling thread; this
+    one leaves that to the listener. Only a traceback is rendered up front,
+    since it would otherwise keep the failing frames alive in the queue.
+    A full queue drops the record (counted in `dropped`) rather than
+    stalling the caller.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def __init__(self, records):
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class _Listener(logging.handlers.QueueListener):
+    def stop(self):
+        # Safe to call again from atexit after an explicit stop
+        if self._thread:
+            super().stop()
+
+    def enqueue_sentinel(self):
+        # Wait for room on a bounded queue instead of failing at shutdown
+        self.queue.put(self._sentinel)
+
+def setup_logging(log_config):
+    """
+    Replace the root handlers with a queue drained by a listener thread.
+    Returns the started QueueListener (stopped and flushed at exit), or
+    None when logging is disabled.
+    """
+    # Neither format prints source locations, so skip the per-record stack
+    # walk that finds them (the logging HOWTO's documented optimization)
+    logging._srcfile = None
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(log_config.get('level', 'INFO'))
+    for name, level in (log_config.get('levels') or {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    if not log_config.get('enabled', True):
+        return None
+    handlers = []
+    path = log_config.get('file', 'trading_bot.log')
+    if path:
+        handlers.append(logging.FileHandler(path))
+    if log_config.get('console', True):
+        handlers.append(logging.StreamHandler())
+    if not handlers:
+        return None
+    formatter = JsonFormatter() if log_config.get('format') == 'json' else logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    size = log_config.get('queue_size', 10000)
+    records = queue.Queue(size) if size else queue.SimpleQueue()
+    listener = _Listener(records, *handlers, respect_handler_level=True)
+    root.addHandler(LazyQueueHandler(records))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,84 @@
+"""
+Compare page load time and browser memory for the full and lean browser
+profiles against a local copy of the trading page.
+
+Save the trading page once (browser "Save Page As... > Web Page, complete")
+and point this script at the .html file:
+
+    python benchmarks/bench_browser_profile.py --page ~/gate_btc_usdt.html --runs 5
+
+Requires psutil for RSS measurement.
+"""
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'testing'))
+
+from browser import setup_browser, inject_lean_css  # noqa: E402
+
+def browser_rss_mb(driver):
+    """Sum RSS of the driver process and every browser process it spawned."""
+    import psutil
+    root = psutil.Process(driver.service.process.pid)
+    procs = [root] + root.children(recursive=True)
+    total = 0
+    for proc in procs:
+        try:
+            total += proc.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total / (1024 * 1024)
+
+def load_once(config, url):
+    driver = setup_browser(config)
+    try:
+        start = time.perf_counter()
+        driver.get(url)
+        driver.execute_script("return document.readyState")
+        wall = time.perf_counter() - start
+        inject_lean_css(driver, config)
+        nav_ms = driver.execute_script(
+            "var t=performance.timing;return t.loadEventEnd-t.navigationStart;"
+        )
+        # Let late scripts settle before sampling memory
+        time.sleep(2)
+        return wall * 1000, nav_ms, browser_rss_mb(driver)
+    finally:
+        driver.quit()
+
+def run_mode(base_config, mode, url, runs):
+    config = copy.deepcopy(base_config)
+    config['browser']['mode'] = mode
+    results = [load_once(config, url) for _ in range(runs)]
+    wall, nav, rss = zip(*results)
+    return {
+        'wall_ms': statistics.median(wall),
+        'load_event_ms': statistics.median(nav),
+        'rss_mb': statistics.median(rss),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page', required=True, help='Local copy of the trading page (.html)')
+    parser.add_argument('--config', default=os.path.join(ROOT, 'testing', 'config.yaml'))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    url = 'file://' + os.path.abspath(os.path.expanduser(args.page))
+
+    print(f"{'mode':<6} {'wall ms':>10} {'load ms':>10} {'RSS MB':>10}")
+    for mode in ('full', 'lean'):
+        r = run_mode(config, mode, url, args.runs)
+        print(f"{mode:<6} {r['wall_ms']:>10.1f} {r['load_event_ms']:>10.1f} {r['rss_mb']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+"""
+Micro-benchmarks for the trading hot paths, run against local stand-ins
+(no network, no exchange account):
+
+- GateIOWebSocketClient.on_message frame parsing
+- the tick callback path (on_message -> TradingCore.update_price) with
+  logging off, synchronous file logging and the async_logging queue
+- _generate_signature request signing
+- calculate_order_amount / _calculate_prices
+- precision.MarketRules price/order quantizing
+- one profiler.SamplingProfiler sample
+- CryptoMonitor.calculate_metrics / get_rankings on a synthetic market set
+- TradingCore._place_ui_order against benchmarks/fixtures/order_form.html
+  (opt-in with --ui; starts a real browser)
+
+Every run is appended to a JSON-lines history file together with the git
+commit, and compared against the previous run from the same machine.
+--check exits non-zero when a benchmark's best time got slower than
+--threshold, or when a benchmark failed.
+
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --filter ws. --check
+    python benchmarks/bench_hot_paths.py --ui --frames frames.gz
+
+A benchmark whose module can't be imported (ccxt, pandas, selenium or
+websocket-client missing) is reported as skipped, not failed.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+DEFAULT_HISTORY = os.path.join(ROOT, 'benchmarks', 'results', 'history.jsonl')
+
+# test/ and testing/ ship modules with the same names
+_SHARED_NAMES = ('gateio_api', 'gateio_websocket', 'trading_bot')
+
+class Skip(Exception):
+    """Raised by a benchmark setup when it can't run in this environment."""
+
+def load_module(directory, name):
+    """
+    Import <ROOT>/<directory>/<name>.py under a unique module name, with
+    that directory first on sys.path for its own sibling imports.
+    """
+    path = os.path.join(ROOT, directory)
+    key = f"bench_{directory}_{name}".replace('/', '_').replace('.', '_')
+    if key in sys.modules:
+        return sys.modules[key]
+    saved = {m: sys.modules.pop(m) for m in _SHARED_NAMES if m in sys.modules}
+    sys.path.insert(0, path)
+    try:
+        spec = importlib.util.spec_from_file_location(key, os.path.join(path, name + '.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        raise Skip(f"{directory}/{name}.py: {e}")
+    finally:
+        sys.path.remove(path)
+        for m in _SHARED_NAMES:
+            sys.modules.pop(m, None)
+        sys.modules.update(saved)
+    sys.modules[key] = module
+    return module
+
+############################################
+# Registry
+############################################
+
+BENCHMARKS = []
+
+def benchmark(name):
+    """
+    Register a setup function. It returns the zero-argument callable to
+    time, or (callable, teardown).
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+def measure(fn, repeats=5, min_time=0.2):
+    """Per-call nanoseconds over `repeats` runs of an auto-sized loop."""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    runs = [t / loops * 1e9 for t in timer.repeat(repeat=repeats, number=loops)]
+    return {'median_ns': statistics.median(runs), 'min_ns': min(runs), 'loops': loops}
+
+############################################
+# Stand-ins
+############################################
+
+def ticker_frame(price, pair='BTC_USDT'):
+    return json.dumps({
+        "time": int(time.time()), "time_ms": int(time.time() * 1000),
+        "channel": "spot.tickers", "event": "update",
+        "result": {
+            "currency_pair": pair, "last": f"{price:.1f}", "lowest_ask": f"{price + 0.1:.1f}",
+            "highest_bid": f"{price:.1f}", "change_percentage": "-0.51", "base_volume": "4516.37",
+            "quote_volume": "270123456.2", "high_24h": "61000.0", "low_24h": "59000.0",
+        },
+    })
+
+class StaticExchange:
+    """ccxt stand-in for the balance lookup in calculate_order_amount."""
+
+    def __init__(self, base='BTC', quote='USDT'):
+        self.balance = {base: {'free': 0.25, 'used': 0.0, 'total': 0.25},
+                        quote: {'free': 1000.0, 'used': 0.0, 'total': 1000.0}}
+
+    def fetch_balance(self):
+        return self.balance
+
+class SyntheticMarkets:
+    """ccxt stand-in serving pre-generated 1m OHLCV for N spot markets."""
+
+    def __init__(self, count=300, candles=60, seed=7):
+        rng = random.Random(seed)
+        self.markets = [{'symbol': f'C{i:04d}/USDT', 'type': 'spot'} for i in range(count)]
+        self.ohlcv = {}
+        for market in self.markets:
+            price, rows = rng.uniform(0.01, 1000), []
+            for minute in range(candles):
+                open_ = price
+                price *= 1 + rng.gauss(0, 0.004)
+                high = max(open_, price) * (1 + abs(rng.gauss(0, 0.002)))
+                low = min(open_, price) * (1 - abs(rng.gauss(0, 0.002)))
+                rows.append([minute * 60000, open_, high, low, price, rng.uniform(1, 1e4)])
+            self.ohlcv[market['symbol']] = rows
+
+    def fetch_markets(self):
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', limit=60):
+        return self.ohlcv[symbol][-limit:]
+
+def _test_config():
+    with open(os.path.join(ROOT, 'test', 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['trading']['currency_pair'] = 'BTC_USDT'
+    return config
+
+############################################
+# Benchmarks
+############################################
+
+_options = argparse.Namespace(frames=None, ui=False, browser_config=None)
+
+def _ws_client():
+    module = load_module('test', 'gateio_websocket')
+    return module.GateIOWebSocketClient('BTC_USDT', lambda price, exchange_ms=None: None, '0' * 32, '0' * 64)
+
+@benchmark('ws.on_message.ticker')
+def bench_ws_ticker():
+    client = _ws_client()
+    if _options.frames:
+        sys.path.insert(0, os.path.join(ROOT, 'test'))
+        from ws_replay import load_frames
+        frames = [message for _, message in load_frames(_options.frames)]
+        if not frames:
+            raise Skip(f"no frames in {_options.frames}")
+    else:
+        frames = [ticker_frame(60000 + i * 0.1) for i in range(1000)]
+    cycle = itertools.cycle(frames).__next__
+    on_message = client.on_message
+    return lambda: on_message(None, cycle())
+
+@benchmark('ws.on_message.ignored')
+def bench_ws_ignored():
+    client = _ws_client()
+    frame = json.dumps({"time": 1, "channel": "spot.tickers", "event": "subscribe",
+                        "result": {"status": "success"}})
+    return lambda: client.on_message(None, frame)
+
+def _signing_client():
+    module = load_module('testing/Error/Test', 'gateio_api.A')
+    config = {'api': {'base_url': 'https://api.gateio.ws/api/v4', 'key': '0' * 32, 'secret': '0' * 64},
+              'trading': {}}
+    return module.GateIOAPIClient(config)
+
+@benchmark('api.generate_signature.get')
+def bench_signature_get():
+    client = _signing_client()
+    return lambda: client._generate_signature('GET', '/spot/open_orders', 'currency_pair=BTC_USDT&page=1')
+
+@benchmark('api.generate_signature.post')
+def bench_signature_post():
+    client = _signing_client()
+    payload = {'currency_pair': 'BTC_USDT', 'side': 'buy', 'type': 'limit', 'amount': '0.001',
+               'price': '60000.0', 'time_in_force': 'gtc'}
+    return lambda: client._generate_signature('POST', '/spot/orders', None, payload)
+
+def _amount_client():
+    module = load_module('test', 'gateio_api')
+    config = _test_config()
+    client = module.GateIOAPIClient.__new__(module.GateIOAPIClient)
+    client.config = config['api']
+    client.trading_config = config['trading']
+    client.symbol = 'BTC/USDT'
+    client.exchange = StaticExchange()
+    client.logger = logging.getLogger("GateIOAPIClient")
+    return client
+
+@benchmark('api.calculate_order_amount.buy')
+def bench_amount_buy():
+    client = _amount_client()
+    return lambda: client.calculate_order_amount('buy', 60120.0)
+
+@benchmark('api.calculate_order_amount.sell')
+def bench_amount_sell():
+    client = _amount_client()
+    return lambda: client.calculate_order_amount('sell', 59880.0)
+
+def _core():
+    module = load_module('test', 'trading_bot')
+    core = module.TradingCore.__new__(module.TradingCore)
+    core.config = _test_config()
+    core.settings = module.BotConfig(core.config)
+    core.logger = logging.getLogger("TradingCore")
+    # What update_price touches
+    core.prices = module.LatestPrice()
+    core.ticks = module.RateMeter()
+    core.paused = threading.Event()
+    core.trailer = None
+    return core
+
+@benchmark('core.calculate_prices.buy')
+def bench_prices_buy():
+    core = _core()
+    return lambda: core._calculate_prices(60000.0, 'buy')
+
+@benchmark('core.calculate_prices.sell')
+def bench_prices_sell():
+    core = _core()
+    return lambda: core._calculate_prices(60000.0, 'sell')
+
+def _callback_path(mode):
+    """
+    on_message -> TradingCore.update_price at DEBUG. mode: off (level
+    WARNING), sync (FileHandler on the calling thread, the old setup) or
+    async (async_logging queue). Logs go to a temp file.
+    """
+    client = _ws_client()
+    core = _core()
+    core.trailer = None
+    client.on_price_callback = core.update_price
+    frames = [ticker_frame(60000 + i * 0.1) for i in range(1000)]
+    cycle = itertools.cycle(frames).__next__
+    on_message = client.on_message
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    log_dir = tempfile.mkdtemp(prefix='gatebot-bench-log-')
+    log_file = os.path.join(log_dir, 'bench.log')
+    listener = None
+    logging.disable(logging.NOTSET)
+    if mode == 'off':
+        root.setLevel(logging.WARNING)
+    elif mode == 'sync':
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root.handlers[:] = [handler]
+        root.setLevel(logging.DEBUG)
+    else:
+        if ROOT not in sys.path:
+            sys.path.append(ROOT)
+        from async_logging import setup_logging
+        listener = setup_logging({'level': 'DEBUG', 'file': log_file, 'console': False})
+
+    def teardown():
+        if listener:
+            listener.stop()
+        for handler in root.handlers:
+            handler.close()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+        logging.disable(logging.ERROR)
+        shutil.rmtree(log_dir, ignore_errors=True)
+    return (lambda: on_message(None, cycle())), teardown
+
+@benchmark('callback.log_off')
+def bench_callback_log_off():
+    return _callback_path('off')
+
+@benchmark('callback.log_sync')
+def bench_callback_log_sync():
+    return _callback_path('sync')
+
+@benchmark('callback.log_async')
+def bench_callback_log_async():
+    return _callback_path('async')
+
+@benchmark('profiler.sample')
+def bench_profiler_sample():
+    """One SamplingProfiler sample with a few idle threads besides this one (no timer armed)."""
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+    from profiler import SamplingProfiler
+    profiler = SamplingProfiler(output=tempfile.mkdtemp(prefix='gatebot-bench-profile-'))
+    stop = threading.Event()
+    threads = [threading.Thread(target=stop.wait, name=name, daemon=True)
+               for name in ('websocket', 'trailing-stop', 'config-watcher')]
+    for thread in threads:
+        thread.start()
+
+    def teardown():
+        stop.set()
+        shutil.rmtree(profiler.output, ignore_errors=True)
+    return (lambda: profiler._sample(None, None)), teardown
+
+def _precision():
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+    import precision
+    return precision
+
+@benchmark('precision.price_str')
+def bench_price_str():
+    rules = _precision().MarketRules('SNAKEAI_USDT', 6, 0, 1, 1)
+    return lambda: rules.price_str(0.00123456789)
+
+@benchmark('precision.check_order')
+def bench_check_order():
+    rules = _precision().MarketRules('BTC_USDT', 1, 6, 0.00001, 3)
+    return lambda: rules.check_order(60120.04, 0.0166321)
+
+def _monitor(markets):
+    module = load_module('Price_Monitoring', 'crypto_monitor')
+    monitor = module.CryptoMonitor.__new__(module.CryptoMonitor)
+    monitor.config = {'monitoring': {'top_n': 25}}
+    monitor.exchange = markets
+    return module, monitor
+
+@benchmark('monitor.calculate_metrics')
+def bench_calculate_metrics():
+    markets = SyntheticMarkets(count=1)
+    _, monitor = _monitor(markets)
+    df = monitor.get_price_data(markets.markets[0]['symbol'])
+    return lambda: monitor.calculate_metrics(df)
+
+@benchmark('monitor.get_rankings.300')
+def bench_get_rankings():
+    _, monitor = _monitor(SyntheticMarkets(count=300))
+    return monitor.get_rankings
+
+def _ui_core(order_type):
+    if not _options.ui:
+        raise Skip("pass --ui to start a browser")
+    module = load_module('testing', 'trading_bot')
+    browser = load_module('testing', 'browser')
+    with open(_options.browser_config or os.path.join(ROOT, 'testing', 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['browser']['mode'] = 'lean'
+    config['browser'].setdefault('lean', {})['headless'] = True
+    profile = tempfile.mkdtemp(prefix='gatebot-bench-')
+    driver = browser.launch_browser(config, profile_path=profile)
+    driver.get('file://' + os.path.join(FIXTURES, 'order_form.html'))
+
+    core = module.TradingCore.__new__(module.TradingCore)
+    core.driver = driver
+    core.config = config
+    core.settings = module.BotConfig(config)
+    core.waits = config['browser'].get('waits') or {}
+    core.waiter = module.DomWaiter(driver, core.waits.get('element_timeout', 10))
+    core.form = module.OrderForm(driver, config)
+    core.price_rules = _precision().MarketRules('BTC_USDT', 1, 6)
+    core.logger = logging.getLogger("TradingCore")
+    core.failed_order_type = None
+    core.reconciler = module.Reconciler({}, lambda: None)
+
+    def place():
+        driver.execute_script("window.resetOrderForm();")
+        if not core._place_ui_order(order_type, 60060.0, 60120.0):
+            raise RuntimeError("UI order placement failed against the fixture")
+    return place, driver.quit
+
+@benchmark('ui.place_order.buy')
+def bench_ui_buy():
+    return _ui_core('buy')
+
+@benchmark('ui.place_order.sell')
+def bench_ui_sell():
+    return _ui_core('sell')
+
+############################################
+# History
+############################################
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def machine_id():
+    return f"{platform.node()}/{platform.machine()}/py{platform.python_version()}"
+
+def previous_run(history_path, machine):
+    """Most recent history entry recorded on this machine, or None."""
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('machine') == machine:
+                last = entry
+    return last
+
+def append_history(history_path, entry):
+    os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+    with open(history_path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+def format_ns(ns):
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+############################################
+# Runner
+############################################
+
+def run(selected, repeats, min_time):
+    results, skipped, failed = {}, {}, {}
+    for name, setup in selected:
+        teardown = None
+        try:
+            prepared = setup()
+            fn, teardown = prepared if isinstance(prepared, tuple) else (prepared, None)
+            fn()  # warm caches and imports outside the timed loops
+            results[name] = measure(fn, repeats, min_time)
+        except Skip as e:
+            skipped[name] = str(e)
+        except Exception as e:
+            failed[name] = f"{type(e).__name__}: {e}"
+        finally:
+            if teardown:
+                teardown()
+    return results, skipped, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trading hot paths")
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds per repeat')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--no-save', action='store_true', help="Don't append this run to the history")
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if any benchmark regressed')
+    parser.add_argument('--frames', help='ws_replay recording to use for ws.on_message.ticker')
+    parser.add_argument('--ui', action='store_true', help='Run the browser order-placement benchmarks')
+    parser.add_argument('--browser-config', help='config.yaml with the browser section (default testing/)')
+    args = parser.parse_args()
+    _options.frames, _options.ui, _options.browser_config = args.frames, args.ui, args.browser_config
+
+    # Keep log I/O out of the timings; formatting cost of disabled levels stays in
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.ERROR)
+
+    selected = [(n, s) for n, s in BENCHMARKS if args.filter in n]
+    machine = machine_id()
+    baseline = previous_run(args.history, machine)
+    results, skipped, failed = run(selected, args.repeats, args.min_time)
+
+    regressions = []
+    print(f"{'benchmark':<34} {'median':>12} {'min':>12} {'vs last':>9}")
+    for name, r in results.items():
+        delta = ''
+        before = (baseline or {}).get('results', {}).get(name)
+        if before:
+            # Compare best runs: the minimum is the least noisy for micro-benchmarks
+            change = (r['min_ns'] / before['min_ns'] - 1) * 100
+            delta = f"{change:+.1f}%"
+            if change > args.threshold:
+                regressions.append((name, change))
+                delta += ' !'
+        print(f"{name:<34} {format_ns(r['median_ns']):>12} {format_ns(r['min_ns']):>12} {delta:>9}")
+    for name, reason in skipped.items():
+        print(f"{name:<34} {'skipped':>12}  {reason}")
+    for name, reason in failed.items():
+        print(f"{name:<34} {'FAILED':>12}  {reason}")
+
+    if results and not args.no_save:
+        append_history(args.history, {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'machine': machine,
+            'results': results,
+        })
+    if baseline:
+        print(f"\nCompared with {baseline.get('commit') or 'unknown commit'} at {baseline['time']}")
+    if regressions:
+        print("Regressions over {:.0f}%: {}".format(
+            args.threshold, ', '.join(f"{n} ({c:+.1f}%)" for n, c in regressions)))
+    if args.check and (regressions or failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
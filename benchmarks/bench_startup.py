@@ -0,0 +1,190 @@
+"""
+Startup benchmark for the entry points: how long `import` of each script
+takes (python -X importtime), cold and warm, and optionally how long until
+the first network connection is attempted.
+
+- cold: a fresh PYTHONPYCACHEPREFIX, so every module (stdlib and
+  site-packages included) is compiled from source, as on a first deploy
+- warm: the normal __pycache__ next to the sources, best of --repeats
+
+--precompile runs compileall over the tree first, so the warm numbers
+are what a deploy that precompiles gets on its very first start.
+--connect runs the API bot and the price monitor as __main__ with
+socket connect/getaddrinfo patched to stop the process at the first
+attempt, and reports the time from process launch to that point.
+--budget-ms with --check exits 1 when an entry point exceeds the budget
+(time to first connect where measured, warm import time otherwise).
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --precompile --connect --budget-ms 800 --check
+
+An entry point whose dependencies are missing is reported as skipped,
+with the missing module.
+"""
+import argparse
+import compileall
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (directory, module, script run for --connect or None)
+ENTRY_POINTS = {
+    'root': ('.', 'main', None),
+    'ui': ('testing', 'main', None),
+    'api': ('test', 'main', 'main.py'),
+    'monitor': ('Price_Monitoring', 'crypto_monitor', 'crypto_monitor.py'),
+}
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+_MISSING = re.compile(r"No module named '([^']+)'")
+
+# Stops the process at its first connection attempt and prints when that was
+_CONNECT_PROBE = """
+import os, socket, sys, time
+def _first_connect(*args, **kwargs):
+    sys.stdout.write('FIRST_CONNECT %r\\n' % time.monotonic())
+    sys.stdout.flush()
+    os._exit(0)
+socket.socket.connect = socket.socket.connect_ex = _first_connect
+socket.create_connection = socket.getaddrinfo = _first_connect
+sys.argv = [{script!r}]
+sys.path.insert(0, os.getcwd())
+import runpy
+runpy.run_path({script!r}, run_name='__main__')
+"""
+
+class Skip(Exception):
+    """The entry point can't be imported here (a dependency is missing)."""
+
+def _env(pycache_prefix=None):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    if pycache_prefix:
+        env['PYTHONPYCACHEPREFIX'] = pycache_prefix
+    else:
+        env.pop('PYTHONPYCACHEPREFIX', None)
+    return env
+
+def _skip_reason(stderr):
+    missing = _MISSING.search(stderr)
+    if missing:
+        return f"missing {missing.group(1)}"
+    lines = [line for line in stderr.strip().splitlines() if line and not line.startswith('import time:')]
+    return lines[-1] if lines else 'import failed'
+
+def measure_import(directory, module, pycache_prefix=None):
+    """
+    Import `module` in a fresh interpreter with `directory` as cwd.
+    Returns (wall seconds including interpreter start, importtime rows),
+    rows being (self_us, cumulative_us, depth, name).
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.join(ROOT, directory), env=_env(pycache_prefix),
+        capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise Skip(_skip_reason(result.stderr))
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return wall, rows
+
+def measure_first_connect(directory, script):
+    """Seconds from launching `script` as __main__ to its first connection attempt."""
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, '-c', _CONNECT_PROBE.format(script=script)],
+        cwd=os.path.join(ROOT, directory), env=_env(),
+        capture_output=True, text=True, timeout=120)
+    for line in result.stdout.splitlines():
+        if line.startswith('FIRST_CONNECT '):
+            # time.monotonic() is the same system-wide clock in both processes
+            return float(line.split()[1]) - started
+    raise Skip(_skip_reason(result.stderr) if result.returncode else 'exited without connecting')
+
+def _module_time(rows, module):
+    for self_us, cumulative_us, depth, name in rows:
+        if name == module and depth == 0:
+            return cumulative_us / 1e6
+    return None
+
+def _heaviest(rows, module, count):
+    """Heaviest modules imported by the entry point itself (its direct children)."""
+    children = []
+    pending = []
+    # importtime prints a module after its children; children of the entry
+    # module are the depth-1 rows right before its own depth-0 row
+    for row in rows:
+        if row[2] == 0:
+            if row[3] == module:
+                children = pending
+            pending = []
+        elif row[2] == 1:
+            pending.append(row)
+    return sorted(children, key=lambda row: -row[1])[:count]
+
+def run(options):
+    if options.precompile:
+        started = time.perf_counter()
+        compileall.compile_dir(ROOT, quiet=1, workers=0)
+        print(f"precompile: {time.perf_counter() - started:.2f}s")
+
+    failed = False
+    for name, (directory, module, script) in ENTRY_POINTS.items():
+        if options.filter and options.filter not in name:
+            continue
+        try:
+            with tempfile.TemporaryDirectory(prefix='pycache-') as prefix:
+                cold_wall, cold_rows = measure_import(directory, module, prefix)
+            warm = [measure_import(directory, module) for _ in range(options.repeats)]
+        except Skip as e:
+            print(f"{name:<8} skipped ({e})")
+            continue
+        warm_wall, warm_rows = min(warm, key=lambda result: result[0])
+        cold_import = _module_time(cold_rows, module) or 0.0
+        warm_import = _module_time(warm_rows, module) or 0.0
+        line = (f"{name:<8} import cold {cold_import * 1e3:7.1f} ms  warm {warm_import * 1e3:7.1f} ms"
+                f"  (process {warm_wall * 1e3:.0f} ms)")
+
+        measured = warm_import
+        if options.connect and script:
+            try:
+                connect = min(measure_first_connect(directory, script) for _ in range(options.repeats))
+                line += f"  first connect {connect * 1e3:7.1f} ms"
+                measured = connect
+            except Skip as e:
+                line += f"  first connect skipped ({e})"
+        if options.budget_ms and measured * 1e3 > options.budget_ms:
+            line += f"  OVER BUDGET ({options.budget_ms:.0f} ms)"
+            failed = True
+        print(line)
+        for self_us, cumulative_us, depth, child in _heaviest(warm_rows, module, options.top):
+            print(f"    {cumulative_us / 1e3:7.1f} ms  {child}")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry point startup")
+    parser.add_argument('--filter', default='', help='Only entry points whose name contains this')
+    parser.add_argument('--repeats', type=int, default=3, help='Warm runs per entry point (best is kept)')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest direct imports to list')
+    parser.add_argument('--precompile', action='store_true', help='compileall the tree before measuring')
+    parser.add_argument('--connect', action='store_true', help='Measure time to first connection attempt')
+    parser.add_argument('--budget-ms', type=float, help='Startup budget per entry point')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if an entry point is over budget')
+    options = parser.parse_args()
+    failed = run(options)
+    if options.check and failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
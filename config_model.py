@@ -0,0 +1,268 @@
+"""
+Typed, validated view of config.yaml shared by the root, UI (testing/)
+and API (test/) bots.
+
+The YAML is checked once on load and turned into frozen __slots__
+objects. The hot paths then read attributes instead of walking
+config['trading'][order_type]['selectors'][...]. Price multipliers
+(1 +/- adjust/100) and selector locators are computed up front.
+
+The raw dict stays available as BotConfig.raw for settings the model
+does not cover. ConfigWatcher polls the file and hands a freshly
+validated BotConfig to a callback; an invalid edit is logged and the
+running config kept. Bots apply a reload between decisions and keep
+their connections, caches and order state; changes to RESTART_ONLY
+settings are refused instead.
+"""
+import logging
+import os
+import signal
+import threading
+
+import yaml
+
+# selenium.webdriver.common.by.By.CSS_SELECTOR, without importing selenium
+CSS_SELECTOR = 'css selector'
+
+# Settings bound to live connections (WebSocket, ccxt client, browser
+# session, journal file, control endpoint, signal handlers); a reload that
+# changes one is rejected
+RESTART_ONLY = (
+    ('api',), ('browser',), ('logging',), ('control',), ('profiler',),
+    ('trading', 'currency_pair'), ('trading', 'url'),
+    ('trading', 'use_price_orders'), ('trading', 'state_journal'),
+)
+
+class ConfigError(ValueError):
+    """config.yaml is missing a setting or has an invalid value."""
+
+class _Frozen:
+    __slots__ = ()
+
+    def _init(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only; reload the config instead")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only; reload the config instead")
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+_REQUIRED = object()
+
+def _number(section, key, where, default=_REQUIRED, minimum=None, maximum=None):
+    value = section.get(key)
+    if value is None:
+        if default is _REQUIRED:
+            raise ConfigError(f"{where}.{key} is required")
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConfigError(f"{where}.{key} must be a number, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise ConfigError(f"{where}.{key} must be >= {minimum}, got {value}")
+    if maximum is not None and value > maximum:
+        raise ConfigError(f"{where}.{key} must be <= {maximum}, got {value}")
+    return value
+
+def _mapping(section, key, where, required=True):
+    value = section.get(key)
+    if value is None and not required:
+        return {}
+    if not isinstance(value, dict):
+        raise ConfigError(f"{where}.{key} must be a mapping")
+    return value
+
+class Selectors(_Frozen):
+    """CSS selectors by name, with ready-made (By.CSS_SELECTOR, selector) locators."""
+
+    __slots__ = ('css', 'locators')
+
+    def __init__(self, selectors, where):
+        for name, selector in selectors.items():
+            if selector is not None and not isinstance(selector, str):
+                raise ConfigError(f"{where}.{name} must be a CSS selector string")
+        css = {name: selector for name, selector in selectors.items() if selector}
+        self._init(css=css, locators={name: (CSS_SELECTOR, selector) for name, selector in css.items()})
+
+    def __getitem__(self, name):
+        return self.css[name]
+
+    def get(self, name, default=None):
+        return self.css.get(name, default)
+
+    def locator(self, name):
+        return self.locators[name]
+
+class SideConfig(_Frozen):
+    """One side (buy or sell) of trading: price multipliers and order-form selectors."""
+
+    __slots__ = ('side', 'trigger_adjust', 'limit_adjust', 'trigger_mult', 'limit_mult',
+                 'amount_percentage', 'selectors', 'condition_option', 'form_fields')
+
+    def __init__(self, side, section):
+        where = f"trading.{side}"
+        trigger_adjust = _number(section, 'trigger_price_adjust', where, minimum=0)
+        limit_adjust = _number(section, 'limit_price_adjust', where, minimum=0)
+        # Buys trigger above the anchor, sells below
+        sign = 1 if side == 'buy' else -1
+        selectors = Selectors(_mapping(section, 'selectors', where, required=False), f"{where}.selectors")
+        option = 'greater_equal_option' if side == 'buy' else 'less_equal_option'
+        self._init(
+            side=side,
+            trigger_adjust=trigger_adjust,
+            limit_adjust=limit_adjust,
+            trigger_mult=1 + sign * trigger_adjust / 100,
+            limit_mult=1 + sign * limit_adjust / 100,
+            amount_percentage=_number(section, 'amount_percentage', where, 100, 0, 100),
+            selectors=selectors,
+            condition_option=selectors.get(option),
+            form_fields=tuple(selectors.get(name) for name in
+                              ('trigger_price_field', 'limit_price_field')),
+        )
+
+    def prices(self, anchor):
+        """(trigger, limit) for an order anchored at `anchor`."""
+        return anchor * self.trigger_mult, anchor * self.limit_mult
+
+class TradingConfig(_Frozen):
+    __slots__ = ('currency_pair', 'url', 'buy', 'sell', 'price_poll_interval', 'trade_limit',
+                 'max_loops', 'slider_percentage', 'price_staleness_budget')
+
+    def __init__(self, section):
+        pair = section.get('currency_pair')
+        if pair is not None and (not isinstance(pair, str) or '_' not in pair):
+            raise ConfigError(f"trading.currency_pair must look like BTC_USDT, got {pair!r}")
+        self._init(
+            currency_pair=pair,
+            url=section.get('url'),
+            buy=SideConfig('buy', _mapping(section, 'buy', 'trading')),
+            sell=SideConfig('sell', _mapping(section, 'sell', 'trading')),
+            price_poll_interval=_number(section, 'price_poll_interval', 'trading', 0.1, minimum=0),
+            trade_limit=_number(section, 'trade_limit', 'trading', None, minimum=0),
+            max_loops=_number(section, 'max_loops', 'trading', None, minimum=0),
+            slider_percentage=_number(section, 'slider_percentage', 'trading', 100, 0, 100),
+            # Oldest price (seconds) an order decision may use; 0 disables the check
+            price_staleness_budget=_number(section, 'price_staleness_budget', 'trading', 5.0, minimum=0),
+        )
+
+    def side(self, order_type):
+        return self.buy if order_type == 'buy' else self.sell
+
+class BotConfig(_Frozen):
+    """
+    Validated config. Typed sections: trading, selectors (the common ones).
+    Everything else is read from raw.
+    """
+
+    __slots__ = ('raw', 'path', 'mtime', 'trading', 'selectors')
+
+    def __init__(self, raw, path=None, mtime=None):
+        if not isinstance(raw, dict):
+            raise ConfigError("config must be a mapping")
+        self._init(
+            raw=raw,
+            path=path,
+            mtime=mtime,
+            trading=TradingConfig(_mapping(raw, 'trading', 'config')),
+            selectors=Selectors(_mapping(raw, 'selectors', 'config', required=False), 'selectors'),
+        )
+
+    @classmethod
+    def load(cls, path='config.yaml'):
+        mtime = os.stat(path).st_mtime_ns
+        with open(path) as f:
+            try:
+                raw = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ConfigError(f"{path}: {e}")
+        return cls(raw, path, mtime)
+
+    def restart_required(self, other):
+        """Dotted names of RESTART_ONLY settings that differ in `other`."""
+        changed = []
+        for path in RESTART_ONLY:
+            mine, theirs = self.raw, other.raw
+            for key in path:
+                mine = mine.get(key) if isinstance(mine, dict) else None
+                theirs = theirs.get(key) if isinstance(theirs, dict) else None
+            if mine != theirs:
+                changed.append('.'.join(path))
+        return changed
+
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+class ConfigWatcher:
+    """
+    Polls a config file's mtime and calls on_reload(BotConfig) after a
+    valid change. Polling keeps this dependency-free; a stat() per
+    interval costs next to nothing.
+    """
+
+    def __init__(self, path, on_reload, interval=1.0):
+        self.path = path
+        self.on_reload = on_reload
+        self.interval = interval
+        self.logger = logging.getLogger("ConfigWatcher")
+        self.mtime = self._mtime()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def reload_on_sighup(self):
+        """
+        `kill -HUP <pid>` reloads without waiting for the next poll. Call
+        from the main thread. The check runs on its own thread so the bot
+        applies it between decisions, not inside the one the signal
+        interrupted.
+        """
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+                target=self.check, name="config-reload", daemon=True).start())
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            mtime = self._mtime()
+            if mtime is None or mtime == self.mtime:
+                continue
+            self.mtime = mtime
+            self.check()
+
+    def check(self):
+        """Load and validate the file now; returns the new config or None."""
+        self.mtime = self._mtime()
+        try:
+            config = BotConfig.load(self.path)
+        except (ConfigError, OSError) as e:
+            self.logger.error(f"Ignoring invalid config change: {e}")
+            return None
+        self.logger.info(f"Reloading {self.path}")
+        try:
+            if self.on_reload(config) is False:
+                return None
+        except Exception as e:
+            self.logger.error(f"Applying reloaded config failed: {e}")
+            return None
+        return config
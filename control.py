@@ -0,0 +1,255 @@
+"""
+Local control and metrics endpoint for the running bots (API TradingCore
+in test/, UI TradingCore in testing/, CryptoMonitor in Price_Monitoring/).
+
+A ControlServer thread serves plain HTTP on a loopback address:
+
+  GET  /metrics   Prometheus text format
+  GET  /status    the same values as one JSON object
+  POST /pause     stop making decisions; resting orders stay as they are
+  POST /resume
+  POST /stop      finish the current decision, then exit the loop
+  POST /profile   toggle the sampling profiler (profiler.py), when installed
+
+    curl -s 127.0.0.1:9108/metrics
+    curl -X POST 127.0.0.1:9108/pause
+
+Requests are parsed, and metrics read and rendered, on the server thread.
+The trading and WebSocket threads only bump counters (a RateMeter mark or
+Histogram observe is a few attribute updates); commands only set flags
+the loop checks between decisions.
+
+Settings under `control` in config.yaml:
+  enabled  serve the endpoint (default false)
+  host     bind address (default 127.0.0.1; there is no authentication)
+  port     default 9108
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Gate.io sends these on every REST response
+RATE_LIMIT_REMAINING = 'X-Gate-RateLimit-Requests-Remain'
+RATE_LIMIT_LIMIT = 'X-Gate-RateLimit-Limit'
+
+class RateMeter:
+    """Event counter with a per-second rate, sampled when metrics are read."""
+
+    def __init__(self):
+        self.count = 0
+        self._last = (time.monotonic(), 0)
+        self._rate = 0.0
+
+    def mark(self):
+        self.count += 1
+
+    def rate(self):
+        """Events per second since the previous call (at least 1 s apart)."""
+        now, count = time.monotonic(), self.count
+        then, previous = self._last
+        if now - then >= 1.0:
+            self._rate = (count - previous) / (now - then)
+            self._last = (now, count)
+        return self._rate
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is one bisect and two adds."""
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+
+    def samples(self):
+        """[(labels, value)] for the _bucket series, cumulative as Prometheus expects."""
+        samples, total = [], 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            total += count
+            samples.append(({'le': str(bound)}, total))
+        return samples
+
+class RestStats:
+    """
+    REST calls and rate-limit headroom of a ccxt exchange. instrument()
+    wraps exchange.fetch, the single method every ccxt request goes
+    through, so calls are counted whichever code path made them.
+    """
+
+    def __init__(self):
+        self.calls = {}      # HTTP method -> count
+        self.errors = 0
+        self.remaining = None
+        self.limit = None
+        self._lock = threading.Lock()  # fetch runs on the trading, trailing and warm-up threads
+
+    def instrument(self, exchange):
+        fetch = exchange.fetch
+
+        def counted_fetch(url, method='GET', headers=None, body=None):
+            with self._lock:
+                self.calls[method] = self.calls.get(method, 0) + 1
+            try:
+                return fetch(url, method, headers, body)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            finally:
+                self._read_headers(getattr(exchange, 'last_response_headers', None))
+
+        exchange.fetch = counted_fetch
+        return exchange
+
+    def _read_headers(self, headers):
+        if not headers:
+            return
+        # ccxt keeps the response's header case; match case-insensitively
+        for name, value in headers.items():
+            lowered = name.lower()
+            try:
+                if lowered == RATE_LIMIT_REMAINING.lower():
+                    self.remaining = int(value)
+                elif lowered == RATE_LIMIT_LIMIT.lower():
+                    self.limit = int(value)
+            except (TypeError, ValueError):
+                pass
+
+    def metrics(self, prefix):
+        with self._lock:
+            calls = sorted(self.calls.items())
+        metrics = [
+            (f'{prefix}_rest_calls_total', 'counter', 'REST requests sent, by HTTP method',
+             [({'method': method}, count) for method, count in calls]),
+            (f'{prefix}_rest_errors_total', 'counter', 'REST requests that raised', self.errors),
+        ]
+        if self.remaining is not None:
+            metrics.append((f'{prefix}_rate_limit_remaining', 'gauge',
+                            'Requests left in the current rate-limit window', self.remaining))
+        if self.limit is not None:
+            metrics.append((f'{prefix}_rate_limit_limit', 'gauge',
+                            'Requests allowed per rate-limit window', self.limit))
+        return metrics
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+def render(metrics):
+    """
+    Prometheus text exposition of [(name, type, help, samples)], where
+    samples is a number, a Histogram, or [(labels dict, number)].
+    """
+    lines = []
+    for name, kind, help_text, samples in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if isinstance(samples, Histogram):
+            for labels, value in samples.samples():
+                lines.append(f'{name}_bucket{_labels(labels)} {value}')
+            lines.append(f'{name}_sum {samples.sum}')
+            lines.append(f'{name}_count {sum(samples.counts)}')
+        elif isinstance(samples, list):
+            for labels, value in samples:
+                lines.append(f'{name}{_labels(labels)} {value}')
+        else:
+            lines.append(f'{name} {samples}')
+    return '\n'.join(lines) + '\n'
+
+def status(metrics):
+    """The same metrics as a flat {name: value} dict for /status."""
+    result = {}
+    for name, kind, help_text, samples in metrics:
+        if isinstance(samples, Histogram):
+            count = sum(samples.counts)
+            result[f'{name}_count'] = count
+            result[f'{name}_avg'] = samples.sum / count if count else None
+        elif isinstance(samples, list):
+            for labels, value in samples:
+                result[name + ''.join(f'.{v}' for v in labels.values())] = value
+        else:
+            result[name] = samples
+    return result
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'BotControl/1.0'
+
+    def do_GET(self):
+        target = self.server.target
+        if self.path == '/metrics':
+            self._reply(200, render(target.metrics()), 'text/plain; version=0.0.4')
+        elif self.path == '/status':
+            self._reply(200, json.dumps(status(target.metrics()), default=str), 'application/json')
+        else:
+            self._reply(404, 'not found\n')
+
+    def do_POST(self):
+        command = self.path.strip('/')
+        if command == 'profile' and self.server.profiler:
+            running = self.server.profiler.toggle()
+            self._reply(200, 'profiling on\n' if running else 'profiling off\n')
+            return
+        if command not in ('pause', 'resume', 'stop'):
+            self._reply(404, 'unknown command\n')
+            return
+        getattr(self.server.target, command)()
+        self.server.logger.info("Control command: %s", command)
+        self._reply(200, command + '\n')
+
+    def _reply(self, code, body, content_type='text/plain'):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        self.server.logger.debug("%s " + format, self.address_string(), *args)
+
+class ControlServer:
+    """
+    Serves `target`, which provides metrics() -> [(name, type, help,
+    samples)] and pause(), resume(), stop(), on a daemon thread.
+    """
+
+    def __init__(self, target, host='127.0.0.1', port=9108, profiler=None):
+        self.logger = logging.getLogger("ControlServer")
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.target = target
+        self.httpd.logger = self.logger
+        self.httpd.profiler = profiler
+        self.thread = None
+
+    @classmethod
+    def from_config(cls, target, control_config, profiler=None):
+        """A started server if control.enabled, else None."""
+        control_config = control_config or {}
+        if not control_config.get('enabled'):
+            return None
+        server = cls(target, control_config.get('host', '127.0.0.1'), control_config.get('port', 9108), profiler)
+        return server.start()
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="control-server", daemon=True)
+        self.thread.start()
+        self.logger.info("Control endpoint on http://%s:%s", *self.address[:2])
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
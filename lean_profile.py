@@ -0,0 +1,129 @@
+"""
+Lean browser mode (browser.mode: lean), shared by the UI bots (root
+main.py and testing/): headless, on an isolated pre-authenticated profile,
+with images, web fonts, analytics and UI animations turned off.
+
+How much is trimmed depends on the browser:
+
+  chrome, edge  launch flags, plus URL blocking (images, fonts, analytics,
+                browser.lean.blocked_urls) and the no-animation stylesheet
+                on every new document, both through CDP
+  firefox       prefs only: images and web fonts are off and reduced motion
+                is requested, but there is no CDP, so analytics and
+                blocked_urls are NOT blocked and the stylesheet has to be
+                injected after each navigation with inject_lean_css()
+
+Settings under browser.lean in config.yaml (all optional):
+  profile_path        isolated profile dir (default ~/.gateio-bot/profile-<browser>)
+  headless            default true
+  block_images        default true
+  block_fonts         default true
+  disable_animations  default true
+  blocked_urls        extra URL patterns to block (Chromium only)
+"""
+import os
+
+# URL patterns blocked in lean mode (Chromium only, see above)
+LEAN_BLOCKED_IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"]
+LEAN_BLOCKED_FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+LEAN_BLOCKED_ANALYTICS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*sensorsdata*", "*sentry.io*",
+]
+
+# Injected into every page in lean mode so UI transitions don't delay clicks
+LEAN_CSS = (
+    "*, *::before, *::after {"
+    " animation: none !important; transition: none !important;"
+    " caret-color: auto !important; scroll-behavior: auto !important; }"
+)
+
+LEAN_CSS_SCRIPT = (
+    "(function(){"
+    "var s=document.createElement('style');"
+    "s.id='lean-profile-css';"
+    "s.textContent=%r;"
+    "(document.head||document.documentElement).appendChild(s);"
+    "})();" % LEAN_CSS
+)
+
+def is_lean(config):
+    return config['browser'].get('mode', 'full') == 'lean'
+
+def get_lean_profile_path(browser_name, lean_config):
+    """
+    Isolated profile directory for lean mode. Log in to gate.io once with
+    this profile (mode: full, profile_path pointing here) and the session
+    cookies are reused headless afterwards.
+    """
+    path = lean_config.get('profile_path') or os.path.join(
+        os.path.expanduser('~'), '.gateio-bot', f"profile-{browser_name}"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def apply_lean_options(browser_name, options, lean_config):
+    """Add headless and resource-trimming flags/prefs to browser options."""
+    if browser_name in ('chrome', 'edge'):
+        if lean_config.get('headless', True):
+            options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--no-first-run")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disk-cache-size=1")
+        if lean_config.get('block_images', True):
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+    elif browser_name == 'firefox':
+        if lean_config.get('headless', True):
+            options.add_argument("-headless")
+        options.add_argument("--width=1920")
+        options.add_argument("--height=1080")
+        if lean_config.get('block_images', True):
+            options.set_preference("permissions.default.image", 2)
+        if lean_config.get('block_fonts', True):
+            options.set_preference("browser.display.use_document_fonts", 0)
+            options.set_preference("gfx.downloadable_fonts.enabled", False)
+        options.set_preference("browser.cache.disk.enable", False)
+        options.set_preference("places.history.enabled", False)
+        options.set_preference("extensions.enabledScopes", 0)
+        options.set_preference("toolkit.telemetry.enabled", False)
+        options.set_preference("datareporting.healthreport.uploadEnabled", False)
+        options.set_preference("ui.prefersReducedMotion", 1)
+
+def apply_lean_runtime(browser_name, driver, lean_config):
+    """
+    Chromium only: block asset/analytics URLs and register the no-animation
+    stylesheet for every new document through CDP. Does nothing on Firefox,
+    which relies on its prefs plus inject_lean_css() after navigation.
+    """
+    if browser_name not in ('chrome', 'edge'):
+        return
+    patterns = list(LEAN_BLOCKED_ANALYTICS) + list(lean_config.get('blocked_urls') or [])
+    if lean_config.get('block_images', True):
+        patterns += LEAN_BLOCKED_IMAGES
+    if lean_config.get('block_fonts', True):
+        patterns += LEAN_BLOCKED_FONTS
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    if lean_config.get('disable_animations', True):
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": LEAN_CSS_SCRIPT}
+        )
+
+def inject_lean_css(driver, config):
+    """
+    Inject the no-animation stylesheet into the current page (idempotent).
+    Does nothing outside lean mode or with browser.lean.disable_animations off.
+    """
+    if not is_lean(config) or not (config['browser'].get('lean') or {}).get('disable_animations', True):
+        return
+    driver.execute_script(
+        "if(!document.getElementById('lean-profile-css')){" + LEAN_CSS_SCRIPT + "}"
+    )
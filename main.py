@@ -2,11 +2,9 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from trading_bot import TradingBot
-import yaml
+from config_model import BotConfig, ConfigWatcher
+from lean_profile import is_lean, get_lean_profile_path, apply_lean_options, apply_lean_runtime
 import logging
 import sys
 import os
@@ -36,19 +34,25 @@ def get_default_profile_path(browser_name):
     system = 'darwin' if sys.platform == 'darwin' else 'windows' if sys.platform == 'win32' else 'linux'
     return paths.get(browser_name, {}).get(system, '')
 
+CONFIG_PATH = 'config.yaml'
+
 def load_config():
+    """Load and validate config.yaml once; returns a BotConfig."""
     try:
-        with open('config.yaml', 'r') as file:
-            return yaml.safe_load(file)
+        return BotConfig.load(CONFIG_PATH)
     except Exception as e:
         print(f"Error loading config: {e}")
         sys.exit(1)
 
-def setup_browser(browser_name):
+def setup_browser(browser_name, config):
     try:
         # Get profile path from config or use default
-        config = load_config()
-        profile_path = config['browser'].get('profile_path', get_default_profile_path(browser_name.lower()))
+        lean = is_lean(config)
+        lean_config = config['browser'].get('lean') or {}
+        if lean:
+            profile_path = config['browser'].get('profile_path') or get_lean_profile_path(browser_name.lower(), lean_config)
+        else:
+            profile_path = config['browser'].get('profile_path', get_default_profile_path(browser_name.lower()))
         
         if browser_name.lower() == 'chrome':
             options = webdriver.ChromeOptions()
@@ -56,19 +60,27 @@ def setup_browser(browser_name):
             options.add_argument('--profile-directory=Default')
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
+            if lean:
+                apply_lean_options('chrome', options, lean_config)
+            # Only the configured browser's driver manager is imported
+            from webdriver_manager.chrome import ChromeDriverManager
             service = ChromeService(ChromeDriverManager().install())
-            return webdriver.Chrome(service=service, options=options)
+            driver = webdriver.Chrome(service=service, options=options)
             
         elif browser_name.lower() == 'firefox':
             options = webdriver.FirefoxOptions()
-            if os.path.exists(profile_path):
+            if not lean and os.path.exists(profile_path):
                 # Find the default profile directory
                 profile_dirs = [d for d in os.listdir(profile_path) if d.endswith('.default')]
                 if profile_dirs:
                     profile_path = os.path.join(profile_path, profile_dirs[0])
             options.add_argument(f'-profile {profile_path}')
+            if lean:
+                # Prefs only: Firefox has no CDP, so no URL blocking (see lean_profile.py)
+                apply_lean_options('firefox', options, lean_config)
+            from webdriver_manager.firefox import GeckoDriverManager
             service = FirefoxService(GeckoDriverManager().install())
-            return webdriver.Firefox(service=service, options=options)
+            driver = webdriver.Firefox(service=service, options=options)
             
         elif browser_name.lower() == 'edge':
             options = webdriver.EdgeOptions()
@@ -76,11 +88,18 @@ def setup_browser(browser_name):
             options.add_argument('--profile-directory=Default')
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
+            if lean:
+                apply_lean_options('edge', options, lean_config)
+            from webdriver_manager.microsoft import EdgeChromiumDriverManager
             service = EdgeService(EdgeChromiumDriverManager().install())
-            return webdriver.Edge(service=service, options=options)
+            driver = webdriver.Edge(service=service, options=options)
             
         else:
             raise ValueError(f"Unsupported browser: {browser_name}")
+
+        if lean:
+            apply_lean_runtime(browser_name.lower(), driver, lean_config)
+        return driver
             
     except Exception as e:
         print(f"Error setting up browser: {e}")
@@ -88,7 +107,8 @@ def setup_browser(browser_name):
         sys.exit(1)
 
 def main():
-    config = load_config()
+    settings = load_config()
+    config = settings.raw
     
     logging.basicConfig(
         filename=config['logging']['file'],
@@ -99,10 +119,14 @@ def main():
     driver = None
     try:
         browser_name = config['browser']['name']
-        driver = setup_browser(browser_name)
-        driver.maximize_window()
+        driver = setup_browser(browser_name, config)
+        if not is_lean(config):
+            driver.maximize_window()
         
-        bot = TradingBot(driver)
+        bot = TradingBot(driver, settings)
+        interval = config['trading'].get('config_reload_interval', 1.0)
+        if interval:
+            ConfigWatcher(CONFIG_PATH, bot.apply_settings, interval).start().reload_on_sighup()
         bot.start_trading()
         
     except KeyboardInterrupt:
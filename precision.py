@@ -0,0 +1,195 @@
+"""
+Per-market price/amount precision shared by the UI (testing/) and API
+(test/) bots.
+
+Market rules are loaded once, from Gate.io /spot/currency_pairs rows or
+ccxt markets, into MarketRules objects that hold precomputed scales.
+Quantizing is then integer arithmetic on tick counts. Wire strings are
+built from the integer ticks with divmod, so there's no float repr or
+Decimal parsing on the order path and no precision rejects on pairs
+such as SNAKEAI_USDT (6 price decimals, whole-unit amounts).
+"""
+import json
+import logging
+import math
+import urllib.request
+
+GATE_PUBLIC_URL = "https://api.gateio.ws/api/v4"
+
+# Guards float products like 0.3 * 10 = 2.9999999999999996 before floor/ceil
+_EPSILON = 1e-9
+
+class PrecisionError(ValueError):
+    """Order would be rejected by the exchange's precision or minimum rules."""
+
+def _decimals_from_step(step):
+    """0.001 -> 3; 1 -> 0. Steps are powers of ten on Gate.io."""
+    step = float(step)
+    return max(0, -int(math.floor(math.log10(step) + _EPSILON)))
+
+class MarketRules:
+    """Precomputed rounding table for one currency pair."""
+
+    __slots__ = ('pair', 'price_decimals', 'amount_decimals', 'price_scale', 'amount_scale',
+                 'min_amount_steps', 'min_notional')
+
+    def __init__(self, pair, price_decimals, amount_decimals, min_base_amount=0.0, min_quote_amount=0.0):
+        self.pair = pair
+        self.price_decimals = int(price_decimals)
+        self.amount_decimals = int(amount_decimals)
+        self.price_scale = 10 ** self.price_decimals
+        self.amount_scale = 10 ** self.amount_decimals
+        self.min_amount_steps = math.ceil(float(min_base_amount or 0) * self.amount_scale - _EPSILON)
+        self.min_notional = float(min_quote_amount or 0)
+
+    # Quantizing: float -> integer ticks
+
+    def price_ticks(self, price, rounding='nearest'):
+        scaled = price * self.price_scale
+        if rounding == 'down':
+            return math.floor(scaled + _EPSILON)
+        if rounding == 'up':
+            return math.ceil(scaled - _EPSILON)
+        return round(scaled)
+
+    def amount_steps(self, amount):
+        """Amounts always round down so an order never exceeds the balance."""
+        return math.floor(amount * self.amount_scale + _EPSILON)
+
+    # Integer ticks -> wire values
+
+    def price_from_ticks(self, ticks):
+        return ticks / self.price_scale
+
+    def amount_from_steps(self, steps):
+        return steps / self.amount_scale
+
+    @staticmethod
+    def _format(units, decimals, scale):
+        if not decimals:
+            return str(units)
+        whole, frac = divmod(units, scale)
+        return f"{whole}.{frac:0{decimals}d}"
+
+    def price_str(self, price, rounding='nearest'):
+        return self._format(self.price_ticks(price, rounding), self.price_decimals, self.price_scale)
+
+    def amount_str(self, amount):
+        return self._format(self.amount_steps(amount), self.amount_decimals, self.amount_scale)
+
+    def quantize_price(self, price, rounding='nearest'):
+        return self.price_ticks(price, rounding) / self.price_scale
+
+    def quantize_amount(self, amount):
+        return self.amount_steps(amount) / self.amount_scale
+
+    def check_order(self, price, amount):
+        """
+        Quantize a limit order and enforce the minimum amount and notional.
+        Returns (price_str, amount_str); raises PrecisionError.
+        """
+        price_ticks = self.price_ticks(price)
+        steps = self.amount_steps(amount)
+        if price_ticks <= 0:
+            raise PrecisionError(f"{self.pair}: price {price} rounds to zero")
+        if steps <= 0 or steps < self.min_amount_steps:
+            raise PrecisionError(f"{self.pair}: amount {amount} below minimum "
+                                 f"{self.amount_from_steps(self.min_amount_steps)}")
+        notional = price_ticks * steps / (self.price_scale * self.amount_scale)
+        if notional < self.min_notional:
+            raise PrecisionError(f"{self.pair}: order value {notional:.8g} below minimum {self.min_notional}")
+        return (self._format(price_ticks, self.price_decimals, self.price_scale),
+                self._format(steps, self.amount_decimals, self.amount_scale))
+
+    def __repr__(self):
+        return (f"MarketRules({self.pair}, price_decimals={self.price_decimals}, "
+                f"amount_decimals={self.amount_decimals}, min_notional={self.min_notional})")
+
+class PrecisionEngine:
+    """Lookup of MarketRules by Gate.io pair id (BTC_USDT) or ccxt symbol (BTC/USDT)."""
+
+    def __init__(self):
+        self.rules = {}
+        self.logger = logging.getLogger("PrecisionEngine")
+
+    def add(self, rules):
+        self.rules[rules.pair] = rules
+        self.rules[rules.pair.replace('_', '/')] = rules
+
+    def get(self, pair):
+        try:
+            return self.rules[pair]
+        except KeyError:
+            raise PrecisionError(f"No precision rules loaded for {pair}")
+
+    def __contains__(self, pair):
+        return pair in self.rules
+
+    @classmethod
+    def from_currency_pairs(cls, rows):
+        """From Gate.io GET /spot/currency_pairs rows."""
+        engine = cls()
+        for row in rows:
+            engine.add(MarketRules(row['id'], row['precision'], row['amount_precision'],
+                                   row.get('min_base_amount'), row.get('min_quote_amount')))
+        return engine
+
+    @classmethod
+    def from_ccxt_markets(cls, markets):
+        """
+        From ccxt load_markets(). Handles both precision modes: decimal
+        places (ints) and tick sizes (floats such as 0.1).
+        """
+        engine = cls()
+        for market in markets.values():
+            if market.get('type', 'spot') != 'spot':
+                continue
+            precision = market['precision']
+            price, amount = precision.get('price'), precision.get('amount')
+            if price is None or amount is None:
+                continue
+            price_decimals = price if isinstance(price, int) else _decimals_from_step(price)
+            amount_decimals = amount if isinstance(amount, int) else _decimals_from_step(amount)
+            limits = market.get('limits') or {}
+            engine.add(MarketRules(
+                market['id'], price_decimals, amount_decimals,
+                (limits.get('amount') or {}).get('min'), (limits.get('cost') or {}).get('min')
+            ))
+        return engine
+
+    @classmethod
+    def fetch_gate(cls, base_url=GATE_PUBLIC_URL, timeout=10):
+        """Load every spot pair from the public /spot/currency_pairs endpoint (no key needed)."""
+        url = f"{base_url.rstrip('/')}/spot/currency_pairs"
+        request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return cls.from_currency_pairs(json.load(response))
+
+    @classmethod
+    def from_config(cls, config, pairs):
+        """
+        Fallback when market metadata is unreachable: the global
+        trading.price_precision (and optional amount_precision /
+        min_notional) for every pair.
+        """
+        trading = config['trading']
+        engine = cls()
+        for pair in pairs:
+            engine.add(MarketRules(pair, trading['price_precision'], trading.get('amount_precision', 8),
+                                   0, trading.get('min_notional', 0)))
+        return engine
+
+    @classmethod
+    def load(cls, config, pairs, base_url=GATE_PUBLIC_URL):
+        """Market metadata from Gate.io if reachable, else the config fallback."""
+        try:
+            engine = cls.fetch_gate(base_url)
+            missing = [pair for pair in pairs if pair not in engine]
+            if not missing:
+                return engine
+            engine.logger.warning(f"No market metadata for {missing}; using trading.price_precision")
+        except Exception as e:
+            logging.getLogger("PrecisionEngine").warning(
+                f"Market metadata unavailable ({e}); using trading.price_precision"
+            )
+        return cls.from_config(config, pairs)
@@ -0,0 +1,87 @@
+"""
+Latest-price snapshot shared by the UI (testing/) and API (test/) bots.
+
+Each tick becomes an immutable PriceSnapshot (price, exchange timestamp,
+local receive time, sequence number) and is published with a single
+attribute store, so a reader always sees one consistent tick without a
+lock. Order decisions go through LatestPrice.fresh(), which refuses a
+price older than the staleness budget instead of trading on it, and
+counts how often the price was fresh, had to be waited for, or was
+refused.
+"""
+import itertools
+import time
+
+class StalePriceError(Exception):
+    """No price within the staleness budget arrived in time for a decision."""
+
+class PriceSnapshot:
+    """
+    :param exchange_ms: Exchange timestamp of the update (epoch ms), None if unknown
+    :param received: time.monotonic() when it arrived here
+    :param seq: Local sequence number, increasing with every published tick
+    """
+
+    __slots__ = ('price', 'exchange_ms', 'received', 'seq', 'lag')
+
+    def __init__(self, price, exchange_ms, received, seq):
+        self.price = price
+        self.exchange_ms = exchange_ms
+        self.received = received
+        self.seq = seq
+        # Exchange-to-here delay, as far as the two clocks agree
+        self.lag = time.time() - exchange_ms / 1000 if exchange_ms else None
+
+    def age(self, now=None):
+        """Seconds since the tick arrived."""
+        return (now if now is not None else time.monotonic()) - self.received
+
+    def __repr__(self):
+        return f"PriceSnapshot(price={self.price}, seq={self.seq}, age={self.age():.3f}s)"
+
+class LatestPrice:
+    """
+    The current PriceSnapshot. publish() runs on the WebSocket thread,
+    everything else reads self.snapshot once and works with that object.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self._seq = itertools.count(1)
+        self.checks = {'fresh': 0, 'waited': 0, 'refused': 0}
+
+    def publish(self, price, exchange_ms=None):
+        snapshot = PriceSnapshot(price, exchange_ms, time.monotonic(), next(self._seq))
+        self.snapshot = snapshot  # the swap; readers see the old or the new tick, never a mix
+        return snapshot
+
+    def clear(self):
+        self.snapshot = None
+
+    @property
+    def price(self):
+        snapshot = self.snapshot
+        return snapshot.price if snapshot else None
+
+    def fresh(self, budget, wait=5.0, poll=0.01):
+        """
+        The latest snapshot if it is at most `budget` seconds old (any age
+        when budget is 0 or None), waiting up to `wait` seconds for one.
+        Raises StalePriceError when none arrives.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None and (not budget or snapshot.age() <= budget):
+            self.checks['fresh'] += 1
+            return snapshot
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            snapshot = self.snapshot
+            if snapshot is not None and (not budget or snapshot.age() <= budget):
+                self.checks['waited'] += 1
+                return snapshot
+        self.checks['refused'] += 1
+        if snapshot is None:
+            raise StalePriceError(f"no price received within {wait}s")
+        raise StalePriceError(f"last price {snapshot.price} (seq {snapshot.seq}) is {snapshot.age():.1f}s old, "
+                              f"budget {budget}s")
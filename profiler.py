@@ -0,0 +1,205 @@
+"""
+Opt-in sampling profiler for production runs of the UI (testing/) and
+API (test/) bots.
+
+An interval timer signal (SIGALRM for wall time, SIGPROF for CPU time)
+interrupts the main thread; its handler grabs every thread's stack with
+sys._current_frames() and counts it. Nothing runs between samples and a
+sample only builds a tuple of code objects, so the cost is a few tens of
+microseconds per interval (~0.4% at the default 10 ms; see the
+profiler.sample benchmark).
+
+Samples are split by subsystem and written as collapsed stacks, one file
+per subsystem, for flamegraph.pl, speedscope or inferno:
+
+  ccxt       any stack inside ccxt (REST calls, whatever thread made them)
+  selenium   any stack inside selenium (WebDriver calls)
+  websocket  the WebSocket reader thread
+  trading    the trading loop (main thread) and the trailing-stop worker
+  other      everything else (log listener, config watcher, ...)
+
+Each stack starts with the TradingCore phase at sampling time
+(phase:monitoring, placing, cancelling or recovering) and the thread
+name, so one flamegraph can be split by phase.
+
+Settings under `profiler` in config.yaml:
+  enabled   install the profiler (default false); nothing is sampled yet
+  start     start sampling right away (default false)
+  interval  seconds between samples (default 0.01)
+  mode      wall (default) or cpu
+  output    directory for <subsystem>.folded (default profiles)
+
+Toggle at runtime with `kill -USR2 <pid>` or POST /profile on the control
+endpoint (control.py). Files are rewritten with all samples so far each
+time sampling stops, and at exit. Unix only.
+"""
+import atexit
+import contextlib
+import logging
+import os
+import signal
+import sys
+import threading
+
+MONITORING = 'monitoring'
+PLACING = 'placing'
+CANCELLING = 'cancelling'
+RECOVERING = 'recovering'
+
+_MODES = {
+    'wall': ('ITIMER_REAL', 'SIGALRM'),
+    'cpu': ('ITIMER_PROF', 'SIGPROF'),
+}
+
+# Stacks through these packages belong to them regardless of thread
+_PACKAGE_SUBSYSTEMS = (
+    (f'{os.sep}ccxt{os.sep}', 'ccxt'),
+    (f'{os.sep}selenium{os.sep}', 'selenium'),
+)
+_THREAD_SUBSYSTEMS = {
+    'MainThread': 'trading',
+    'trailing-stop': 'trading',
+    'websocket': 'websocket',
+}
+
+@contextlib.contextmanager
+def phase(core, name):
+    """Tag samples taken inside the block with `name` (sets core.phase)."""
+    previous = core.phase
+    core.phase = name
+    try:
+        yield
+    finally:
+        core.phase = previous
+
+class SamplingProfiler:
+    """
+    :param phase_of: Object whose `phase` attribute tags each sample
+                     (the TradingCore); may be set after construction
+    """
+
+    def __init__(self, interval=0.01, mode='wall', output='profiles', phase_of=None):
+        if mode not in _MODES:
+            raise ValueError(f"profiler.mode must be one of {', '.join(_MODES)}, got {mode!r}")
+        self.interval = interval
+        self.mode = mode
+        self.output = output
+        self.phase_of = phase_of
+        self.logger = logging.getLogger("SamplingProfiler")
+        self.counts = {}       # (subsystem, phase, thread name, code objects root first) -> samples
+        self.samples = 0
+        self.running = False
+        self._subsystem_of_code = {}
+        self._lock = threading.Lock()  # start/stop/write from the control, signal and exit paths
+        timer_name, signal_name = _MODES[mode]
+        self._timer = getattr(signal, timer_name)
+        self._signal = getattr(signal, signal_name)
+
+    @classmethod
+    def from_config(cls, profiler_config, phase_of=None):
+        """Installed profiler if profiler.enabled (and the platform has interval timers), else None."""
+        profiler_config = profiler_config or {}
+        if not profiler_config.get('enabled'):
+            return None
+        if not hasattr(signal, 'setitimer'):
+            logging.getLogger("SamplingProfiler").warning("Sampling profiler needs setitimer; not available here")
+            return None
+        profiler = cls(profiler_config.get('interval', 0.01), profiler_config.get('mode', 'wall'),
+                       profiler_config.get('output', 'profiles'), phase_of)
+        profiler.install()
+        if profiler_config.get('start'):
+            profiler.start()
+        return profiler
+
+    def install(self):
+        """Set the signal handlers. Call from the main thread."""
+        signal.signal(self._signal, self._sample)
+        if hasattr(signal, 'SIGUSR2'):
+            signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(
+                target=self.toggle, name="profiler-toggle", daemon=True).start())
+        atexit.register(self.stop)
+        return self
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            signal.setitimer(self._timer, self.interval, self.interval)
+        self.logger.info("Sampling profiler started (%s, every %ss)", self.mode, self.interval)
+
+    def stop(self):
+        """Stop sampling and write the collapsed stacks."""
+        with self._lock:
+            if not self.running:
+                return
+            signal.setitimer(self._timer, 0)
+            self.running = False
+        self.write()
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def _sample(self, signum, frame):
+        phase_of = self.phase_of
+        current_phase = getattr(phase_of, 'phase', None) or '-'
+        # threading.enumerate() takes a lock the interrupted thread may hold;
+        # a plain read of the registry it guards is safe under the GIL
+        threads = threading._active
+        counts = self.counts
+        own = threading.get_ident()
+        for ident, top in sys._current_frames().items():
+            codes = []
+            while top is not None:
+                codes.append(top.f_code)
+                top = top.f_back
+            if ident == own:
+                # Drop this handler's frames (more than one if a sample overran the interval)
+                codes = [code for code in codes if code is not _SAMPLE_CODE]
+            if not codes:
+                continue
+            thread = threads.get(ident)
+            name = thread.name if thread else '?'
+            codes.reverse()
+            key = (self._subsystem(codes, name), current_phase, name, tuple(codes))
+            counts[key] = counts.get(key, 0) + 1
+        self.samples += 1
+
+    def _subsystem(self, codes, thread_name):
+        cache = self._subsystem_of_code
+        for code in codes:
+            subsystem = cache.get(code, False)
+            if subsystem is False:
+                subsystem = next((name for marker, name in _PACKAGE_SUBSYSTEMS
+                                  if marker in code.co_filename), None)
+                cache[code] = subsystem
+            if subsystem:
+                return subsystem
+        # Redundant feed connections are named websocket#0, websocket#1, ...
+        return _THREAD_SUBSYSTEMS.get(thread_name.partition('#')[0], 'other')
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def write(self):
+        """Rewrite <output>/<subsystem>.folded with every sample so far."""
+        counts = dict(self.counts)
+        if not counts:
+            return
+        os.makedirs(self.output, exist_ok=True)
+        lines = {}
+        for (subsystem, sample_phase, thread, codes), count in counts.items():
+            stack = ';'.join([f"phase:{sample_phase}", f"thread:{thread}"] + [self._label(c) for c in codes])
+            lines.setdefault(subsystem, []).append(f"{stack} {count}")
+        for subsystem, stacks in lines.items():
+            path = os.path.join(self.output, f"{subsystem}.folded")
+            with open(path, 'w') as f:
+                f.write('\n'.join(sorted(stacks)) + '\n')
+        self.logger.info("Wrote %s samples to %s (%s)", self.samples, self.output, ', '.join(sorted(lines)))
+
+_SAMPLE_CODE = SamplingProfiler._sample.__code__
@@ -0,0 +1,109 @@
+"""
+Error classification and targeted repair for the trading loops, shared by
+the UI (testing/) and API (test/) bots.
+
+Instead of treating every exception as "cancel everything and reload",
+each error is classified and the bot's cheapest matching repair runs:
+
+  transient      network blip, timeout, rate limit      -> back off, retry next loop
+  stale_element  DOM node detached, not there in time   -> re-resolve on the next loop
+  rejected       exchange refused the order             -> drop the pending order state
+  desync         local state disagrees with the exchange -> one targeted order lookup
+  unknown        anything else                          -> full recovery
+
+Full recovery stays as the last resort: for unknown errors, when a repair
+reports failure, or when the same class keeps recurring. A stale price
+(price_snapshot.StalePriceError) never gets here: the loops catch it and
+skip the decision, and every price read happens before anything is sent.
+Classification goes by exception class names along the MRO, so ccxt,
+requests, selenium and websocket-client are never imported here.
+"""
+import logging
+
+TRANSIENT = 'transient'
+STALE_ELEMENT = 'stale_element'
+REJECTED = 'rejected'
+DESYNC = 'desync'
+UNKNOWN = 'unknown'
+
+class DesyncError(Exception):
+    """
+    Raised by a bot when its state and the exchange/UI disagree.
+    :param orders: The listing that disagreed, for the repair to reconcile against
+    """
+
+    def __init__(self, message, orders=()):
+        super().__init__(message)
+        self.orders = list(orders)
+
+# Checked in this order: ccxt's OrderNotFound subclasses InvalidOrder
+_CLASSES = (
+    (DESYNC, {'DesyncError', 'OrderNotFound'}),
+    (REJECTED, {'InvalidOrder', 'InsufficientFunds', 'PrecisionError', 'BadSymbol'}),
+    (TRANSIENT, {
+        'NetworkError', 'RequestTimeout', 'ExchangeNotAvailable', 'DDoSProtection',
+        'RateLimitExceeded', 'ConnectionError', 'Timeout', 'TimeoutError', 'URLError',
+        'WebSocketConnectionClosedException', 'WebSocketTimeoutException',
+    }),
+    (STALE_ELEMENT, {
+        'StaleElementReferenceException', 'NoSuchElementException',
+        'ElementNotInteractableException', 'ElementClickInterceptedException',
+        'TimeoutException',
+    }),
+)
+
+def classify(exc):
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    for kind, markers in _CLASSES:
+        if names & markers:
+            return kind
+    return UNKNOWN
+
+class Reconciler:
+    """
+    Dispatches errors to per-class repairs.
+    :param repairs: {kind: callable(exc, attempt) -> bool}; False means
+                    the repair could not restore a consistent state
+    :param full_recovery: callable() used as the last resort
+    :param max_attempts: consecutive errors of one class before escalating
+    """
+
+    def __init__(self, repairs, full_recovery, max_attempts=3, logger=None):
+        self.repairs = repairs
+        self.full_recovery = full_recovery
+        self.max_attempts = max_attempts
+        self.logger = logger or logging.getLogger("Reconciler")
+        self.streak_kind = None
+        self.streak = 0
+        self.errors = 0  # total handled; lets a loop tell whether an iteration was clean
+        self.stats = {kind: 0 for kind in (TRANSIENT, STALE_ELEMENT, REJECTED, DESYNC, UNKNOWN)}
+        self.stats['full_recovery'] = 0
+
+    def handle(self, exc):
+        """Repair after `exc`; returns False when full recovery had to run."""
+        kind = classify(exc)
+        self.errors += 1
+        self.stats[kind] += 1
+        if kind == self.streak_kind:
+            self.streak += 1
+        else:
+            self.streak_kind, self.streak = kind, 1
+
+        repair = self.repairs.get(kind)
+        if repair and self.streak <= self.max_attempts:
+            self.logger.warning(f"{kind} error (attempt {self.streak}): {exc}")
+            try:
+                if repair(exc, self.streak):
+                    return True
+                self.logger.warning(f"{kind} repair could not reconcile state")
+            except Exception as repair_error:
+                self.logger.error(f"{kind} repair failed: {repair_error}")
+        self.logger.error(f"Falling back to full recovery after {kind} error: {exc}")
+        self.stats['full_recovery'] += 1
+        self.clear()
+        self.full_recovery()
+        return False
+
+    def clear(self):
+        """Reset the error streak; call after a clean loop iteration."""
+        self.streak_kind, self.streak = None, 0
@@ -0,0 +1,408 @@
+import math
+import random
+import threading
+import time
+
+############################################
+# In-memory Gate.io spot exchange
+############################################
+
+class SimMarket:
+    def __init__(self, pair, settings):
+        self.pair = pair
+        self.base, self.quote = pair.split('_')
+        self.price = float(settings['price'])
+        self.open_24h = self.price
+        self.high_24h = self.price
+        self.low_24h = self.price
+        self.volatility = float(settings.get('volatility', 0.0005))
+        self.precision = int(settings.get('precision', 2))
+        self.amount_precision = int(settings.get('amount_precision', 4))
+        self.min_base_amount = settings.get('min_base_amount', 10 ** -self.amount_precision)
+        self.min_quote_amount = settings.get('min_quote_amount', 1)
+        self.base_volume = 0.0
+        self.quote_volume = 0.0
+        # One candle per minute: [ts, open, high, low, close, base_volume, quote_volume]
+        self.candles = []
+
+    def fmt_price(self, value):
+        return f"{value:.{self.precision}f}"
+
+    def fmt_amount(self, value):
+        return f"{value:.{self.amount_precision}f}"
+
+class SimExchange:
+    """
+    Random-walk prices plus a matching engine for limit orders and
+    price-triggered (stop-limit) orders. All public methods are thread-safe
+    and return Gate.io v4 shaped dicts.
+    """
+
+    def __init__(self, settings):
+        self.lock = threading.RLock()
+        self.rng = random.Random(settings.get('seed'))
+        self.markets = {pair: SimMarket(pair, cfg) for pair, cfg in settings['pairs'].items()}
+        self.balances = {cur: {'available': float(v), 'locked': 0.0} for cur, v in settings['balances'].items()}
+        for market in self.markets.values():
+            for cur in (market.base, market.quote):
+                self.balances.setdefault(cur, {'available': 0.0, 'locked': 0.0})
+        self.fee_rate = float(settings.get('fee_rate', 0.002))
+        self.orders = {}        # id -> spot order dict (open and finished)
+        self.price_orders = {}  # id -> price-triggered order dict
+        self.next_id = int(time.time()) * 1000
+        self.listeners = []     # callables(channel, result) for WebSocket pushes
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def _emit(self, channel, result):
+        for listener in list(self.listeners):
+            listener(channel, result)
+
+    ########################################
+    # Market data
+    ########################################
+
+    def step(self, now=None):
+        """Advance every market one random-walk tick and run matching."""
+        now = now or time.time()
+        with self.lock:
+            for market in self.markets.values():
+                shock = self.rng.gauss(0, market.volatility)
+                market.price = max(market.price * math.exp(shock), 10 ** -market.precision)
+                market.high_24h = max(market.high_24h, market.price)
+                market.low_24h = min(market.low_24h, market.price)
+                self._update_candle(market, now)
+                self._match(market, now)
+                self._emit('spot.tickers', self.ticker(market.pair))
+
+    def set_price(self, pair, price, now=None):
+        """Force a price (for scripted scenarios) and run matching."""
+        now = now or time.time()
+        with self.lock:
+            market = self.markets[pair]
+            market.price = float(price)
+            market.high_24h = max(market.high_24h, market.price)
+            market.low_24h = min(market.low_24h, market.price)
+            self._update_candle(market, now)
+            self._match(market, now)
+            self._emit('spot.tickers', self.ticker(pair))
+
+    def _update_candle(self, market, now):
+        minute = int(now // 60 * 60)
+        if not market.candles or market.candles[-1][0] != minute:
+            market.candles.append([minute, market.price, market.price, market.price, market.price, 0.0, 0.0])
+            del market.candles[:-1000]
+        candle = market.candles[-1]
+        candle[2] = max(candle[2], market.price)
+        candle[3] = min(candle[3], market.price)
+        candle[4] = market.price
+
+    def ticker(self, pair):
+        market = self.markets[pair]
+        spread = 10 ** -market.precision
+        change = (market.price - market.open_24h) / market.open_24h * 100
+        return {
+            'currency_pair': pair,
+            'last': market.fmt_price(market.price),
+            'lowest_ask': market.fmt_price(market.price + spread),
+            'highest_bid': market.fmt_price(market.price - spread),
+            'change_percentage': f"{change:.2f}",
+            'base_volume': market.fmt_amount(market.base_volume),
+            'quote_volume': f"{market.quote_volume:.2f}",
+            'high_24h': market.fmt_price(market.high_24h),
+            'low_24h': market.fmt_price(market.low_24h),
+        }
+
+    def tickers(self, pair=None):
+        with self.lock:
+            pairs = [pair] if pair else list(self.markets)
+            return [self.ticker(p) for p in pairs if p in self.markets]
+
+    def currency_pairs(self):
+        return [{
+            'id': m.pair,
+            'base': m.base,
+            'quote': m.quote,
+            'fee': f"{self.fee_rate * 100:g}",
+            'min_base_amount': str(m.min_base_amount),
+            'min_quote_amount': str(m.min_quote_amount),
+            'amount_precision': m.amount_precision,
+            'precision': m.precision,
+            'trade_status': 'tradable',
+            'sell_start': 0,
+            'buy_start': 0,
+        } for m in self.markets.values()]
+
+    def candlesticks(self, pair, limit=100):
+        with self.lock:
+            market = self.markets[pair]
+            rows = market.candles[-int(limit):]
+            return [[
+                str(ts), f"{qv:.8f}", market.fmt_price(c), market.fmt_price(h),
+                market.fmt_price(l), market.fmt_price(o), market.fmt_amount(bv), 'false'
+            ] for ts, o, h, l, c, bv, qv in rows]
+
+    def accounts(self, currency=None):
+        with self.lock:
+            return [
+                {'currency': cur, 'available': f"{b['available']:.8f}", 'locked': f"{b['locked']:.8f}"}
+                for cur, b in self.balances.items() if not currency or cur == currency
+            ]
+
+    ########################################
+    # Spot orders
+    ########################################
+
+    def create_order(self, body, now=None, match=True):
+        """Place a limit order. Raises ValueError(label, message) on reject."""
+        now = now or time.time()
+        with self.lock:
+            pair = body['currency_pair']
+            if pair not in self.markets:
+                raise ValueError('INVALID_CURRENCY_PAIR', f"Invalid currency pair {pair}")
+            market = self.markets[pair]
+            side = body['side']
+            amount = float(body['amount'])
+            price = float(body['price'])
+            self._check_precision(market, price, amount)
+            hold_cur, hold = (market.quote, amount * price) if side == 'buy' else (market.base, amount)
+            if self.balances[hold_cur]['available'] + 1e-12 < hold:
+                raise ValueError('BALANCE_NOT_ENOUGH', 'Not enough balance')
+            self.balances[hold_cur]['available'] -= hold
+            self.balances[hold_cur]['locked'] += hold
+
+            order_id = str(self._new_id())
+            order = {
+                'id': order_id,
+                'text': body.get('text', 'apiv4'),
+                'create_time': str(int(now)),
+                'update_time': str(int(now)),
+                'create_time_ms': int(now * 1000),
+                'update_time_ms': int(now * 1000),
+                'currency_pair': pair,
+                'status': 'open',
+                'type': 'limit',
+                'account': body.get('account', 'spot'),
+                'side': side,
+                'amount': market.fmt_amount(amount),
+                'price': market.fmt_price(price),
+                'time_in_force': body.get('time_in_force', 'gtc'),
+                'left': market.fmt_amount(amount),
+                'filled_total': '0',
+                'fee': '0',
+                'fee_currency': market.base if side == 'buy' else market.quote,
+                'point_fee': '0',
+                'gt_fee': '0',
+                'gt_discount': False,
+                'rebated_fee': '0',
+                'rebated_fee_currency': market.quote,
+                'finish_as': 'open',
+            }
+            self.orders[order_id] = order
+            self._emit('spot.orders', dict(order, event='put'))
+            if match:
+                self._match(market, now)
+            return dict(order)
+
+    def _check_precision(self, market, price, amount):
+        if round(price, market.precision) != round(price, 12):
+            raise ValueError('INVALID_PRECISION', f"Price {price} exceeds precision {market.precision}")
+        if round(amount, market.amount_precision) != round(amount, 12):
+            raise ValueError('INVALID_PRECISION', f"Amount {amount} exceeds precision {market.amount_precision}")
+        if amount < float(market.min_base_amount) or amount * price < float(market.min_quote_amount):
+            raise ValueError('INVALID_PARAM_VALUE', 'Order size below minimum')
+
+    def open_orders(self, pair=None):
+        with self.lock:
+            return [dict(o) for o in self.orders.values()
+                    if o['status'] == 'open' and (not pair or o['currency_pair'] == pair)]
+
+    def finished_orders(self, pair=None):
+        with self.lock:
+            return [dict(o) for o in self.orders.values()
+                    if o['status'] != 'open' and (not pair or o['currency_pair'] == pair)]
+
+    def get_order(self, order_id):
+        with self.lock:
+            if order_id not in self.orders:
+                raise KeyError('ORDER_NOT_FOUND')
+            return dict(self.orders[order_id])
+
+    def cancel_order(self, order_id, now=None):
+        now = now or time.time()
+        with self.lock:
+            order = self.orders.get(order_id)
+            if not order or order['status'] != 'open':
+                raise KeyError('ORDER_NOT_FOUND')
+            self._release(order)
+            order.update(status='cancelled', finish_as='cancelled',
+                         update_time=str(int(now)), update_time_ms=int(now * 1000))
+            self._emit('spot.orders', dict(order, event='finish'))
+            return dict(order)
+
+    def amend_order(self, order_id, body, now=None):
+        """PATCH an open order's price and/or amount, re-reserving funds."""
+        now = now or time.time()
+        with self.lock:
+            order = self.orders.get(order_id)
+            if not order or order['status'] != 'open':
+                raise KeyError('ORDER_NOT_FOUND')
+            market = self.markets[order['currency_pair']]
+            filled = float(order['amount']) - float(order['left'])
+            price = float(body.get('price') or order['price'])
+            amount = float(body.get('amount') or order['amount'])
+            if amount <= filled:
+                raise ValueError('INVALID_PARAM_VALUE', 'Amount must exceed the filled amount')
+            self._check_precision(market, price, amount - filled)
+            left = amount - filled
+            hold_cur, hold = (market.quote, left * price) if order['side'] == 'buy' else (market.base, left)
+            self._release(order)
+            if self.balances[hold_cur]['available'] + 1e-12 < hold:
+                # Put the old reservation back and reject
+                old = float(order['left']) * float(order['price']) if order['side'] == 'buy' else float(order['left'])
+                self.balances[hold_cur]['available'] -= old
+                self.balances[hold_cur]['locked'] += old
+                raise ValueError('BALANCE_NOT_ENOUGH', 'Not enough balance')
+            self.balances[hold_cur]['available'] -= hold
+            self.balances[hold_cur]['locked'] += hold
+            order.update(price=market.fmt_price(price), amount=market.fmt_amount(amount),
+                         left=market.fmt_amount(left), update_time=str(int(now)),
+                         update_time_ms=int(now * 1000))
+            self._emit('spot.orders', dict(order, event='update'))
+            self._match(market, now)
+            return dict(order)
+
+    def cancel_all(self, pair=None, side=None):
+        with self.lock:
+            return [self.cancel_order(o['id']) for o in self.open_orders(pair)
+                    if not side or o['side'] == side]
+
+    def _release(self, order):
+        market = self.markets[order['currency_pair']]
+        left = float(order['left'])
+        if order['side'] == 'buy':
+            cur, amount = market.quote, left * float(order['price'])
+        else:
+            cur, amount = market.base, left
+        self.balances[cur]['locked'] -= amount
+        self.balances[cur]['available'] += amount
+
+    def _fill(self, order, market, now):
+        amount = float(order['left'])
+        price = float(order['price'])
+        quote = amount * price
+        if order['side'] == 'buy':
+            self.balances[market.quote]['locked'] -= quote
+            fee = amount * self.fee_rate
+            self.balances[market.base]['available'] += amount - fee
+        else:
+            self.balances[market.base]['locked'] -= amount
+            fee = quote * self.fee_rate
+            self.balances[market.quote]['available'] += quote - fee
+        market.base_volume += amount
+        market.quote_volume += quote
+        market.candles[-1][5] += amount
+        market.candles[-1][6] += quote
+        order.update(status='closed', finish_as='filled', left='0',
+                     filled_total=f"{quote:.8f}", fee=f"{fee:.8f}",
+                     update_time=str(int(now)), update_time_ms=int(now * 1000))
+        self._emit('spot.orders', dict(order, event='finish'))
+
+    ########################################
+    # Price-triggered orders (/spot/price_orders)
+    ########################################
+
+    def create_price_order(self, body, now=None):
+        now = now or time.time()
+        with self.lock:
+            pair = body['market']
+            if pair not in self.markets:
+                raise ValueError('INVALID_CURRENCY_PAIR', f"Invalid currency pair {pair}")
+            trigger = body['trigger']
+            if trigger.get('rule') not in ('>=', '<='):
+                raise ValueError('INVALID_PARAM_VALUE', 'trigger.rule must be >= or <=')
+            order_id = self._new_id()
+            self.price_orders[order_id] = {
+                'id': order_id,
+                'user': 1,
+                'market': pair,
+                'trigger': {
+                    'price': str(trigger['price']),
+                    'rule': trigger['rule'],
+                    'expiration': int(trigger.get('expiration', 0)),
+                },
+                'put': dict(body['put']),
+                'status': 'open',
+                'ctime': int(now),
+                'ftime': 0,
+                'fired_order_id': 0,
+                'reason': '',
+            }
+            return {'id': order_id}
+
+    def price_orders_list(self, status='open', pair=None):
+        # The list filter is 'open' or 'finished'; a finished order's own
+        # status says how it ended: finish (fired), cancelled, expired or failed
+        with self.lock:
+            return [dict(o) for o in self.price_orders.values()
+                    if (o['status'] == 'open') == (status == 'open') and (not pair or o['market'] == pair)]
+
+    def get_price_order(self, order_id):
+        with self.lock:
+            if order_id not in self.price_orders:
+                raise KeyError('AUTO_ORDER_NOT_FOUND')
+            return dict(self.price_orders[order_id])
+
+    def cancel_price_order(self, order_id, now=None):
+        now = now or time.time()
+        with self.lock:
+            order = self.price_orders.get(order_id)
+            if not order or order['status'] != 'open':
+                raise KeyError('AUTO_ORDER_NOT_FOUND')
+            order.update(status='cancelled', ftime=int(now), reason='cancelled')
+            return dict(order)
+
+    def cancel_price_orders(self, pair=None):
+        with self.lock:
+            return [self.cancel_price_order(o['id']) for o in self.price_orders_list('open', pair)]
+
+    ########################################
+    # Matching
+    ########################################
+
+    def _match(self, market, now):
+        price = market.price
+        for order in list(self.price_orders.values()):
+            if order['status'] != 'open' or order['market'] != market.pair:
+                continue
+            trigger = order['trigger']
+            if trigger['expiration'] and now - order['ctime'] > trigger['expiration']:
+                order.update(status='expired', ftime=int(now), reason='expired')
+                continue
+            level = float(trigger['price'])
+            hit = price >= level if trigger['rule'] == '>=' else price <= level
+            if not hit:
+                continue
+            put = order['put']
+            try:
+                fired = self.create_order({
+                    'currency_pair': market.pair,
+                    'side': put['side'],
+                    'amount': put['amount'],
+                    'price': put['price'],
+                    'account': put.get('account', 'normal'),
+                    'time_in_force': put.get('time_in_force', 'gtc'),
+                    'text': 'price_order',
+                }, now, match=False)
+                order.update(status='finish', ftime=int(now), fired_order_id=int(fired['id']), reason='')
+            except ValueError as e:
+                order.update(status='failed', ftime=int(now), reason=e.args[-1])
+
+        for order in list(self.orders.values()):
+            if order['status'] != 'open' or order['currency_pair'] != market.pair:
+                continue
+            limit = float(order['price'])
+            if (order['side'] == 'buy' and price <= limit) or (order['side'] == 'sell' and price >= limit):
+                self._fill(order, market, now)
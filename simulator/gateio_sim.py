@@ -0,0 +1,436 @@
+"""
+Local stand-in for api.gateio.ws and ws.gate.io.
+
+Serves the REST endpoints GateIOAPIClient (via ccxt) and CryptoMonitor use
+and the spot.tickers / spot.orders WebSocket channels, on top of the
+random-walk matching engine in exchange.py. Latency, jitter and rate limits
+are configurable so every benchmark has a reproducible load target.
+
+    python simulator/gateio_sim.py --config simulator/config.yaml
+
+Then point a bot at it with api.base_url: http://127.0.0.1:8081/api/v4 and
+api.ws_base: ws://127.0.0.1:8082/v4 in its config.yaml.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl
+
+import yaml
+
+from exchange import SimExchange
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+HTTP_REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 429: 'Too Many Requests'}
+
+############################################
+# Rate limiting
+############################################
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def headers(self):
+        reset = int(time.time() + max(0.0, 1 - self.tokens) / self.rate)
+        return {
+            'X-Gate-RateLimit-Requests-Remain': str(int(self.tokens)),
+            'X-Gate-RateLimit-Limit': str(int(self.capacity)),
+            'X-Gate-RateLimit-Reset-Timestamp': str(reset),
+        }
+
+############################################
+# Simulator
+############################################
+
+class GateIOSimulator:
+    def __init__(self, settings):
+        self.settings = settings
+        self.exchange = SimExchange(settings)
+        self.exchange.listeners.append(self._on_exchange_event)
+        self.logger = logging.getLogger("GateIOSimulator")
+        self.rng = random.Random(settings.get('seed'))
+        limits = settings.get('rate_limit') or {}
+        self.buckets = {
+            'public': TokenBucket(limits.get('public_per_second', 200)),
+            'private': TokenBucket(limits.get('private_per_second', 200)),
+            'orders': TokenBucket(limits.get('orders_per_second', 10)),
+        }
+        self.ws_clients = set()
+        self.loop = None
+        self.servers = []
+        self.ready = threading.Event()
+        self.stats = {'rest_requests': 0, 'rate_limited': 0, 'ws_messages_sent': 0}
+
+    def _delay(self):
+        latency = self.settings.get('latency_ms', 0) / 1000
+        jitter = self.settings.get('jitter_ms', 0) / 1000
+        return max(0.0, latency + (self.rng.uniform(-jitter, jitter) if jitter else 0.0))
+
+    ########################################
+    # REST
+    ########################################
+
+    def _route(self, method, path, query, body):
+        """Return (status, payload)."""
+        ex = self.exchange
+        parts = [p for p in path.split('/') if p]
+        if parts[:2] != ['api', 'v4']:
+            return 404, {'label': 'NOT_FOUND', 'message': path}
+        parts = parts[2:]
+        pair = query.get('currency_pair')
+
+        if method == 'GET' and parts == ['spot', 'time']:
+            return 200, {'server_time': int(time.time() * 1000)}
+        if method == 'GET' and parts == ['spot', 'currency_pairs']:
+            return 200, ex.currency_pairs()
+        if method == 'GET' and parts[:2] == ['spot', 'currency_pairs'] and len(parts) == 3:
+            found = [p for p in ex.currency_pairs() if p['id'] == parts[2]]
+            return (200, found[0]) if found else (400, {'label': 'INVALID_CURRENCY_PAIR', 'message': parts[2]})
+        if method == 'GET' and parts == ['spot', 'currencies']:
+            currencies = sorted(ex.balances)
+            return 200, [{'currency': c, 'delisted': False, 'withdraw_disabled': False,
+                          'withdraw_delayed': False, 'deposit_disabled': False,
+                          'trade_disabled': False, 'chain': c} for c in currencies]
+        if method == 'GET' and parts == ['spot', 'tickers']:
+            return 200, ex.tickers(pair)
+        if method == 'GET' and parts == ['spot', 'candlesticks']:
+            return 200, ex.candlesticks(pair, query.get('limit', 100))
+        if method == 'GET' and parts[:1] in (['futures'], ['delivery'], ['options'], ['margin']):
+            # ccxt's load_markets also asks for margin/derivatives; there are none here
+            return 200, []
+
+        if method == 'GET' and parts == ['spot', 'accounts']:
+            return 200, ex.accounts(query.get('currency'))
+        if method == 'GET' and parts == ['spot', 'open_orders']:
+            grouped = {}
+            for order in ex.open_orders(pair):
+                grouped.setdefault(order['currency_pair'], []).append(order)
+            return 200, [{'currency_pair': p, 'total': len(o), 'orders': o} for p, o in grouped.items()]
+        if parts == ['spot', 'orders']:
+            if method == 'GET':
+                if query.get('status', 'open') == 'open':
+                    return 200, ex.open_orders(pair)
+                return 200, ex.finished_orders(pair)
+            if method == 'POST':
+                return 201, ex.create_order(body)
+            if method == 'DELETE':
+                return 200, ex.cancel_all(pair, query.get('side'))
+        if parts[:2] == ['spot', 'orders'] and len(parts) == 3:
+            if method == 'GET':
+                return 200, ex.get_order(parts[2])
+            if method == 'PATCH':
+                return 200, ex.amend_order(parts[2], body)
+            if method == 'DELETE':
+                return 200, ex.cancel_order(parts[2])
+
+        if parts == ['spot', 'price_orders']:
+            if method == 'POST':
+                return 201, ex.create_price_order(body)
+            if method == 'GET':
+                return 200, ex.price_orders_list(query.get('status', 'open'), query.get('market'))
+            if method == 'DELETE':
+                return 200, ex.cancel_price_orders(query.get('market'))
+        if parts[:2] == ['spot', 'price_orders'] and len(parts) == 3:
+            if method == 'GET':
+                return 200, ex.get_price_order(int(parts[2]))
+            if method == 'DELETE':
+                return 200, ex.cancel_price_order(int(parts[2]))
+
+        return 404, {'label': 'NOT_FOUND', 'message': f"{method} {path}"}
+
+    @staticmethod
+    def _bucket_for(method, path):
+        if '/spot/accounts' in path or '/open_orders' in path:
+            return 'private'
+        if '/spot/orders' in path or '/spot/price_orders' in path:
+            return 'private' if method == 'GET' else 'orders'
+        return 'public'
+
+    def handle_rest(self, method, target, body):
+        """Dispatch one REST call; returns (status, payload, headers)."""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        self.stats['rest_requests'] += 1
+
+        bucket_name = self._bucket_for(method, url.path)
+        bucket = self.buckets[bucket_name]
+        if not bucket.take():
+            self.stats['rate_limited'] += 1
+            return 429, {'label': 'TOO_MANY_REQUESTS', 'message': 'Request Rate limit Exceeded'}, bucket.headers()
+        headers = bucket.headers() if bucket_name != 'public' else {}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {'label': 'INVALID_REQUEST_BODY', 'message': 'Malformed JSON'}, headers
+        try:
+            status, result = self._route(method, url.path, query, payload)
+        except ValueError as e:
+            status, result = 400, {'label': e.args[0] if len(e.args) > 1 else 'INVALID_PARAM_VALUE', 'message': e.args[-1]}
+        except KeyError as e:
+            status, result = 404, {'label': e.args[0], 'message': 'Not found'}
+        return status, result, headers
+
+    async def _serve_http(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload, extra = self.handle_rest(method, target, body.decode('utf-8'))
+                delay = self._delay()
+                if delay:
+                    await asyncio.sleep(delay)
+
+                data = json.dumps(payload).encode('utf-8')
+                head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                        'Content-Type: application/json',
+                        f"Content-Length: {len(data)}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    ########################################
+    # WebSocket
+    ########################################
+
+    async def _serve_ws(self, reader, writer):
+        client = WSClient(writer)
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            key = headers.get('sec-websocket-key')
+            if not request_line or not key:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+                return
+            accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+            writer.write((
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode('latin-1'))
+            await writer.drain()
+            self.ws_clients.add(client)
+
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == 0x8:
+                    writer.write(encode_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:
+                    writer.write(encode_frame(0xA, payload))
+                    continue
+                if opcode == 0x1:
+                    self._on_ws_message(client, payload.decode('utf-8'))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.ws_clients.discard(client)
+            writer.close()
+
+    def _on_ws_message(self, client, text):
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        channel, event = msg.get('channel'), msg.get('event')
+        now = time.time()
+        reply = {'time': int(now), 'time_ms': int(now * 1000), 'id': msg.get('id'),
+                 'channel': channel, 'event': event, 'error': None}
+        if channel == 'spot.ping':
+            reply['channel'] = 'spot.pong'
+            reply['result'] = None
+        elif event in ('subscribe', 'unsubscribe'):
+            for item in msg.get('payload') or []:
+                # Accept BTC_USDT and the BTCUSDT form the bots send
+                key = (channel, str(item).replace('_', '').upper())
+                if event == 'subscribe':
+                    client.subscriptions.add(key)
+                else:
+                    client.subscriptions.discard(key)
+            reply['result'] = {'status': 'success'}
+        else:
+            reply['error'] = {'code': 1, 'message': 'unknown channel or event'}
+        self._send(client, reply)
+
+    def _send(self, client, message):
+        frame = encode_frame(0x1, json.dumps(message).encode('utf-8'))
+        delay = self._delay()
+        # Keep per-connection ordering under jitter, like a single TCP stream
+        deliver_at = max(self.loop.time() + delay, client.last_delivery)
+        client.last_delivery = deliver_at
+        if deliver_at <= self.loop.time():
+            client.write(frame)
+        else:
+            self.loop.call_at(deliver_at, client.write, frame)
+        self.stats['ws_messages_sent'] += 1
+
+    def _on_exchange_event(self, channel, result):
+        pair = result.get('currency_pair', '')
+        key = (channel, pair.replace('_', ''))
+        everything = (channel, '!ALL')
+        now = time.time()
+        message = {'time': int(now), 'time_ms': int(now * 1000), 'channel': channel, 'event': 'update',
+                   'result': [result] if channel == 'spot.orders' else result}
+        for client in list(self.ws_clients):
+            if key in client.subscriptions or everything in client.subscriptions:
+                self._send(client, message)
+
+    ########################################
+    # Lifecycle
+    ########################################
+
+    async def _ticker(self):
+        interval = self.settings.get('tick_interval', 0.1)
+        while True:
+            self.exchange.step()
+            await asyncio.sleep(interval)
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        host = self.settings.get('host', '127.0.0.1')
+        self.servers = [
+            await asyncio.start_server(self._serve_http, host, self.settings.get('rest_port', 8081)),
+            await asyncio.start_server(self._serve_ws, host, self.settings.get('ws_port', 8082)),
+        ]
+        ticker = asyncio.ensure_future(self._ticker())
+        self.logger.info(
+            f"Simulator listening: REST http://{host}:{self.settings.get('rest_port', 8081)}/api/v4, "
+            f"WS ws://{host}:{self.settings.get('ws_port', 8082)}/v4"
+        )
+        self.ready.set()
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in self.servers))
+        finally:
+            ticker.cancel()
+
+    def serve_forever(self):
+        try:
+            asyncio.run(self._main())
+        except asyncio.CancelledError:
+            pass
+
+    def start_in_thread(self):
+        """Run the simulator on a daemon thread (for benchmarks); returns once it listens."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        self.ready.wait(10)
+        return thread
+
+    def stop(self):
+        if self.loop:
+            for server in self.servers:
+                self.loop.call_soon_threadsafe(server.close)
+
+class WSClient:
+    def __init__(self, writer):
+        self.writer = writer
+        self.subscriptions = set()
+        self.last_delivery = 0.0
+
+    def write(self, frame):
+        if not self.writer.is_closing():
+            self.writer.write(frame)
+
+############################################
+# WebSocket framing (RFC 6455, server side)
+############################################
+
+async def read_frame(reader):
+    """Read one (possibly fragmented) client frame and return (opcode, payload)."""
+    message, opcode = b'', None
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        fin, frame_opcode = b1 & 0x80, b1 & 0x0F
+        length = b2 & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        mask = await reader.readexactly(4) if b2 & 0x80 else None
+        data = await reader.readexactly(length)
+        if mask:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        if frame_opcode >= 0x8:
+            # Control frames may be interleaved with fragments
+            return frame_opcode, data
+        if frame_opcode:
+            opcode = frame_opcode
+        message += data
+        if fin:
+            return opcode, message
+
+def encode_frame(opcode, payload):
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    return header + payload
+
+def load_settings(path):
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gate.io exchange simulator")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml'))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    simulator = GateIOSimulator(load_settings(args.config))
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Simulator stopped by user")
+
+if __name__ == "__main__":
+    main()
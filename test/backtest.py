@@ -0,0 +1,215 @@
+"""
+Vectorized backtest of TradingCore's stop-limit flip strategy.
+
+Replays ticks (or 1m candles expanded to an open/high/low/close path)
+through the same decisions as trading_bot.TradingCore:
+
+- place a buy (then sell, alternating) stop-limit at the last price
+  +/- trigger_price_adjust / limit_price_adjust
+- while waiting for the trigger, cancel and replace whenever the price
+  moves in our favour (buy: below last price, sell: above)
+- on fill, flip side and place the next order on the following tick
+
+Because a replace always re-anchors on the new price, the anchor of a
+buy leg is simply the running minimum of the prices since placement (the
+running maximum for a sell leg). Each leg is therefore resolved with
+NumPy accumulate/compare over array windows; Python only loops once per
+fill.
+
+    python backtest.py --data btc_usdt_1m.csv --candles
+"""
+import argparse
+import time
+
+import numpy as np
+import yaml
+
+def params_from_config(config):
+    """Strategy parameters from a trading config dict (config.yaml layout)."""
+    trading = config['trading']
+    return {
+        'buy_trigger': trading['buy']['trigger_price_adjust'],
+        'buy_limit': trading['buy']['limit_price_adjust'],
+        'sell_trigger': trading['sell']['trigger_price_adjust'],
+        'sell_limit': trading['sell']['limit_price_adjust'],
+        'buy_pct': trading['buy'].get('amount_percentage', 100),
+        'sell_pct': trading['sell'].get('amount_percentage', 100),
+    }
+
+def candles_to_ticks(open_, high, low, close):
+    """
+    Expand OHLC candles into a 4-point intra-candle path: open, then the
+    extreme nearer the close last (open-low-high-close for green candles,
+    open-high-low-close for red ones), then close.
+    """
+    green = close >= open_
+    first = np.where(green, low, high)
+    second = np.where(green, high, low)
+    return np.column_stack((open_, first, second, close)).ravel()
+
+def load_prices(path, candles=False):
+    """
+    Load a price series. .npy files are used as-is (1-D prices, or N x 4
+    OHLC with candles=True). CSV files need a header with a price/last/close
+    column, or open/high/low/close columns with candles=True.
+    Returns (prices, timestamps or None).
+    """
+    if path.endswith('.npy'):
+        data = np.load(path)
+        if candles:
+            return candles_to_ticks(*data[:, :4].T), None
+        return np.ascontiguousarray(data, dtype=np.float64), None
+
+    table = np.genfromtxt(path, delimiter=',', names=True, dtype=np.float64)
+    names = {n.lower(): n for n in table.dtype.names}
+    timestamps = None
+    for key in ('timestamp', 'time', 'ts'):
+        if key in names:
+            timestamps = table[names[key]]
+            break
+    if candles:
+        ohlc = [table[names[k]] for k in ('open', 'high', 'low', 'close')]
+        if timestamps is not None:
+            timestamps = np.repeat(timestamps, 4)
+        return candles_to_ticks(*ohlc), timestamps
+    for key in ('price', 'last', 'close'):
+        if key in names:
+            return np.ascontiguousarray(table[names[key]]), timestamps
+    raise ValueError(f"No price column in {path}: {table.dtype.names}")
+
+def _first(mask):
+    """Index of the first True in mask, or -1."""
+    idx = int(np.argmax(mask)) if mask.size else 0
+    return idx if mask.size and mask[idx] else -1
+
+def _find_fill(prices, start, limit, is_buy, window):
+    """First index >= start where a resting limit order at `limit` fills."""
+    n = len(prices)
+    pos = start
+    while pos < n:
+        end = min(pos + window, n)
+        seg = prices[pos:end]
+        k = _first(seg <= limit if is_buy else seg >= limit)
+        if k >= 0:
+            return pos + k
+        pos = end
+        window *= 2
+    return -1
+
+def _run_leg(prices, start, trigger_mult, limit_mult, is_buy, window=256):
+    """
+    Resolve one order leg placed at prices[start].
+    Returns (fill_index or -1, fill_price, replaces).
+    """
+    n = len(prices)
+    anchor = prices[start]
+    accumulate = np.minimum.accumulate if is_buy else np.maximum.accumulate
+    replaces = 0
+    pos = start + 1
+    while pos < n:
+        end = min(pos + window, n)
+        seg = prices[pos:end]
+        # prev_anchor[k]: last_price the bot holds when tick pos+k arrives
+        running = accumulate(np.concatenate(((anchor,), seg)))
+        prev_anchor = running[:-1]
+        if is_buy:
+            fired = seg >= prev_anchor * trigger_mult
+            moved = seg < prev_anchor
+        else:
+            fired = seg <= prev_anchor * trigger_mult
+            moved = seg > prev_anchor
+        k = _first(fired)
+        if k >= 0:
+            replaces += int(np.count_nonzero(moved[:k]))
+            limit = prev_anchor[k] * limit_mult
+            fill = _find_fill(prices, pos + k, limit, is_buy, window)
+            return fill, limit, replaces
+        replaces += int(np.count_nonzero(moved))
+        anchor = running[-1]
+        pos = end
+        window *= 2
+    return -1, 0.0, replaces
+
+def run_backtest(prices, params, fee_rate=0.002, initial_quote=1000.0, initial_base=0.0,
+                 first_side='buy', timestamps=None):
+    """
+    Replay prices through the flip strategy.
+    :param prices: 1-D float array of ticks
+    :param params: dict from params_from_config() (percent values)
+    Returns a dict with PnL, order/fill/replace counts and rates.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    mults = {
+        'buy': (1 + params['buy_trigger'] / 100, 1 + params['buy_limit'] / 100),
+        'sell': (1 - params['sell_trigger'] / 100, 1 - params['sell_limit'] / 100),
+    }
+    quote, base = float(initial_quote), float(initial_base)
+    side = first_side
+    fills = replaces = placements = 0
+    pos = 0
+    while pos < n - 1:
+        trigger_mult, limit_mult = mults[side]
+        placements += 1
+        fill, fill_price, leg_replaces = _run_leg(prices, pos, trigger_mult, limit_mult, side == 'buy')
+        replaces += leg_replaces
+        if fill < 0:
+            break
+        if side == 'buy':
+            spend = quote * params['buy_pct'] / 100
+            quote -= spend
+            base += spend / fill_price * (1 - fee_rate)
+        else:
+            amount = base * params['sell_pct'] / 100
+            base -= amount
+            quote += amount * fill_price * (1 - fee_rate)
+        fills += 1
+        side = 'sell' if side == 'buy' else 'buy'
+        pos = fill + 1
+
+    start_equity = initial_quote + initial_base * prices[0]
+    end_equity = quote + base * prices[-1]
+    hours = None
+    if timestamps is not None and len(timestamps) > 1:
+        span = float(timestamps[-1] - timestamps[0])
+        # Accept both second and millisecond epoch timestamps
+        hours = (span / 1000 if timestamps[0] > 1e11 else span) / 3600
+    orders = placements + replaces
+    return {
+        'ticks': n,
+        'pnl': end_equity - start_equity,
+        'return_pct': (end_equity / start_equity - 1) * 100 if start_equity else 0.0,
+        'fills': fills,
+        'orders': orders,
+        'replaces': replaces,
+        'replace_rate': replaces / max(orders, 1),
+        'replaces_per_fill': replaces / max(fills, 1),
+        'replaces_per_hour': replaces / hours if hours else None,
+        'rest_calls': placements + 2 * replaces,  # replace = cancel + create
+        'final_quote': quote,
+        'final_base': base,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the stop-limit flip strategy")
+    parser.add_argument('--data', required=True, help='CSV or .npy price history')
+    parser.add_argument('--candles', action='store_true', help='Data is 1m OHLC candles')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--fee', type=float, default=0.002)
+    parser.add_argument('--quote', type=float, default=1000.0, help='Initial quote balance')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    prices, timestamps = load_prices(args.data, args.candles)
+
+    start = time.perf_counter()
+    result = run_backtest(prices, params_from_config(config), args.fee, args.quote, timestamps=timestamps)
+    elapsed = time.perf_counter() - start
+
+    for key, value in result.items():
+        print(f"{key:>18}: {value:.6g}" if isinstance(value, float) else f"{key:>18}: {value}")
+    print(f"{'elapsed_s':>18}: {elapsed:.3f} ({result['ticks'] / max(elapsed, 1e-9):,.0f} ticks/s)")
+
+if __name__ == "__main__":
+    main()
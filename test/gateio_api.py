@@ -1,5 +1,13 @@
-import ccxt
+import os
+import sys
 import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from precision import PrecisionEngine  # noqa: E402  (shared with the UI bot in testing/)
+from control import RestStats  # noqa: E402
+
+DEFAULT_BASE_URL = "https://api.gateio.ws/api/v4"
 
 class GateIOAPIClient:
     def __init__(self, config):
@@ -9,29 +17,126 @@ class GateIOAPIClient:
         self.secret = self.config['secret']
         self.base_url = self.config['base_url']
         self.symbol = self.trading_config['currency_pair'].replace("_", "/")
-        self.exchange = ccxt.gateio({
-            'apiKey': self.key,
-            'secret': self.secret,
-            'enableRateLimit': True,
-        })
+        self.market_id = self.trading_config['currency_pair']
+        self.use_price_orders = self.trading_config.get('use_price_orders', False)
+        self.rules = None  # MarketRules, loaded with the markets on first order
+        self._exchange = None
+        self._exchange_lock = threading.Lock()
+        self.rest = RestStats()  # REST call counts and rate-limit headroom for /metrics
         self.logger = logging.getLogger("GateIOAPIClient")
-        self.logger.info(f"Initialized API client for {self.symbol}")
+        if self.base_url and self.base_url.rstrip('/') != DEFAULT_BASE_URL:
+            self.logger.info("Using REST base URL %s", self.base_url)
+        self.logger.info("Initialized API client for %s", self.symbol)
+
+    @property
+    def exchange(self):
+        """
+        The ccxt client, built on first use. Importing ccxt alone takes most
+        of a second, so startup defers it (see warm_up).
+        """
+        if self._exchange is None:
+            with self._exchange_lock:
+                if self._exchange is None:
+                    import ccxt
+                    exchange = ccxt.gateio({
+                        'apiKey': self.key,
+                        'secret': self.secret,
+                        'enableRateLimit': True,
+                    })
+                    if self.base_url and self.base_url.rstrip('/') != DEFAULT_BASE_URL:
+                        self._override_base_url(exchange.urls['api'])
+                    self._exchange = self.rest.instrument(exchange)
+        return self._exchange
+
+    @exchange.setter
+    def exchange(self, exchange):
+        self._exchange = exchange
+
+    def warm_up(self):
+        """
+        Import ccxt, build the client and load the market rules on a
+        background thread, overlapping the WebSocket connect. The first
+        REST call waits on the same lock if it arrives sooner.
+        """
+        def load():
+            try:
+                self.market_rules()
+            except Exception as e:
+                self.logger.warning("API client warm-up failed (retried on first use): %s", e)
+        threading.Thread(target=load, name="api-warm-up", daemon=True).start()
+
+    def apply_settings(self, settings):
+        """
+        Config reload: order sizing (amount_percentage) and price-order
+        expiration come from the new trading section. The ccxt client and
+        its markets cache are untouched.
+        """
+        self.trading_config = settings['trading']
 
-    def get_open_orders(self):
+    def _override_base_url(self, urls):
+        """Point every ccxt REST endpoint group at api.base_url (e.g. the local simulator)."""
+        for name, url in urls.items():
+            if isinstance(url, dict):
+                self._override_base_url(url)
+            elif isinstance(url, str) and url.rstrip('/').endswith('/api/v4'):
+                urls[name] = self.base_url.rstrip('/')
+
+    def market_rules(self):
+        """Precision/min-notional rules for this pair, built once from ccxt's market cache."""
+        if self.rules is None:
+            self.rules = PrecisionEngine.from_ccxt_markets(self.exchange.load_markets()).get(self.symbol)
+            self.logger.debug("Market rules: %s", self.rules)
+        return self.rules
+
+    def get_open_orders(self, strict=False):
+        """
+        :param strict: Re-raise API errors instead of returning [], so the
+                       trading loop can't mistake a failed listing for a fill
+        """
         self.logger.debug("Fetching open orders...")
         try:
             open_orders = self.exchange.fetch_open_orders(self.symbol)
-            self.logger.debug(f"Open orders: {open_orders}")
+            self.logger.debug("Open orders: %s", open_orders)
             return open_orders
         except Exception as e:
             self.logger.error(f"API Error (fetching open orders): {str(e)}")
+            if strict:
+                raise
             return []
 
+    def fetch_order_status(self, order_id):
+        """
+        One lookup of a single order: 'open', 'closed' (filled), 'canceled',
+        'fired' (price order triggered, its limit order now rests in the
+        normal open orders), 'expired' (price order never triggered) or
+        None if the order can't be found.
+        """
+        if self.use_price_orders:
+            try:
+                order = self.exchange.private_spot_get_price_orders_order_id({'order_id': order_id})
+                status = order.get('status')
+                self.logger.debug("Price order %s status: %s", order_id, status)
+                # Gate's price order statuses: open, finish, cancelled, failed, expired
+                if status == 'finish':
+                    return 'fired'
+                if status in ('open', 'expired'):
+                    return status
+                return 'canceled'
+            except Exception as e:
+                self.logger.debug("%s is not a price order: %s", order_id, e)
+        try:
+            order = self.exchange.fetch_order(order_id, self.symbol)
+            self.logger.debug("Order %s status: %s", order_id, order['status'])
+            return order['status']
+        except Exception as e:
+            self.logger.error(f"API Error (fetching order {order_id}): {str(e)}")
+            return None
+
     def cancel_order(self, order_id):
-        self.logger.debug(f"Attempting to cancel order: {order_id}")
+        self.logger.debug("Attempting to cancel order: %s", order_id)
         try:
             self.exchange.cancel_order(order_id, self.symbol)
-            self.logger.info(f"Cancelled order {order_id}.")
+            self.logger.info("Cancelled order %s.", order_id)
             return True
         except Exception as e:
             self.logger.error(f"Cancel Error for order {order_id}: {str(e)}")
@@ -40,6 +145,8 @@ class GateIOAPIClient:
     def cancel_all_orders(self, currency_pair):
         self.logger.debug("Cancelling all orders...")
         canceled_orders = []
+        if self.use_price_orders:
+            canceled_orders.extend(self.cancel_all_price_orders() or [])
         open_orders = self.get_open_orders()
         for order in open_orders:
             if order.get('symbol') == self.symbol:
@@ -47,13 +154,13 @@ class GateIOAPIClient:
                 if order_id and self.cancel_order(order_id):
                     canceled_orders.append(order_id)
         if canceled_orders:
-            self.logger.info(f"All orders canceled for {self.symbol}: {canceled_orders}")
+            self.logger.info("All orders canceled for %s: %s", self.symbol, canceled_orders)
         else:
-            self.logger.info(f"No open orders to cancel for {self.symbol}.")
+            self.logger.info("No open orders to cancel for %s.", self.symbol)
         return canceled_orders
 
     def calculate_order_amount(self, side, limit_price):
-        self.logger.debug(f"Calculating order amount for side: {side} at limit price: {limit_price}")
+        self.logger.debug("Calculating order amount for side: %s at limit price: %s", side, limit_price)
         balance = self.exchange.fetch_balance()
         base, quote = self.symbol.split('/')
     
@@ -61,17 +168,17 @@ class GateIOAPIClient:
             if side == 'buy':
                 buy_pct = self.trading_config['buy']['amount_percentage']
                 available_quote = balance[quote]['free']
-                self.logger.debug(f"Available {quote}: {available_quote}")
+                self.logger.debug("Available %s: %s", quote, available_quote)
                 quote_amount = (available_quote * buy_pct) / 100
                 amount = quote_amount / limit_price
-                self.logger.debug(f"Calculated buy amount (base currency): {amount}")
+                self.logger.debug("Calculated buy amount (base currency): %s", amount)
                 return amount
             elif side == 'sell':
                 sell_pct = self.trading_config['sell']['amount_percentage']
                 available_base = balance[base]['free']
-                self.logger.debug(f"Available {base}: {available_base}")
+                self.logger.debug("Available %s: %s", base, available_base)
                 amount = (available_base * sell_pct) / 100
-                self.logger.debug(f"Calculated sell amount (base currency): {amount}")
+                self.logger.debug("Calculated sell amount (base currency): %s", amount)
                 return amount
             else:
                 raise ValueError("Invalid side specified")
@@ -82,22 +189,27 @@ class GateIOAPIClient:
             self.logger.error("Invalid zero price encountered")
             return 0
 
-    def place_stop_limit_order(self, order_type, trigger_price, limit_price):
-        self.logger.info(f"Placing {order_type} stop-limit order with trigger: {trigger_price} and limit: {limit_price}")
+    def place_stop_limit_order(self, order_type, trigger_price, limit_price, amount=None):
+        """
+        :param amount: Base amount to reuse (e.g. from the order being replaced);
+                       computed from the free balance when None.
+        """
+        if self.use_price_orders:
+            return self.place_price_order(order_type, trigger_price, limit_price, amount)
+        self.logger.info("Placing %s stop-limit order with trigger: %s and limit: %s", order_type, trigger_price, limit_price)
         try:
-            amount = self.calculate_order_amount(order_type, limit_price)
-            if amount <= 0:
+            if amount is None:
+                amount = self.calculate_order_amount(order_type, limit_price)
+            if float(amount) <= 0:
                 self.logger.error("Invalid order amount calculated; order will not be placed.")
                 return None
 
-            market = self.exchange.market(self.symbol)
-            precision = market['precision']['amount']
-            self.logger.debug(f"Market precision: {precision}")
-            amount = self.exchange.amount_to_precision(self.symbol, amount)
-            self.logger.debug(f"Formatted amount: {amount}")
+            rules = self.market_rules()
+            limit_price, amount = rules.check_order(limit_price, float(amount))
+            self.logger.debug("Quantized limit: %s, amount: %s", limit_price, amount)
 
             params = {
-                'stopPrice': trigger_price,
+                'stopPrice': rules.price_str(trigger_price),
                 'type': 'limit',
                 'price': limit_price,
                 'amount': amount
@@ -110,8 +222,135 @@ class GateIOAPIClient:
                 price=limit_price,
                 params=params
             )
-            self.logger.info(f"Order placed: {order}")
+            self.logger.info("Order placed: %s", order)
             return order
         except Exception as e:
             self.logger.error(f"Order failed: {str(e)}")
             return None
+
+    def amend_order(self, order_id, order_type, limit_price, amount=None):
+        """Change a resting limit order's price in place (PATCH /spot/orders/{id})."""
+        self.logger.debug("Amending order %s to limit: %s", order_id, limit_price)
+        try:
+            limit_price = self.market_rules().price_str(limit_price)
+            order = self.exchange.edit_order(order_id, self.symbol, 'limit', order_type, amount, limit_price)
+            self.logger.info("Amended order %s: %s", order_id, order)
+            return order
+        except Exception as e:
+            self.logger.error(f"Amend Error for order {order_id}: {str(e)}")
+            return None
+
+    def replace_stop_limit_order(self, order, order_type, trigger_price, limit_price):
+        """
+        Move an order to new prices in as few REST calls as possible. A resting
+        limit order is amended in place (one call, never off the book). Gate.io
+        has no amend for price-triggered orders, and an amend can be rejected,
+        so those cases cancel and re-create with the amount still unfilled,
+        skipping the balance fetch (two calls). Returns the resulting order or None.
+        """
+        amount = self._unfilled_amount(order)
+        if 'trigger' in order:
+            # Native price-triggered order (/spot/price_orders)
+            if not self.cancel_price_order(order['id']):
+                return None
+            return self.place_price_order(order_type, trigger_price, limit_price, amount=amount)
+        is_trigger_order = order.get('triggerPrice') or order.get('stopPrice')
+        if not is_trigger_order:
+            amended = self.amend_order(order['id'], order_type, limit_price)
+            if amended:
+                return amended
+            self.logger.warning("Amend of %s failed; falling back to cancel and create", order['id'])
+        if not self.cancel_order(order['id']):
+            return None
+        return self.place_stop_limit_order(order_type, trigger_price, limit_price, amount=amount)
+
+    @staticmethod
+    def _unfilled_amount(order):
+        """The part of `order` still to trade; after a partial fill the original size would be rejected."""
+        if 'trigger' in order:
+            # Raw price order: nothing trades before it fires, so all of put.amount is unfilled
+            return order['put']['amount']
+        remaining = order.get('remaining')
+        return remaining if remaining is not None else order.get('amount')
+
+    ########################################
+    # Price-triggered orders (/spot/price_orders)
+    ########################################
+
+    def place_price_order(self, order_type, trigger_price, limit_price, amount=None):
+        """
+        Place a native price-triggered order: when the last price crosses
+        trigger_price (>= for buys, <= for sells) Gate.io puts a limit order
+        at limit_price. Returns {'id': ...} or None.
+        """
+        self.logger.info("Placing %s price order with trigger: %s and limit: %s", order_type, trigger_price, limit_price)
+        try:
+            if amount is None:
+                amount = self.calculate_order_amount(order_type, limit_price)
+            if float(amount) <= 0:
+                self.logger.error("Invalid order amount calculated; order will not be placed.")
+                return None
+            rules = self.market_rules()
+            limit_str, amount_str = rules.check_order(limit_price, float(amount))
+            body = {
+                'market': self.market_id,
+                'trigger': {
+                    'price': rules.price_str(trigger_price),
+                    'rule': '>=' if order_type == 'buy' else '<=',
+                    'expiration': self.trading_config.get('price_order_expiration', 86400),
+                },
+                'put': {
+                    'type': 'limit',
+                    'side': order_type,
+                    'price': limit_str,
+                    'amount': amount_str,
+                    'account': 'normal',
+                    'time_in_force': 'gtc',
+                },
+            }
+            response = self.exchange.private_spot_post_price_orders(body)
+            order = {'id': str(response['id']), 'trigger': body['trigger'], 'put': body['put'],
+                     'market': self.market_id, 'status': 'open'}
+            self.logger.info("Price order placed: %s", order)
+            return order
+        except Exception as e:
+            self.logger.error(f"Price order failed: {str(e)}")
+            return None
+
+    def get_price_orders(self, status='open', strict=False):
+        """
+        List this market's price-triggered orders ('open' or 'finished';
+        a finished order's status is finish, cancelled, failed or expired).
+        Returns None on error, or re-raises it when strict.
+        """
+        try:
+            orders = self.exchange.private_spot_get_price_orders({'status': status, 'market': self.market_id})
+            for order in orders:
+                order['id'] = str(order['id'])
+            self.logger.debug("Price orders (%s): %s", status, orders)
+            return orders
+        except Exception as e:
+            self.logger.error(f"API Error (fetching price orders): {str(e)}")
+            if strict:
+                raise
+            return None
+
+    def cancel_price_order(self, order_id):
+        try:
+            self.exchange.private_spot_delete_price_orders_order_id({'order_id': order_id})
+            self.logger.info("Cancelled price order %s.", order_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Cancel Error for price order {order_id}: {str(e)}")
+            return False
+
+    def cancel_all_price_orders(self):
+        """Cancel every open price-triggered order on this market in one call."""
+        try:
+            cancelled = self.exchange.private_spot_delete_price_orders({'market': self.market_id})
+            ids = [str(order['id']) for order in cancelled]
+            self.logger.info("Cancelled price orders for %s: %s", self.market_id, ids)
+            return ids
+        except Exception as e:
+            self.logger.error(f"API Error (cancelling price orders): {str(e)}")
+            return None
@@ -7,23 +7,36 @@ import hashlib
 import hmac
 
 class GateIOWebSocketClient:
-    def __init__(self, currency_pair, on_price_callback, api_key, api_secret):
+    def __init__(self, currency_pair, on_price_callback, api_key, api_secret, ws_url=None, recorder=None,
+                 feed=None, name="websocket"):
+        """
+        :param feed: RedundantFeed this connection belongs to; ticks go to
+                     feed.offer() instead of on_price_callback
+        :param name: Thread name
+        """
         if len(api_key) != 32 or len(api_secret) != 64:
             raise ValueError("Invalid API credentials format")
         self.api_key = api_key
         self.api_secret = api_secret
         self.currency_pair = currency_pair.replace('_', '')  # e.g. BTCUSDT
         self.on_price_callback = on_price_callback
-        self.ws_url = "wss://ws.gate.io/v4"
+        self.ws_url = ws_url or "wss://ws.gate.io/v4"
+        self.recorder = recorder  # ws_replay.FrameRecorder, or None
+        self.feed = feed
+        self.name = name
         self.ws = None
         self.thread = None
         self.price_lock = threading.Lock()
         self.current_price = None
+        self.connected = False
+        self.connects = 0  # successful handshakes; every one after the first is a reconnect
+        self.last_tick = None  # monotonic time of the last ticker update
+        self.connected_at = None
         self.logger = logging.getLogger("GateIOWebSocketClient")
-        self.logger.info(f"WebSocket client initialized for {self.currency_pair}")
+        self.logger.info("WebSocket client initialized for %s", self.currency_pair)
 
     def on_message(self, ws, message):
-        self.logger.debug(f"Received message: {message}")
+        self.logger.debug("Received message: %s", message)
         try:
             data = json.loads(message)
             if data.get('channel') != 'spot.tickers' or data.get('event') != 'update':
@@ -38,20 +51,42 @@ class GateIOWebSocketClient:
                 price = float(last_price)
                 with self.price_lock:
                     self.current_price = price
-                self.logger.debug(f"Updated current price: {price}")
-                self.on_price_callback(price)
+                self.last_tick = time.monotonic()
+                self.logger.debug("Updated current price: %s", price)
+                if self.feed:
+                    self.feed.offer(self, price, data.get('time_ms'))
+                else:
+                    self.on_price_callback(price, data.get('time_ms'))
             except (ValueError, TypeError) as e:
                 self.logger.error(f"Price parse error: {e}")
         except Exception as e:
             self.logger.error(f"Message processing failed: {e}")
 
+    def _record_and_handle(self, ws, message):
+        self.recorder.write(message)
+        self.on_message(ws, message)
+
+    @property
+    def reconnects(self):
+        return max(self.connects - 1, 0)
+
+    def close(self):
+        """Drop the current connection; start()'s loop reconnects right away."""
+        ws = self.ws
+        if ws:
+            ws.close()
+
     def on_error(self, ws, error):
         self.logger.error(f"WebSocket Error: {error}")
 
     def on_close(self, ws, close_status_code, close_msg):
-        self.logger.info(f"WebSocket closed: {close_status_code} - {close_msg}")
+        self.connected = False
+        self.logger.info("WebSocket closed: %s - %s", close_status_code, close_msg)
 
     def on_open(self, ws):
+        self.connected = True
+        self.connected_at = time.monotonic()
+        self.connects += 1
         self.logger.info("WebSocket connection opened, sending subscription message.")
         try:
             timestamp = int(time.time())
@@ -82,7 +117,7 @@ class GateIOWebSocketClient:
         self.ws = websocket.WebSocketApp(
             self.ws_url,
             on_open=self.on_open,
-            on_message=self.on_message,
+            on_message=self._record_and_handle if self.recorder else self.on_message,
             on_error=self.on_error,
             on_close=self.on_close
         )
@@ -95,7 +130,7 @@ class GateIOWebSocketClient:
     def update_price(self, price):
         with self.price_lock:
             self.current_price = price
-        self.logger.debug(f"Price manually updated to: {price}")
+        self.logger.debug("Price manually updated to: %s", price)
         
     def start(self):
         self.logger.info("Starting WebSocket thread...")
@@ -107,9 +142,122 @@ class GateIOWebSocketClient:
                     self.run()
                     retry_count = 0  # Reset on successful connection
                 except Exception as e:
+                    self.connected = False
                     retry_count += 1
                     timeout = min(2 ** retry_count, 30)  # Exponential backoff
                     self.logger.error(f"WebSocket connection error. Reconnecting in {timeout}s: {e}")
                     time.sleep(timeout)
-        self.thread = threading.Thread(target=run_forever, daemon=True)
+        self.thread = threading.Thread(target=run_forever, name=self.name, daemon=True)
         self.thread.start()
+
+class RedundantFeed:
+    """
+    Two or more GateIOWebSocketClient connections subscribed to the same
+    ticker channel. Every update arrives once per connection; the first
+    copy is passed on and the rest dropped, so each tick is as fast as the
+    fastest connection and one socket reconnecting leaves no blind window.
+
+    Updates are ordered by the exchange's time_ms. A copy with the time_ms
+    (and price) already delivered is a duplicate; one older than that is
+    late, from a connection lagging behind. A watchdog thread closes a
+    connection that has gone quiet for stale_after seconds while another
+    still receives ticks; its own loop then reconnects it in the background.
+
+    Drop-in for GateIOWebSocketClient in TradingCore (start, current_price,
+    connected, connects, reconnects).
+    """
+
+    def __init__(self, currency_pair, on_price_callback, api_key, api_secret, ws_url=None,
+                 connections=2, stale_after=10.0):
+        if connections < 2:
+            raise ValueError("RedundantFeed needs at least 2 connections")
+        self.on_price_callback = on_price_callback
+        self.stale_after = stale_after
+        self.members = [
+            GateIOWebSocketClient(currency_pair, on_price_callback, api_key, api_secret, ws_url,
+                                  feed=self, name=f"websocket#{index}")
+            for index in range(connections)
+        ]
+        self.lock = threading.Lock()
+        self.current_price = None
+        self.last_time_ms = None
+        self.stats = {member.name: {'won': 0, 'duplicate': 0, 'late': 0} for member in self.members}
+        self.replaced = 0
+        self.closed_at = {}  # member name -> when the watchdog last closed it
+        self.stopped = threading.Event()
+        self.logger = logging.getLogger("RedundantFeed")
+
+    @property
+    def connected(self):
+        return any(member.connected for member in self.members)
+
+    @property
+    def connects(self):
+        return sum(member.connects for member in self.members)
+
+    @property
+    def reconnects(self):
+        return sum(member.reconnects for member in self.members)
+
+    def offer(self, member, price, time_ms):
+        """Called on each connection's thread with every ticker update it parsed."""
+        with self.lock:
+            last = self.last_time_ms
+            if time_ms is not None and last is not None:
+                if time_ms < last:
+                    self.stats[member.name]['late'] += 1
+                    return
+                if time_ms == last and price == self.current_price:
+                    self.stats[member.name]['duplicate'] += 1
+                    return
+            elif time_ms is None and price == self.current_price:
+                # No exchange timestamp to order by; an unchanged price is a copy either way
+                self.stats[member.name]['duplicate'] += 1
+                return
+            self.stats[member.name]['won'] += 1
+            self.current_price = price
+            if time_ms is not None:
+                self.last_time_ms = time_ms
+            # Under the lock so ticks reach the callback in exchange order
+            self.on_price_callback(price, time_ms)
+
+    def update_price(self, price):
+        with self.lock:
+            self.current_price = price
+
+    def start(self):
+        self.logger.info("Starting %s redundant WebSocket connections", len(self.members))
+        for member in self.members:
+            member.start()
+        threading.Thread(target=self._watchdog, name="ws-feed-watchdog", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _watchdog(self):
+        while not self.stopped.wait(min(1.0, self.stale_after / 2)):
+            now = time.monotonic()
+            ticks = [member.last_tick for member in self.members if member.last_tick is not None]
+            # A quiet market is quiet on every connection; only act when another is live
+            if not ticks or now - max(ticks) > self.stale_after:
+                continue
+            for member in self.members:
+                silent_since = max(member.last_tick or 0, member.connected_at or 0,
+                                   self.closed_at.get(member.name, 0))
+                if member.connected and now - silent_since > self.stale_after:
+                    self.logger.warning("%s has had no ticks for %.1fs while others do; reconnecting it",
+                                        member.name, now - silent_since)
+                    self.closed_at[member.name] = now
+                    self.replaced += 1
+                    member.close()
+
+    def metrics(self, prefix):
+        """Per-connection message outcomes for control.render."""
+        with self.lock:
+            samples = [({'connection': name, 'result': result}, count)
+                       for name, counts in self.stats.items() for result, count in counts.items()]
+        return [
+            (f'{prefix}_ws_messages_total', 'counter',
+             'Ticker updates per connection: won (delivered first), duplicate, late', samples),
+            (f'{prefix}_ws_replaced_total', 'counter', 'Silent connections closed by the watchdog', self.replaced),
+        ]
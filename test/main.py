@@ -1,42 +1,54 @@
+import os
 import logging
 import sys
-import yaml
 from trading_bot import TradingCore
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_logging import setup_logging  # noqa: E402  (shared with the UI bot)
+from config_model import BotConfig, ConfigWatcher  # noqa: E402
+from control import ControlServer  # noqa: E402
+from profiler import SamplingProfiler  # noqa: E402
+
+CONFIG_PATH = 'config.yaml'
+
 def load_config():
+    """Load and validate config.yaml once; returns a BotConfig."""
     try:
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        settings = BotConfig.load(CONFIG_PATH)
         logging.debug("Configuration loaded successfully.")
-        return config
+        return settings
     except Exception as e:
         logging.critical(f"Config loading error: {str(e)}")
         sys.exit(1)
 
-def setup_logging(log_config):
-    handlers = []
-    if log_config.get('enabled', True):
-        handlers.append(logging.FileHandler(log_config.get('file', 'trading_bot.log')))
-        handlers.append(logging.StreamHandler())
-    logging.basicConfig(
-        level=log_config.get('level', 'INFO'),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=handlers
-    )
-    logging.info("Logging is set up.")
-
 def main():
-    config = load_config()
+    settings = load_config()
+    config = settings.raw
     setup_logging(config['logging'])
+    logging.info("Logging is set up.")
     logging.info("Starting trading bot")
+    watcher = None
+    control = None
     try:
-        trader = TradingCore(config)
+        # Installed before TradingCore so a profile can cover startup too
+        profiler = SamplingProfiler.from_config(config.get('profiler'))
+        trader = TradingCore(config, settings)
+        if profiler:
+            profiler.phase_of = trader
+        control = ControlServer.from_config(trader, config.get('control'), profiler)
+        interval = config['trading'].get('config_reload_interval', 1.0)
+        if interval:
+            watcher = ConfigWatcher(CONFIG_PATH, trader.apply_settings, interval).start().reload_on_sighup()
         trader.manage_orders()
     except KeyboardInterrupt:
         logging.info("Stopped by user")
     except Exception as e:
         logging.critical(f"Fatal error: {str(e)}")
     finally:
+        if watcher:
+            watcher.stop()
+        if control:
+            control.stop()
         logging.info("Trading session ended")
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import time
+from collections import deque
+
+class ReplacePolicy:
+    """
+    Decides when a resting stop-limit order is worth cancelling and
+    replacing. The original rule replaced on any favourable tick; this adds
+    hysteresis on top of it, configured under trading.replace_policy:
+
+      min_delta_ticks          price must move at least this many ticks ...
+      tick_size                ... of this size (0 disables the tick rule)
+      min_delta_bps            ... and at least this many basis points
+      min_order_age            seconds an order must rest before a replace
+      max_replaces_per_minute  rolling replace budget (0 = unlimited)
+      coalesce_seconds         a qualifying move must persist this long, so a
+                               burst of ticks produces one replace at the end
+
+    Missing settings default to 0, which reproduces the original behaviour.
+    """
+
+    def __init__(self, settings=None):
+        self.configure(settings)
+        self.recent = deque()
+        self.pending_since = None
+        self.suppressed = {'delta': 0, 'age': 0, 'budget': 0, 'coalesce': 0}
+
+    def configure(self, settings=None):
+        """Set the thresholds; on a config reload the replace budget and counters carry over."""
+        settings = settings or {}
+        self.min_delta_ticks = settings.get('min_delta_ticks', 0)
+        self.tick_size = settings.get('tick_size', 0)
+        self.min_delta_bps = settings.get('min_delta_bps', 0)
+        self.min_order_age = settings.get('min_order_age', 0)
+        self.max_per_minute = settings.get('max_replaces_per_minute', 0)
+        self.coalesce_seconds = settings.get('coalesce_seconds', 0)
+
+    def min_delta(self, anchor_price):
+        return max(self.min_delta_ticks * self.tick_size, anchor_price * self.min_delta_bps / 10000)
+
+    def should_replace(self, order_type, anchor_price, current_price, placed_at, now=None):
+        """
+        True when the order placed at `placed_at` off `anchor_price` should be
+        replaced at `current_price`. Counts each suppressed replace by reason.
+        """
+        now = time.time() if now is None else now
+        if order_type == 'buy':
+            move = anchor_price - current_price
+        else:
+            move = current_price - anchor_price
+        if move <= 0:
+            self.pending_since = None
+            return False
+        if move < self.min_delta(anchor_price):
+            self.pending_since = None
+            self.suppressed['delta'] += 1
+            return False
+        if now - placed_at < self.min_order_age:
+            self.suppressed['age'] += 1
+            return False
+        if self.max_per_minute:
+            while self.recent and now - self.recent[0] >= 60:
+                self.recent.popleft()
+            if len(self.recent) >= self.max_per_minute:
+                self.suppressed['budget'] += 1
+                return False
+        if self.coalesce_seconds:
+            if self.pending_since is None:
+                self.pending_since = now
+            if now - self.pending_since < self.coalesce_seconds:
+                self.suppressed['coalesce'] += 1
+                return False
+        return True
+
+    def record_replace(self, now=None):
+        self.recent.append(time.time() if now is None else now)
+        self.pending_since = None
+
+    def reset(self):
+        """Forget the pending burst, e.g. after a fill or recovery."""
+        self.pending_since = None
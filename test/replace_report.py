@@ -0,0 +1,119 @@
+"""
+Tick replay comparing the original replace-on-every-favourable-tick rule
+with the configured trading.replace_policy.
+
+Each tick goes through the same decisions as TradingCore (trigger check,
+then ReplacePolicy.should_replace), so the policy's time-based rules (order
+age, per-minute budget, coalescing) see realistic timestamps. Reports
+REST calls saved and the effect on fills and PnL.
+
+    python replace_report.py --data btc_usdt_1m.csv --candles
+    python replace_report.py --data ticks.npy --tick-interval 0.2
+"""
+import argparse
+
+import numpy as np
+import yaml
+
+from backtest import load_prices, params_from_config
+from replace_policy import ReplacePolicy
+
+def replay(prices, times, params, policy, fee_rate=0.002, initial_quote=1000.0):
+    """Per-tick replay of the flip strategy with `policy` deciding replaces."""
+    mults = {
+        'buy': (1 + params['buy_trigger'] / 100, 1 + params['buy_limit'] / 100),
+        'sell': (1 - params['sell_trigger'] / 100, 1 - params['sell_limit'] / 100),
+    }
+    quote, base = float(initial_quote), 0.0
+    side = 'buy'
+    anchor = placed_at = limit = None
+    triggered = False
+    placements = replaces = fills = 0
+
+    for price, now in zip(prices.tolist(), times.tolist()):
+        if anchor is None:
+            anchor, placed_at, triggered = price, now, False
+            placements += 1
+            continue
+        is_buy = side == 'buy'
+        if not triggered:
+            trigger_mult, limit_mult = mults[side]
+            if (price >= anchor * trigger_mult) if is_buy else (price <= anchor * trigger_mult):
+                triggered = True
+                limit = anchor * limit_mult
+            elif policy.should_replace(side, anchor, price, placed_at, now):
+                policy.record_replace(now)
+                replaces += 1
+                anchor, placed_at = price, now
+                continue
+        if triggered and ((price <= limit) if is_buy else (price >= limit)):
+            if is_buy:
+                spend = quote * params['buy_pct'] / 100
+                quote -= spend
+                base += spend / limit * (1 - fee_rate)
+            else:
+                amount = base * params['sell_pct'] / 100
+                base -= amount
+                quote += amount * limit * (1 - fee_rate)
+            fills += 1
+            side = 'sell' if is_buy else 'buy'
+            anchor = None
+            policy.reset()
+
+    return {
+        'placements': placements,
+        'replaces': replaces,
+        'rest_calls': placements + 2 * replaces,  # replace = cancel + create
+        'fills': fills,
+        'pnl': quote + base * prices[-1] - initial_quote,
+        'suppressed': dict(policy.suppressed),
+    }
+
+def tick_times(timestamps, count, candles, tick_interval):
+    """Seconds since start for every tick."""
+    if timestamps is None:
+        return np.arange(count) * tick_interval
+    times = np.asarray(timestamps, dtype=np.float64)
+    if times[0] > 1e11:
+        times = times / 1000
+    if candles:
+        # Spread the four open/low/high/close points across the minute
+        times = times + np.tile([0, 15, 30, 45], count // 4)
+    return times - times[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Report REST calls saved by trading.replace_policy")
+    parser.add_argument('--data', required=True, help='CSV or .npy price history')
+    parser.add_argument('--candles', action='store_true', help='Data is 1m OHLC candles')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--tick-interval', type=float, default=None,
+                        help='Seconds between ticks when the data has no timestamps '
+                             '(default trading.price_poll_interval)')
+    parser.add_argument('--fee', type=float, default=0.002)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    params = params_from_config(config)
+    prices, timestamps = load_prices(args.data, args.candles)
+    interval = args.tick_interval or config['trading'].get('price_poll_interval', 0.2)
+    times = tick_times(timestamps, len(prices), args.candles, interval)
+
+    settings = config['trading'].get('replace_policy') or {}
+    baseline = replay(prices, times, params, ReplacePolicy(), args.fee)
+    policy = replay(prices, times, params, ReplacePolicy(settings), args.fee)
+
+    hours = (times[-1] - times[0]) / 3600 or 1
+    print(f"{len(prices):,} ticks over {hours:.1f} h, policy: {settings or 'none configured'}\n")
+    print(f"{'':<14} {'baseline':>12} {'policy':>12}")
+    for key in ('placements', 'replaces', 'rest_calls', 'fills'):
+        print(f"{key:<14} {baseline[key]:>12,} {policy[key]:>12,}")
+    print(f"{'pnl':<14} {baseline['pnl']:>12.2f} {policy['pnl']:>12.2f}")
+    print(f"{'calls/hour':<14} {baseline['rest_calls'] / hours:>12.1f} {policy['rest_calls'] / hours:>12.1f}")
+
+    saved = baseline['rest_calls'] - policy['rest_calls']
+    print(f"\nREST calls saved: {saved:,} ({saved / max(baseline['rest_calls'], 1):.1%})")
+    print("Replaces suppressed by: " + ', '.join(f"{k} {v:,}" for k, v in policy['suppressed'].items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import json
+import os
+import time
+import logging
+
+class StateJournal:
+    """
+    Append-only JSON-lines journal of TradingCore's OrderState.
+
+    Records are written straight to the OS (surviving a process crash) and
+    fsynced in batches: immediately for durable records (order placed,
+    replaced, filled), otherwise at most every fsync_interval seconds.
+    After compact_every records the journal is rewritten atomically as a
+    single snapshot. A torn last line from a crash mid-write is truncated
+    on load.
+
+    Record ops:
+      state   full OrderState after a change
+      intent  an order is about to be sent; lets a restart adopt an order
+              whose create response was lost in a crash
+    """
+
+    def __init__(self, path, fsync_interval=0.05, compact_every=1000):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.logger = logging.getLogger("StateJournal")
+        self.state = None    # last 'state' record
+        self.intent = None   # 'intent' record not yet followed by a state
+        self.records = 0
+        self._load()
+        self.file = open(path, 'a')
+        self.last_sync = time.monotonic()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self._apply(record)
+                self.records += 1
+                good_end += len(line)
+            torn = f.seek(0, os.SEEK_END) > good_end
+        if torn:
+            # Drop the partial record so new appends start on a clean line
+            self.logger.warning("Truncating torn journal record")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+
+    def _apply(self, record):
+        if record['op'] == 'state':
+            self.state = record
+            self.intent = None
+        elif record['op'] == 'intent':
+            self.intent = record
+
+    def append(self, record, durable=False):
+        record['ts'] = time.time()
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+        self._apply(record)
+        self.records += 1
+        now = time.monotonic()
+        if durable or now - self.last_sync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self.last_sync = now
+        if self.records >= self.compact_every:
+            self.compact()
+
+    def record_state(self, state, durable=True):
+        self.append({
+            'op': 'state',
+            'active': state.active,
+            'order_type': state.order_type,
+            'last_price': state.last_price,
+            'order_id': state.order_id,
+            'placed_at': state.placed_at,
+        }, durable)
+
+    def record_intent(self, order_type, last_price):
+        self.append({'op': 'intent', 'order_type': order_type, 'last_price': last_price}, durable=True)
+
+    def compact(self):
+        """Rewrite the journal as one snapshot (plus a pending intent)."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            for record in (self.state, self.intent):
+                if record:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(tmp, self.path)
+        self.file = open(self.path, 'a')
+        self.records = (self.state is not None) + (self.intent is not None)
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    def reconcile(self, state, open_orders, order_status=None):
+        """
+        Rebuild `state` (an empty OrderState) from the journal and one
+        open-orders listing. Returns the orders that are open but not ours
+        to keep (duplicates from a crash mid-replace) so the caller can
+        cancel them, plus a short description of the decision.
+
+        :param order_status: callable(order_id) -> final status ('closed',
+                             'fired', 'canceled', 'expired' or None), asked
+                             when the journaled order is no longer open
+        """
+        saved, intent = self.state, self.intent
+        if saved:
+            state.order_type = saved['order_type']
+            state.last_price = saved['last_price']
+        ids = [str(order['id']) for order in open_orders]
+
+        if saved and saved['active'] and str(saved['order_id']) in ids:
+            state.active = True
+            state.order_id = saved['order_id']
+            state.placed_at = saved['placed_at']
+            keep, action = str(saved['order_id']), f"resumed order {saved['order_id']}"
+        elif open_orders:
+            # Create response lost, or the trigger fired and put a new order
+            adopted = open_orders[0]
+            state.active = True
+            state.order_id = str(adopted['id'])
+            state.placed_at = time.time()
+            if intent:
+                state.order_type = intent['order_type']
+                state.last_price = intent['last_price']
+            keep, action = state.order_id, f"adopted open order {state.order_id}"
+        elif saved and saved['active']:
+            # Nothing open: it filled, or expired/was cancelled, while we were down
+            status = order_status(saved['order_id']) if order_status else None
+            keep = None
+            if status in ('closed', 'fired'):
+                state.active = False
+                state.order_type = 'sell' if saved['order_type'] == 'buy' else 'buy'
+                action = f"order {saved['order_id']} filled while stopped"
+            elif status in ('canceled', 'expired'):
+                state.active = False
+                action = f"order {saved['order_id']} {status} while stopped"
+            else:
+                # Can't tell; leave it active so the caller settles it
+                state.active = True
+                state.order_id = saved['order_id']
+                state.placed_at = saved['placed_at']
+                action = f"order {saved['order_id']} gone, status {status}"
+        else:
+            keep, action = None, "no live order"
+
+        extra = [order for order in open_orders if str(order['id']) != keep]
+        return extra, action
@@ -0,0 +1,226 @@
+"""
+Parallel parameter sweep over the trigger/limit adjust percentages.
+
+Evaluates a grid or random search of buy/sell trigger_price_adjust and
+limit_price_adjust with backtest.run_backtest across all CPU cores. The
+price series is copied once into shared memory and every worker maps it
+as a NumPy view, so tasks only carry parameter rows.
+
+Results are appended as one .npz chunk of columns per finished batch to
+the output directory. An interrupted sweep picks up where it left off:
+parameter sets whose index already appears in a chunk are skipped.
+
+    python sweep.py --data btc_usdt_1m.csv --candles --out sweep_btc \\
+        --buy-trigger 0.05:0.5:0.05 --buy-limit 0.1:1.0:0.1
+    python sweep.py --data prices.npy --out sweep_rand --random 5000
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool, cpu_count, shared_memory
+
+import numpy as np
+import yaml
+
+from backtest import load_prices, params_from_config, run_backtest
+
+PARAM_NAMES = ('buy_trigger', 'buy_limit', 'sell_trigger', 'sell_limit')
+RESULT_COLUMNS = ('pnl', 'return_pct', 'fills', 'orders', 'replaces', 'replace_rate', 'rest_calls')
+
+############################################
+# Parameter space
+############################################
+
+def parse_range(spec):
+    """'start:stop:step' (inclusive) or a comma list -> sorted array of percents."""
+    if ':' in spec:
+        start, stop, step = (float(x) for x in spec.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return np.round(start + step * np.arange(count), 10)
+    return np.array(sorted(float(x) for x in spec.split(',')))
+
+def build_grid(ranges):
+    """Cartesian product of the per-parameter value arrays, one row per set."""
+    return np.array(list(itertools.product(*(ranges[name] for name in PARAM_NAMES))), dtype=np.float64)
+
+def build_random(ranges, count, seed):
+    """Uniform samples between each parameter's min and max value."""
+    rng = np.random.default_rng(seed)
+    low = np.array([ranges[name].min() for name in PARAM_NAMES])
+    high = np.array([ranges[name].max() for name in PARAM_NAMES])
+    return np.round(rng.uniform(low, high, size=(count, len(PARAM_NAMES))), 6)
+
+############################################
+# Shared-memory workers
+############################################
+
+_worker = {}
+
+def _init_worker(shm_name, length, base_params, fee_rate, initial_quote):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm  # keep the mapping alive for the view below
+    _worker['prices'] = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+    _worker['base_params'] = base_params
+    _worker['fee_rate'] = fee_rate
+    _worker['initial_quote'] = initial_quote
+
+def _run_batch(batch):
+    """Backtest a batch of (index, param row) pairs; returns result columns."""
+    indices, rows = batch
+    columns = {name: np.empty(len(indices)) for name in RESULT_COLUMNS}
+    for i, row in enumerate(rows):
+        params = dict(_worker['base_params'])
+        params.update(zip(PARAM_NAMES, row))
+        result = run_backtest(_worker['prices'], params, _worker['fee_rate'], _worker['initial_quote'])
+        for name in RESULT_COLUMNS:
+            columns[name][i] = result[name]
+    columns['index'] = indices
+    return columns
+
+############################################
+# Columnar result store
+############################################
+
+class ResultStore:
+    """
+    Append-only directory of .npz column chunks plus a meta.json that pins
+    the parameter space, so a resumed run can't mix incompatible sweeps.
+    """
+
+    def __init__(self, path, meta):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if existing != meta:
+                raise ValueError(f"{path} holds a different sweep; use another --out directory")
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f, indent=2)
+        chunks = self._chunk_files()
+        self.next_chunk = int(chunks[-1][-10:-4]) + 1 if chunks else 0
+
+    def _chunk_files(self):
+        return sorted(glob.glob(os.path.join(self.path, 'chunk_*.npz')))
+
+    def done_indices(self):
+        done = [np.load(path)['index'] for path in self._chunk_files()]
+        return np.concatenate(done) if done else np.empty(0, dtype=np.int64)
+
+    def append(self, columns):
+        final = os.path.join(self.path, f'chunk_{self.next_chunk:06d}.npz')
+        tmp = final + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **columns)
+            f.flush()
+            os.fsync(f.fileno())
+        # Rename is atomic: a crash leaves either a full chunk or a stray .tmp
+        os.replace(tmp, final)
+        self.next_chunk += 1
+
+    def load(self):
+        """All results as one dict of columns, ordered by parameter index."""
+        chunks = [dict(np.load(path)) for path in self._chunk_files()]
+        if not chunks:
+            return {}
+        merged = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+        order = np.argsort(merged['index'])
+        return {key: values[order] for key, values in merged.items()}
+
+############################################
+# Runner
+############################################
+
+def run_sweep(prices, param_rows, store, base_params, fee_rate=0.002, initial_quote=1000.0,
+              workers=None, batch_size=16):
+    """Evaluate every not-yet-stored parameter row; returns the number run."""
+    done = set(store.done_indices().tolist())
+    todo = np.array([i for i in range(len(param_rows)) if i not in done], dtype=np.int64)
+    if not len(todo):
+        return 0
+
+    shm = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=shm.buf)[:] = prices
+        batches = [(todo[i:i + batch_size], param_rows[todo[i:i + batch_size]])
+                   for i in range(0, len(todo), batch_size)]
+        initargs = (shm.name, len(prices), base_params, fee_rate, initial_quote)
+        with Pool(workers or cpu_count(), initializer=_init_worker, initargs=initargs) as pool:
+            finished = 0
+            started = time.perf_counter()
+            for columns in pool.imap_unordered(_run_batch, batches):
+                store.append(columns)
+                finished += len(columns['index'])
+                rate = finished / (time.perf_counter() - started)
+                print(f"\r{finished}/{len(todo)} parameter sets ({rate:.1f}/s)", end='', flush=True)
+            print()
+    finally:
+        shm.close()
+        shm.unlink()
+    return len(todo)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep trigger/limit adjust percentages")
+    parser.add_argument('--data', required=True, help='CSV or .npy price history')
+    parser.add_argument('--candles', action='store_true', help='Data is 1m OHLC candles')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--out', required=True, help='Result directory (resumed if it exists)')
+    parser.add_argument('--random', type=int, default=0, help='Random search with N samples instead of a grid')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--fee', type=float, default=0.002)
+    parser.add_argument('--quote', type=float, default=1000.0, help='Initial quote balance')
+    parser.add_argument('--top', type=int, default=10, help='Print the N best parameter sets')
+    for name in PARAM_NAMES:
+        parser.add_argument('--' + name.replace('_', '-'), default=None,
+                            help='start:stop:step or a comma list (default: value from config)')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    base_params = params_from_config(config)
+    ranges = {}
+    for name in PARAM_NAMES:
+        spec = getattr(args, name)
+        ranges[name] = parse_range(spec) if spec else np.array([float(base_params[name])])
+
+    if args.random:
+        param_rows = build_random(ranges, args.random, args.seed)
+    else:
+        param_rows = build_grid(ranges)
+
+    prices, _ = load_prices(args.data, args.candles)
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    meta = {
+        'data': os.path.abspath(args.data),
+        'ticks': len(prices),
+        'candles': args.candles,
+        'fee_rate': args.fee,
+        'initial_quote': args.quote,
+        'params': list(PARAM_NAMES),
+        'ranges': {name: ranges[name].tolist() for name in PARAM_NAMES},
+        'random': args.random,
+        'seed': args.seed,
+    }
+    store = ResultStore(args.out, meta)
+    print(f"{len(param_rows)} parameter sets over {len(prices):,} ticks")
+    run_sweep(prices, param_rows, store, base_params, args.fee, args.quote, args.workers, args.batch_size)
+
+    results = store.load()
+    if not results:
+        return
+    best = np.argsort(results['pnl'])[::-1][:args.top]
+    print(f"{'pnl':>12} {'fills':>7} {'replaces':>9}  " + ' '.join(f'{n:>12}' for n in PARAM_NAMES))
+    for i in best:
+        row = param_rows[results['index'][i]]
+        print(f"{results['pnl'][i]:>12.2f} {int(results['fills'][i]):>7} {int(results['replaces'][i]):>9}  "
+              + ' '.join(f'{v:>12.4g}' for v in row))
+
+if __name__ == "__main__":
+    main()
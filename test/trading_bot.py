@@ -1,206 +1,562 @@
+import os
+import sys
 import time
 import logging
+import threading
 from gateio_api import GateIOAPIClient
-from gateio_websocket import GateIOWebSocketClient
+from gateio_websocket import GateIOWebSocketClient, RedundantFeed
+from replace_policy import ReplacePolicy
+from trailing import TrailingStopManager
+from state_journal import StateJournal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reconcile import Reconciler, DesyncError, TRANSIENT, REJECTED, DESYNC  # noqa: E402  (shared with the UI bot)
+from config_model import BotConfig  # noqa: E402
+from control import RateMeter, Histogram  # noqa: E402
+from profiler import phase, MONITORING, PLACING, CANCELLING, RECOVERING  # noqa: E402
+from price_snapshot import LatestPrice, StalePriceError  # noqa: E402
 
 class OrderState:
-def init(self):
-self.active = False
-self.order_type = None  # 'buy' or 'sell'
-self.last_price = None
-self.order_id = None
+    def __init__(self):
+        self.active = False
+        self.order_type = None  # 'buy' or 'sell'
+        self.last_price = None
+        self.order_id = None
+        self.placed_at = None
 
 class TradingCore:
-def init(self, config):
-self.config = config
-self.api = GateIOAPIClient(config)
-self.state = OrderState()
-self.logger = logging.getLogger("TradingCore")
-self.current_price = None
-self.logger.info("Initializing TradingCore...")
-
-Initialize WebSocket client with credentials
-
-self.ws_client = GateIOWebSocketClient(
-currency_pair=self.config['trading']['currency_pair'],
-on_price_callback=self.update_price,
-api_key=self.config['api']['key'],
-api_secret=self.config['api']['secret']
-)
-self.ws_client.start()
-self.logger.info("WebSocket client started. Fetching initial market price...")
-self.current_price = self._fetch_initial_price()
-self.logger.info(f"Initial market price: {self.current_price}")
-
-def _fetch_initial_price(self):
-try:
-ticker = self.api.exchange.fetch_ticker(self.api.symbol)
-price = float(ticker['last'])
-self.logger.debug(f"Fetched initial ticker: {ticker}")
-return price
-except Exception as e:
-self.logger.critical(f"Initial price fetch failed: {str(e)}")
-raise SystemExit(1)
-
-def update_price(self, price):
-self.current_price = price
-self.logger.debug(f"Price updated via callback: {price}")
-
-def _calculate_prices(self, last_price, order_type):
-self.logger.debug(f"Calculating prices for {order_type} order with last price: {last_price}")
-if order_type == 'buy':
-trigger = last_price * (1 + self.config['trading'][order_type]['trigger_price_adjust'] / 100)
-limit = last_price * (1 + self.config['trading'][order_type]['limit_price_adjust'] / 100)
-elif order_type == 'sell':
-trigger = last_price * (1 - self.config['trading'][order_type]['trigger_price_adjust'] / 100)
-limit = last_price * (1 - self.config['trading'][order_type]['limit_price_adjust'] / 100)
-self.logger.debug(f"Calculated trigger: {trigger}, limit: {limit}")
-return trigger, limit
-
-def _place_new_order(self):
-last_price = self._get_market_price()
-order_type = self.state.order_type or 'buy'
-self.logger.info(f"Placing new {order_type} order based on last price: {last_price}")
-trigger, limit = self._calculate_prices(last_price, order_type)
-
-order = self.api.place_stop_limit_order(order_type, trigger, limit)
-if order:
-self.logger.info(f"New order placed: {order}")
-self.state.active = True
-self.state.order_type = order_type
-self.state.last_price = last_price
-self.state.order_id = order['id']
-else:
-self.logger.error("Failed to place new order.")
-
-def _monitor_active_order(self, order):
-current_price = self._get_market_price()
-self.logger.debug(f"Monitoring active order. Current price: {current_price}, Order last price: {self.state.last_price}")
-if self.state.order_type == 'buy' and current_price < self.state.last_price:
-self.logger.info("Price dropped below last price; cancelling buy order.")
-self._cancel_and_replace(order)
-return
-elif self.state.order_type == 'sell' and current_price > self.state.last_price:
-self.logger.info("Price rose above last price; cancelling sell order.")
-self._cancel_and_replace(order)
-return
-else:
-self.logger.debug("No conditions met for cancellation.")
-
-def _cancel_and_replace(self, order):
-self.logger.info(f"Cancelling order: {order['id']} and replacing it.")
-try:
-if self.api.cancel_order(order['id']):
-self.state.active = False
-new_price = self._get_market_price()
-trigger, limit = self._calculate_prices(new_price, self.state.order_type)
-new_order = self.api.place_stop_limit_order(self.state.order_type, trigger, limit)
-if new_order:
-self.logger.info(f"Replaced order successfully with new order: {new_order}")
-self.state.last_price = new_price
-self.state.active = True
-self.state.order_id = new_order['id']
-else:
-self.logger.error("Failed to place replacement order.")
-else:
-self.logger.error("Cancellation of order failed.")
-except Exception as e:
-self.logger.error(f"Replace failed: {str(e)}")
-self._recover_state()
-
-def _handle_order_execution(self):
-self.logger.info("Order executed successfully.")
-self.state.active = False
-
-Flip order type for next trade
-
-self.state.order_type = 'sell' if self.state.order_type == 'buy' else 'buy'
-self.logger.info(f"Next order type set to: {self.state.order_type}")
-
-def _get_market_price(self):
-self.logger.debug("Fetching current market price...")
-start_time = time.time()
-while self.current_price is None:
-if time.time() - start_time > 5:
-self.logger.error("No price update received from websocket within 5 seconds.")
-break
-time.sleep(0.01)
-self.logger.debug(f"Current market price is: {self.current_price}")
-return self.current_price
-
-def _recover_state(self):
-self.logger.info("Initiating state recovery...")
-max_retries = 3
-recovered = False
-preserved_order_type = self.state.order_type  # Capture current order type
-
-for attempt in range(max_retries):
-try:
-
-1. Cancel all existing orders
-
-canceled = self.api.cancel_all_orders(self.config['trading']['currency_pair'])
-open_orders = self.api.get_open_orders()
-
-if open_orders:
-self.logger.error(f"Failed to cancel orders: {open_orders}")
-raise Exception("Order cancellation failed")
-
-# 2. Reset state while preserving order type        
-self.state = OrderState()        
-self.state.order_type = preserved_order_type  # Restore order type        
-    
-# 3. Add fallback to initial state        
-if self.state.order_type is None:        
-    self.state.order_type = 'buy'  # Default initial state        
-        
-recovered = True        
-break
-
-except Exception as e:
-self.logger.error(f"Recovery attempt {attempt+1} failed: {str(e)}")
-time.sleep(2 ** attempt)
-
-if not recovered:
-self.logger.critical("State recovery failed after multiple attempts!")
-
-Add emergency shutdown logic here
-
-self.logger.info(f"State recovery completed. Resuming with order type: {self.state.order_type}")
-
-def manage_orders(self):
-trade_count = 0
-max_trades = self.config['trading'].get('trade_limit')
-
-self.logger.info("Starting order management loop.")
-while True:
-if max_trades is not None and trade_count >= max_trades:
-self.logger.info("Trade limit reached. Exiting trading loop.")
-break
-
-try:
-open_orders = self.api.get_open_orders()
-self.logger.debug(f"Open orders: {open_orders}")
-
-if not open_orders:        
-    if not self.state.active:        
-        self.logger.info("No active orders - placing initial order")        
-        self._place_new_order()        
-    else:        
-        self.logger.info("Order executed successfully")        
-        self._handle_order_execution()        
-        trade_count += 1  # Only increment when orders complete        
-else:        
-    self.logger.debug("Monitoring existing orders")        
-    self._monitor_active_order(open_orders[0])        
-
-# Use websocket-driven price updates instead of sleep        
-time.sleep(self.config['trading']['price_poll_interval'])
-
-except KeyboardInterrupt:
-self.logger.info("Stopped by user")
-break
-except Exception as e:
-self.logger.error(f"Error in manage_orders loop: {str(e)}")
-self._recover_state()
-time.sleep(1)  # Prevent tight error loops
+    def __init__(self, config, settings=None):
+        self.config = config
+        # Validated view of config for the hot paths; swapped whole on reload
+        self.settings = settings or BotConfig(config)
+        self.api = GateIOAPIClient(config)
+        # ccxt imports and loads markets in the background while the WebSocket connects
+        self.api.warm_up()
+        self.state = OrderState()
+        self.replace_policy = ReplacePolicy(config['trading'].get('replace_policy'))
+        self.logger = logging.getLogger("TradingCore")
+        self.prices = LatestPrice()  # PriceSnapshot per tick; current_price reads it
+        self.phase = MONITORING  # tags profiler samples (profiler.py)
+        self.logger.info("Initializing TradingCore...")
+
+        # Read by the control endpoint (control.py) on its own thread
+        self.ticks = RateMeter()
+        self.decision_latency = Histogram()
+        self.price_age = Histogram()  # age of the price each decision used
+        self.order_events = {'placed': 0, 'replaced': 0, 'filled': 0, 'cancelled': 0, 'failed': 0}
+        # Commands from the control endpoint, checked between decisions
+        self.paused = threading.Event()
+        self.stopping = threading.Event()
+
+        # Cheapest repair per error class; cancel-all recovery only as a last resort
+        self.reconciler = Reconciler(
+            {TRANSIENT: self._retry_later, REJECTED: self._drop_rejected, DESYNC: self._lookup_order},
+            self._recover_state,
+            config['trading'].get('reconcile_max_attempts', 3)
+        )
+
+        # Serializes order decisions between this loop and the trailing worker
+        self.order_lock = threading.RLock()
+        self.trailer = None
+        if (config['trading'].get('trailing') or {}).get('enabled'):
+            self.trailer = TrailingStopManager(self.api, self.settings, self.replace_policy, self.order_lock)
+            self.trailer.on_replaced = self._on_trailed
+            self.trailer.start()
+
+        # Initialize WebSocket client with credentials; api.ws_connections > 1
+        # keeps parallel connections and takes each tick from the fastest
+        connections = self.config['api'].get('ws_connections', 1)
+        if connections > 1:
+            self.ws_client = RedundantFeed(
+                self.config['trading']['currency_pair'], self.update_price,
+                self.config['api']['key'], self.config['api']['secret'],
+                ws_url=self.config['api'].get('ws_base'),
+                connections=connections,
+                stale_after=self.config['api'].get('ws_stale_after', 10.0)
+            )
+        else:
+            self.ws_client = GateIOWebSocketClient(
+                currency_pair=self.config['trading']['currency_pair'],
+                on_price_callback=self.update_price,
+                api_key=self.config['api']['key'],
+                api_secret=self.config['api']['secret'],
+                ws_url=self.config['api'].get('ws_base')
+            )
+        self.ws_client.start()
+        self.logger.info("WebSocket client started. Fetching initial market price...")
+        self._fetch_initial_price()
+        self.logger.info("Initial market price: %s", self.current_price)
+
+        journal_path = config['trading'].get('state_journal', 'order_state.journal')
+        self.journal = StateJournal(journal_path) if journal_path else None
+        if self.journal:
+            self._restore_state()
+
+    def _restore_state(self):
+        """Resume the journaled order after a restart with one open-orders query."""
+        if not self.journal.state and not self.journal.intent:
+            return
+        open_orders = self._fetch_active_orders()
+        extra, action = self.journal.reconcile(self.state, open_orders, self.api.fetch_order_status)
+        self.logger.info("Restored state from journal: %s", action)
+        for order in extra:
+            self.logger.warning("Cancelling stray order %s left by the previous run", order['id'])
+            self.order_events['cancelled'] += 1
+            if 'trigger' in order:
+                self.api.cancel_price_order(order['id'])
+            else:
+                self.api.cancel_order(order['id'])
+        if self.state.active:
+            live = next((o for o in open_orders if str(o['id']) == str(self.state.order_id)), None)
+            if live is None:
+                self.logger.warning("Journaled order %s is not open and its outcome is unknown", self.state.order_id)
+                with phase(self, RECOVERING):
+                    self._recover_state()
+            elif self.trailer:
+                self.trailer.track(live, self.state.order_type, self.state.last_price)
+        self._save_state()
+
+    def _save_state(self, durable=True):
+        if self.journal:
+            with self.order_lock:
+                self.journal.record_state(self.state, durable)
+
+    def _fetch_initial_price(self):
+        """
+        The first WebSocket tick if one arrives within
+        trading.initial_price_wait seconds (no REST call, no waiting on
+        ccxt), else the REST ticker.
+        """
+        deadline = time.monotonic() + self.config['trading'].get('initial_price_wait', 2.0)
+        while time.monotonic() < deadline:
+            if self.current_price is not None:
+                return self.current_price
+            time.sleep(0.01)
+        try:
+            ticker = self.api.exchange.fetch_ticker(self.api.symbol)
+            price = float(ticker['last'])
+            self.logger.debug("Fetched initial ticker: %s", ticker)
+            if self.prices.snapshot is None:  # a WS tick that arrived meanwhile is newer
+                self.prices.publish(price, ticker.get('timestamp'))
+            return price
+        except Exception as e:
+            self.logger.critical(f"Initial price fetch failed: {str(e)}")
+            raise SystemExit(1)
+
+    @property
+    def current_price(self):
+        return self.prices.price
+
+    def update_price(self, price, exchange_ms=None):
+        self.prices.publish(price, exchange_ms)
+        self.ticks.mark()
+        self.logger.debug("Price updated via callback: %s", price)
+        if self.trailer and not self.paused.is_set():
+            self.trailer.on_tick(price)
+
+    def _on_trailed(self, order, anchor):
+        """TrailingStopManager moved (or failed to move) the exchange order."""
+        if order:
+            self.state.last_price = anchor
+            self.state.order_id = order['id']
+            self.state.placed_at = time.time()
+            self.order_events['replaced'] += 1
+        else:
+            self.order_events['failed'] += 1
+            try:
+                survivor = self._settle_failed_replace(self.state.order_id)
+            except Exception as e:
+                # Leave the state as it is; the trading loop reconciles it
+                self.logger.error(f"Could not check order {self.state.order_id} after the failed trail: {str(e)}")
+                survivor = None
+            if survivor is not None:
+                # The cancel failed too, so the order still rests: keep trailing it
+                self.trailer.track(survivor, self.state.order_type, self.state.last_price)
+        self._save_state()
+
+    def apply_settings(self, settings):
+        """
+        Hot reload: swap in a validated BotConfig between decisions (under
+        order_lock). Price multipliers, amount_percentage,
+        price_poll_interval, trade_limit, replace_policy and trailing
+        tolerance take effect on the next decision. The WebSocket, the ccxt
+        markets cache, the journal and the live order stay as they are;
+        resting orders keep their prices until next replaced.
+        """
+        restart = self.settings.restart_required(settings)
+        if restart:
+            self.logger.error("Config reload refused, these settings need a restart: %s", ', '.join(restart))
+            return False
+        with self.order_lock:
+            self.settings = settings
+            self.config = settings.raw
+            self.api.apply_settings(settings)
+            self.replace_policy.configure(settings['trading'].get('replace_policy'))
+            if self.trailer:
+                self.trailer.apply_settings(settings)
+        buy, sell = settings.trading.buy, settings.trading.sell
+        self.logger.info("Settings reloaded: buy trigger/limit x%s/x%s, sell trigger/limit x%s/x%s",
+                         buy.trigger_mult, buy.limit_mult, sell.trigger_mult, sell.limit_mult)
+        return True
+
+    ########################################
+    # Control endpoint (control.py)
+    ########################################
+
+    def pause(self):
+        """Stop deciding (and trailing); the resting order is left as it is."""
+        self.paused.set()
+
+    def resume(self):
+        self.paused.clear()
+
+    def stop(self):
+        """Leave manage_orders after the current decision. The journal resumes the order on restart."""
+        self.stopping.set()
+        self.paused.clear()
+
+    def metrics(self):
+        """[(name, type, help, samples)] for control.render; runs on the control thread."""
+        return [
+            ('trading_ticks_total', 'counter', 'WebSocket price ticks received', self.ticks.count),
+            ('trading_tick_rate', 'gauge', 'Price ticks per second', round(self.ticks.rate(), 3)),
+            ('trading_decision_seconds', 'histogram', 'Duration of one order decision', self.decision_latency),
+            ('trading_orders_total', 'counter', 'Order churn by event',
+             [({'event': event}, count) for event, count in self.order_events.items()]),
+            ('trading_errors_total', 'counter', 'Loop errors by class (reconcile.py)',
+             [({'kind': kind}, count) for kind, count in self.reconciler.stats.items()]),
+            ('trading_order_active', 'gauge', 'Whether an order is resting', int(self.state.active)),
+            ('trading_paused', 'gauge', 'Whether decisions are paused', int(self.paused.is_set())),
+            ('trading_ws_connected', 'gauge', 'Whether the WebSocket is connected', int(self.ws_client.connected)),
+            ('trading_ws_reconnects_total', 'counter', 'WebSocket reconnects', self.ws_client.reconnects),
+            ('trading_price_checks_total', 'counter',
+             'Price reads for decisions: fresh, waited for a fresh one, refused as stale',
+             [({'result': result}, count) for result, count in self.prices.checks.items()]),
+            ('trading_price_age_seconds', 'histogram', 'Age of the price each decision used', self.price_age),
+        ] + self._snapshot_metrics() + self.api.rest.metrics('trading') + (
+            self.ws_client.metrics('trading') if isinstance(self.ws_client, RedundantFeed) else [])
+
+    def _snapshot_metrics(self):
+        snapshot = self.prices.snapshot
+        if snapshot is None:
+            return []
+        metrics = [('trading_price_seq', 'gauge', 'Sequence number of the latest tick', snapshot.seq),
+                   ('trading_price_staleness_seconds', 'gauge', 'Age of the latest tick', round(snapshot.age(), 3))]
+        if snapshot.lag is not None:
+            metrics.append(('trading_price_exchange_lag_seconds', 'gauge',
+                            'Exchange timestamp to local receipt of the latest tick', round(snapshot.lag, 3)))
+        return metrics
+
+    def _calculate_prices(self, last_price, order_type):
+        self.logger.debug("Calculating prices for %s order with last price: %s", order_type, last_price)
+        trigger, limit = self.settings.trading.side(order_type).prices(last_price)
+        self.logger.debug("Calculated trigger: %s, limit: %s", trigger, limit)
+        return trigger, limit
+
+    def _place_new_order(self):
+        last_price = self._get_market_price()
+        order_type = self.state.order_type or 'buy'
+        self.logger.info("Placing new %s order based on last price: %s", order_type, last_price)
+        trigger, limit = self._calculate_prices(last_price, order_type)
+
+        if self.journal:
+            self.journal.record_intent(order_type, last_price)
+        if self.trailer and self.trailer.native:
+            order = self.trailer.place_native(order_type, last_price)
+        else:
+            order = self.api.place_stop_limit_order(order_type, trigger, limit)
+        if order:
+            self.logger.info("New order placed: %s", order,
+                             extra={'event': 'order_placed', 'side': order_type, 'order_id': order['id'],
+                                    'anchor': last_price, 'trigger': trigger, 'limit': limit})
+            if self.trailer:
+                self.trailer.track(order, order_type, last_price)
+            self.state.active = True
+            self.state.order_type = order_type
+            self.state.last_price = last_price
+            self.state.order_id = order['id']
+            self.state.placed_at = time.time()
+            self.order_events['placed'] += 1
+            self.replace_policy.reset()
+            self._save_state()
+        else:
+            self.order_events['failed'] += 1
+            self.logger.error("Failed to place new order.")
+
+    def _monitor_active_order(self, order):
+        current_price = self._get_market_price()
+        self.logger.debug("Monitoring active order. Current price: %s, Order last price: %s", current_price, self.state.last_price)
+        placed_at = self.state.placed_at or 0
+        if self.replace_policy.should_replace(self.state.order_type, self.state.last_price, current_price, placed_at):
+            if self.state.order_type == 'buy':
+                self.logger.info("Price dropped below last price; cancelling buy order.")
+            else:
+                self.logger.info("Price rose above last price; cancelling sell order.")
+            with phase(self, CANCELLING):
+                self._cancel_and_replace(order)
+            return
+        else:
+            self.logger.debug("No conditions met for cancellation.")
+
+    def _cancel_and_replace(self, order):
+        self.logger.info("Replacing order: %s", order['id'])
+        # Outside the try: a stale price skips the decision in manage_orders
+        new_price = self._get_market_price()
+        try:
+            trigger, limit = self._calculate_prices(new_price, self.state.order_type)
+            # Amends in place when possible, else cancel + create
+            new_order = self.api.replace_stop_limit_order(order, self.state.order_type, trigger, limit)
+            if new_order:
+                self.logger.info("Replaced order successfully with: %s", new_order,
+                                 extra={'event': 'order_replaced', 'side': self.state.order_type,
+                                        'order_id': new_order['id'], 'replaced_id': order['id'],
+                                        'anchor': new_price, 'trigger': trigger, 'limit': limit})
+                self.state.last_price = new_price
+                self.state.active = True
+                self.state.order_id = new_order['id']
+                self.state.placed_at = time.time()
+                self.order_events['replaced'] += 1
+                self.replace_policy.record_replace(self.state.placed_at)
+            else:
+                self.order_events['failed'] += 1
+                self.logger.error("Failed to replace order.")
+                self._settle_failed_replace(order['id'])
+            self._save_state()
+        except Exception as e:
+            self.logger.error(f"Replace failed: {str(e)}")
+            with phase(self, RECOVERING):
+                self.reconciler.handle(e)
+
+    def _settle_failed_replace(self, order_id):
+        """
+        A replace failed part way, so the old order may still rest. Keep it
+        active while it is listed; clear the state only once the exchange
+        confirms it went without trading (a fill is left to the next loop,
+        which counts it). Returns the surviving order or None.
+        """
+        survivor = next((o for o in self._fetch_active_orders() if str(o['id']) == str(order_id)), None)
+        if survivor is not None:
+            self.logger.warning("Order %s is still open after the failed replace; keeping it", order_id)
+            self.state.active = True
+            return survivor
+        status = self.api.fetch_order_status(order_id)
+        if status in ('canceled', 'expired'):
+            self.logger.info("Order %s is %s; placing the %s order again", order_id, status, self.state.order_type)
+            self.state.active = False
+        return None
+
+    def _handle_order_execution(self):
+        self.logger.info("Order executed successfully.",
+                         extra={'event': 'order_filled', 'side': self.state.order_type, 'order_id': self.state.order_id})
+        self.state.active = False
+        self.order_events['filled'] += 1
+        self.replace_policy.reset()
+        if self.trailer:
+            self.trailer.untrack()
+
+        # Flip order type for next trade
+        self.state.order_type = 'sell' if self.state.order_type == 'buy' else 'buy'
+        self.logger.info("Next order type set to: %s", self.state.order_type)
+        self._save_state()
+
+    def _settle_missing_order(self):
+        """
+        The tracked order left the open orders: look up how it ended before
+        switching sides. True if it filled. A price order that expired (or
+        was cancelled) never traded, so the same side is placed again.
+        """
+        order_id = self.state.order_id
+        status = self.api.fetch_order_status(order_id) if order_id is not None else None
+        self.logger.debug("Order %s left the open orders as %s", order_id, status)
+        if status in ('closed', 'fired'):
+            # A fired price order with nothing open means the limit order it put filled too
+            self._handle_order_execution()
+            return True
+        if status == 'open':
+            return False  # the listing lagged behind; look again next loop
+        if status in ('canceled', 'expired'):
+            self.logger.warning("Order %s was %s without trading; placing the %s order again",
+                                order_id, status, self.state.order_type)
+            self.state.active = False
+            self.order_events['cancelled'] += 1
+            if self.trailer:
+                self.trailer.untrack()
+            self._save_state()
+            return False
+        raise DesyncError(f"order {order_id} left the open orders, status unknown ({status})")
+
+    def _get_market_price(self):
+        """
+        Price for an order decision: waits up to 5 s for one within
+        trading.price_staleness_budget, else raises StalePriceError.
+        """
+        snapshot = self.prices.fresh(self.settings.trading.price_staleness_budget)
+        self.price_age.observe(snapshot.age())
+        self.logger.debug("Current market price is: %s", snapshot)
+        return snapshot.price
+
+    def _fetch_active_orders(self):
+        """
+        Orders belonging to the current leg. With native price orders the
+        untriggered order is in /spot/price_orders; once it fires, the limit
+        order it put rests in the normal open orders until filled.
+        """
+        if not self.api.use_price_orders:
+            return self.api.get_open_orders(strict=True)
+        price_orders = self.api.get_price_orders('open', strict=True)
+        if price_orders:
+            return price_orders
+        return self.api.get_open_orders(strict=True)
+
+    ########################################
+    # Targeted repairs (see reconcile.py)
+    ########################################
+
+    def _retry_later(self, exc, attempt):
+        """Transient: nothing changed on the exchange, so back off and let the next loop retry."""
+        time.sleep(min(0.5 * 2 ** (attempt - 1), 4))
+        return True
+
+    def _drop_rejected(self, exc, attempt):
+        """
+        Rejected: the exchange refused the request, so whatever rests there
+        is unchanged. An order we were placing never existed; a resting order
+        we were moving stays and is re-evaluated next loop.
+        """
+        if self.state.order_id is None:
+            self.state.active = False
+        self._save_state()
+        return True
+
+    def _lookup_order(self, exc, attempt):
+        """Desync: settle the tracked order with one lookup by id, then drop strays."""
+        order_id = self.state.order_id
+        if order_id is None:
+            return False
+        status = self.api.fetch_order_status(order_id)
+        self.logger.info("Order %s is %s on the exchange", order_id, status)
+        if status is None:
+            return False
+        for order in getattr(exc, 'orders', ()):
+            if str(order['id']) != str(order_id):
+                self.logger.warning("Cancelling stray order %s", order['id'])
+                self.order_events['cancelled'] += 1
+                if 'trigger' in order:
+                    self.api.cancel_price_order(order['id'])
+                else:
+                    self.api.cancel_order(order['id'])
+        if status == 'closed':
+            self._handle_order_execution()
+        elif status in ('canceled', 'expired'):
+            # Nothing traded; the same side is placed again
+            self.state.active = False
+            if self.trailer:
+                self.trailer.untrack()
+            self._save_state()
+        elif status == 'fired' and self.trailer:
+            self.trailer.untrack()
+        return True
+
+    def _recover_state(self):
+        self.logger.info("Initiating state recovery...")
+        max_retries = 3
+        recovered = False
+        preserved_order_type = self.state.order_type  # Capture current order type
+        if self.trailer:
+            self.trailer.untrack()
+
+        for attempt in range(max_retries):
+            try:
+                # 1. Cancel all existing orders
+                canceled = self.api.cancel_all_orders(self.config['trading']['currency_pair'])
+                self.order_events['cancelled'] += len(canceled)
+                open_orders = self.api.get_open_orders()
+                if self.api.use_price_orders:
+                    open_orders = (self.api.get_price_orders('open') or []) + open_orders
+
+                if open_orders:
+                    self.logger.error(f"Failed to cancel orders: {open_orders}")
+                    raise Exception("Order cancellation failed")
+
+                # 2. Reset state while preserving order type
+                self.state = OrderState()
+                self.state.order_type = preserved_order_type  # Restore order type
+
+                # 3. Add fallback to initial state
+                if self.state.order_type is None:
+                    self.state.order_type = 'buy'  # Default initial state
+
+                recovered = True
+                break
+
+            except Exception as e:
+                self.logger.error(f"Recovery attempt {attempt+1} failed: {str(e)}")
+                time.sleep(2 ** attempt)
+
+        if not recovered:
+            self.logger.critical("State recovery failed after multiple attempts!")
+            # Add emergency shutdown logic here
+
+        self._save_state()
+        self.logger.info("State recovery completed. Resuming with order type: %s", self.state.order_type)
+
+    def manage_orders(self):
+        trade_count = 0
+
+        self.logger.info("Starting order management loop.")
+        while True:
+            if self.stopping.is_set():
+                self.logger.info("Stop requested. Exiting trading loop.")
+                break
+            if self.paused.is_set():
+                time.sleep(self.settings.trading.price_poll_interval)
+                continue
+            # Read every pass so a config reload can change it
+            max_trades = self.settings.trading.trade_limit
+            if max_trades is not None and trade_count >= max_trades:
+                self.logger.info("Trade limit reached. Exiting trading loop.")
+                break
+
+            errors = self.reconciler.errors
+            try:
+                started = time.perf_counter()
+                with self.order_lock:
+                    open_orders = self._fetch_active_orders()
+                    self.logger.debug("Open orders: %s", open_orders)
+
+                    if not open_orders:
+                        if not self.state.active:
+                            self.logger.info("No active orders - placing initial order")
+                            with phase(self, PLACING):
+                                self._place_new_order()
+                        elif self._settle_missing_order():
+                            trade_count += 1  # Only increment when orders complete
+                    elif len(open_orders) > 1:
+                        # e.g. a replace whose cancel was lost after the create went through
+                        raise DesyncError(f"{len(open_orders)} open orders for one leg", open_orders)
+                    elif self.trailer:
+                        if str(open_orders[0]['id']) != str(self.state.order_id):
+                            # Trigger fired; the limit order it put can't be trailed
+                            self.trailer.untrack()
+                    else:
+                        self.logger.debug("Monitoring existing orders")
+                        self._monitor_active_order(open_orders[0])
+                self.decision_latency.observe(time.perf_counter() - started)
+
+                if self.reconciler.errors == errors:
+                    self.reconciler.clear()
+                # Use websocket-driven price updates instead of sleep
+                time.sleep(self.settings.trading.price_poll_interval)
+
+            except KeyboardInterrupt:
+                self.logger.info("Stopped by user")
+                break
+            except StalePriceError as e:
+                # Nothing was sent; decide again once the feed is back rather than escalating
+                self.logger.warning("Skipping decision on a stale price: %s", e)
+            except Exception as e:
+                self.logger.error(f"Error in manage_orders loop: {str(e)}")
+                with self.order_lock, phase(self, RECOVERING):
+                    repaired = self.reconciler.handle(e)
+                if not repaired:
+                    time.sleep(1)  # Prevent tight error loops
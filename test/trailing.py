@@ -0,0 +1,151 @@
+import threading
+import time
+import logging
+
+class TrailingStopManager:
+    """
+    Trails the resting stop-limit order from the WebSocket tick stream.
+
+    Every tick updates the ideal anchor locally (running low for a buy,
+    running high for a sell), which costs no REST calls. The exchange order
+    is only moved when its trigger is more than tolerance_bps worse than
+    the ideal trigger, so tolerance bounds the slippage of the fire price,
+    and the number of updates is the fewest that keep it within that bound.
+    Updates run on a worker thread that always takes the latest target, so
+    a burst of ticks collapses into one replace and the tick path never
+    waits on REST.
+
+    When the API client offers native trailing orders
+    (place_trailing_order), the manager places one of those instead and
+    leaves trailing to the exchange.
+
+    Settings under trading.trailing:
+      enabled        use this manager instead of _monitor_active_order
+      tolerance_bps  allowed gap between exchange and ideal trigger
+    """
+
+    def __init__(self, api, settings, replace_policy, order_lock):
+        self.api = api
+        self.settings = settings  # config_model.BotConfig, swapped by TradingCore on reload
+        trailing = settings['trading'].get('trailing') or {}
+        self.tolerance = trailing.get('tolerance_bps', 5) / 10000
+        self.policy = replace_policy
+        self.order_lock = order_lock
+        self.native = callable(getattr(api, 'place_trailing_order', None))
+        self.logger = logging.getLogger("TrailingStopManager")
+
+        self.cond = threading.Condition()
+        self.order = None
+        self.order_type = None
+        self.anchor = None       # anchor of the order on the exchange
+        self.best = None         # ideal anchor from the tick stream
+        self.placed_at = 0
+        self.running = False
+        self.thread = None
+        self.on_replaced = None  # callback(order or None on failure, anchor), set by TradingCore
+        self.stats = {'ticks': 0, 'updates': 0, 'failed': 0}
+
+    def apply_settings(self, settings):
+        """Config reload: new price multipliers and tolerance; the tracked order is kept."""
+        trailing = settings['trading'].get('trailing') or {}
+        with self.cond:
+            self.settings = settings
+            self.tolerance = trailing.get('tolerance_bps', 5) / 10000
+            self.cond.notify()
+
+    def start(self):
+        if self.native or self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, name="trailing-stop", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def place_native(self, order_type, last_price):
+        """Delegate trailing to the exchange; returns the order or None."""
+        side = self.settings.trading.side(order_type)
+        return self.api.place_trailing_order(
+            order_type, trail_pct=side.trigger_adjust,
+            limit_offset_pct=side.limit_adjust - side.trigger_adjust,
+            reference_price=last_price
+        )
+
+    def track(self, order, order_type, anchor):
+        """Start trailing a freshly placed order."""
+        with self.cond:
+            self.order = order
+            self.order_type = order_type
+            self.anchor = self.best = anchor
+            self.placed_at = time.time()
+
+    def untrack(self):
+        """Stop trailing (order filled, cancelled or state recovered)."""
+        with self.cond:
+            self.order = None
+            self.best = None
+
+    def on_tick(self, price):
+        """Called from the WebSocket thread on every price update."""
+        with self.cond:
+            if self.order is None or self.native:
+                return
+            self.stats['ticks'] += 1
+            if self.order_type == 'buy':
+                if price >= self.best:
+                    return
+            elif price <= self.best:
+                return
+            self.best = price
+            if self._gap() > self.tolerance:
+                self.cond.notify()
+
+    def _gap(self):
+        """Relative distance between the exchange trigger and the ideal one."""
+        return abs(self.anchor - self.best) / self.best
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while self.running and (self.order is None or self._gap() <= self.tolerance):
+                    self.cond.wait()
+                if not self.running:
+                    return
+                order, order_type, target = self.order, self.order_type, self.best
+                if not self.policy.should_replace(order_type, self.anchor, target, self.placed_at):
+                    # Budget or order age says wait; re-check shortly
+                    self.cond.wait(0.1)
+                    continue
+            self._move(order, order_type, target)
+
+    def _move(self, order, order_type, target):
+        trigger, limit = self._prices(target, order_type)
+        with self.order_lock:
+            with self.cond:
+                if self.order is not order:
+                    return  # filled or recovered while we waited
+            new_order = self.api.replace_stop_limit_order(order, order_type, trigger, limit)
+            with self.cond:
+                if not new_order:
+                    self.stats['failed'] += 1
+                    self.order = None
+                else:
+                    self.order = new_order
+                    self.anchor = target
+                    self.placed_at = time.time()
+                    self.stats['updates'] += 1
+            if not new_order:
+                self.logger.error(f"Trailing update of {order_type} order failed")
+                if self.on_replaced:
+                    self.on_replaced(None, target)
+                return
+            self.policy.record_replace(self.placed_at)
+            self.logger.info("Trailed %s order to anchor %s (trigger %s)", order_type, target, trigger)
+            if self.on_replaced:
+                self.on_replaced(new_order, target)
+
+    def _prices(self, anchor, order_type):
+        return self.settings.trading.side(order_type).prices(anchor)
@@ -0,0 +1,249 @@
+"""
+Record raw WebSocket frames and replay them into GateIOWebSocketClient.
+
+Recording: pass a FrameRecorder as GateIOWebSocketClient(recorder=...)
+and every received frame is appended, with its local receive time, to a
+gzip file. Each session appends a new gzip member and the stream is
+sync-flushed periodically, so a crash loses at most the last unflushed
+frames. Readers stop cleanly at a truncated tail.
+
+Replay: FrameReplay feeds a recording into any on_message(ws, message)
+handler at real time, N x speed or as fast as possible, and measures the
+per-frame handler latency and frame-to-callback latency. It is the
+harness for price pipeline benchmarks.
+
+    python ws_replay.py record --out frames.gz --seconds 600
+    python ws_replay.py replay frames.gz --speed max
+    python ws_replay.py replay frames.gz --speed 10 --repeat 3
+"""
+import argparse
+import gzip
+import logging
+import os
+import statistics
+import threading
+import time
+import zlib
+
+############################################
+# Recording
+############################################
+
+class FrameRecorder:
+    """
+    Append-only gzip frame log. One record per line: receive time (epoch
+    seconds), a tab, then the frame text. JSON frames never contain raw
+    newlines, so no extra escaping is needed.
+    """
+
+    def __init__(self, path, flush_interval=1.0, flush_frames=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_frames = flush_frames
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.frames = 0
+        self.file = gzip.open(path, 'ab')
+        self.logger = logging.getLogger("FrameRecorder")
+        self.logger.info(f"Recording WebSocket frames to {path}")
+
+    def write(self, message, received_at=None):
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', errors='replace')
+        line = f"{received_at or time.time():.6f}\t{message}\n".encode('utf-8')
+        with self.lock:
+            self.file.write(line)
+            self.frames += 1
+            self.pending += 1
+            now = time.monotonic()
+            if self.pending >= self.flush_frames or now - self.last_flush >= self.flush_interval:
+                # Sync flush: everything so far is decodable even if we crash
+                self.file.flush(zlib.Z_SYNC_FLUSH)
+                self.pending = 0
+                self.last_flush = now
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+        self.logger.info(f"Recorded {self.frames} frames to {self.path}")
+
+def read_frames(path):
+    """Yield (received_at, message) from a recording, tolerating a torn tail."""
+    with gzip.open(path, 'rb') as f:
+        try:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written last record
+                ts, _, message = line[:-1].partition(b'\t')
+                yield float(ts), message.decode('utf-8')
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            return
+
+def load_frames(path):
+    return list(read_frames(path))
+
+############################################
+# Replay
+############################################
+
+class FrameReplay:
+    """
+    Feeds recorded frames into an on_message(ws, message) handler.
+    speed=None replays as fast as possible; otherwise the recorded gaps are
+    divided by speed (1.0 is real time).
+    """
+
+    def __init__(self, frames, speed=None):
+        self.frames = frames
+        self.speed = speed
+
+    def run(self, on_message, on_frame=None):
+        """
+        Replay every frame. on_frame(index, scheduled, started) is called
+        just before each handler call, for callback-latency probes.
+        Returns a dict of timing stats in microseconds.
+        """
+        handler_us = []
+        lag_us = []
+        if not self.frames:
+            return self._stats(handler_us, lag_us, 0.0)
+        first_ts = self.frames[0][0]
+        perf = time.perf_counter
+        begin = perf()
+        for index, (received_at, message) in enumerate(self.frames):
+            scheduled = begin
+            if self.speed:
+                scheduled = begin + (received_at - first_ts) / self.speed
+                delay = scheduled - perf()
+                if delay > 0.005:
+                    # Coarse sleep, then spin for the last couple of ms
+                    time.sleep(delay - 0.002)
+                while perf() < scheduled:
+                    pass
+            started = perf()
+            if on_frame:
+                on_frame(index, scheduled, started)
+            on_message(None, message)
+            handler_us.append((perf() - started) * 1e6)
+            if self.speed:
+                lag_us.append((started - scheduled) * 1e6)
+        return self._stats(handler_us, lag_us, perf() - begin)
+
+    @staticmethod
+    def _stats(handler_us, lag_us, elapsed):
+        stats = {'frames': len(handler_us), 'elapsed_s': elapsed,
+                 'frames_per_s': len(handler_us) / elapsed if elapsed else 0.0}
+        stats.update(percentiles('handler_us', handler_us))
+        if lag_us:
+            stats.update(percentiles('schedule_lag_us', lag_us))
+        return stats
+
+def percentiles(prefix, samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {
+        f'{prefix}_p50': pick(0.50),
+        f'{prefix}_p99': pick(0.99),
+        f'{prefix}_max': ordered[-1],
+        f'{prefix}_mean': statistics.fmean(ordered),
+    }
+
+class CallbackProbe:
+    """Price callback that records the time from frame hand-off to callback."""
+
+    def __init__(self):
+        self.started = 0.0
+        self.latencies_us = []
+        self.prices = 0
+
+    def on_frame(self, index, scheduled, started):
+        self.started = started
+
+    def __call__(self, price):
+        self.latencies_us.append((time.perf_counter() - self.started) * 1e6)
+        self.prices += 1
+
+def replay_client(frames, speed=None, currency_pair='BTC_USDT', callback=None):
+    """
+    Build an offline GateIOWebSocketClient (never connected) and replay
+    frames through its on_message. Returns (stats, probe).
+    """
+    from gateio_websocket import GateIOWebSocketClient
+    probe = CallbackProbe()
+
+    def on_price(price, exchange_ms=None):
+        probe(price)
+        if callback:
+            callback(price)
+
+    # Placeholder credentials of the required shape; replay never connects
+    client = GateIOWebSocketClient(currency_pair, on_price, '0' * 32, '0' * 64)
+    stats = FrameReplay(frames, speed).run(client.on_message, probe.on_frame)
+    stats['prices'] = probe.prices
+    stats.update(percentiles('callback_us', probe.latencies_us))
+    return stats, probe
+
+############################################
+# CLI
+############################################
+
+def _record(args):
+    import yaml
+    from gateio_websocket import GateIOWebSocketClient
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    recorder = FrameRecorder(args.out)
+    client = GateIOWebSocketClient(
+        currency_pair=args.pair or config['trading']['currency_pair'],
+        on_price_callback=lambda price, exchange_ms=None: None,
+        api_key=config['api']['key'],
+        api_secret=config['api']['secret'],
+        ws_url=config['api'].get('ws_base'),
+        recorder=recorder
+    )
+    client.start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+
+def _replay(args):
+    frames = load_frames(args.path)
+    speed = None if args.speed == 'max' else float(args.speed)
+    print(f"{len(frames)} frames from {args.path}, speed {args.speed}")
+    for run in range(args.repeat):
+        stats, _ = replay_client(frames, speed, args.pair)
+        print(f"run {run + 1}:")
+        for key, value in stats.items():
+            print(f"  {key:>22}: {value:,.2f}" if isinstance(value, float) else f"  {key:>22}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay Gate.io WebSocket frames")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='Record live frames')
+    record.add_argument('--out', required=True)
+    record.add_argument('--seconds', type=float, default=600)
+    record.add_argument('--config', default='config.yaml')
+    record.add_argument('--pair', default=None)
+
+    replay = sub.add_parser('replay', help='Replay a recording and report latency')
+    replay.add_argument('path')
+    replay.add_argument('--speed', default='max', help="'max', or a multiplier (1 = real time)")
+    replay.add_argument('--repeat', type=int, default=1)
+    replay.add_argument('--pair', default='BTC_USDT')
+    args = parser.parse_args()
+
+    if not os.environ.get('WS_REPLAY_DEBUG'):
+        # Handler timings should not include log I/O
+        logging.disable(logging.CRITICAL)
+    (_record if args.command == 'record' else _replay)(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.edge.service import Service as EdgeService
+import glob
+import json
+import logging
+import shutil
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Lean mode is shared with the root bot; inject_lean_css is used via this module too
+from lean_profile import (  # noqa: E402
+    is_lean, get_lean_profile_path, apply_lean_options, apply_lean_runtime, inject_lean_css
+)
+
+DRIVER_BINARIES = {
+    'chrome': 'chromedriver',
+    'firefox': 'geckodriver',
+    'edge': 'msedgedriver',
+}
+
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.gateio-bot', 'drivers.json')
+
+def get_default_profile_path(browser_name):
+    """Get default browser profile path based on OS"""
+    home = os.path.expanduser('~')
+    paths = {
+        'chrome': {
+            'windows': os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Google', 'Chrome', 'User Data'),
+            'darwin': os.path.join(home, 'Library', 'Application Support', 'Google', 'Chrome'),
+            'linux': os.path.join(home, '.config', 'google-chrome')
+        },
+        'firefox': {
+            'windows': os.path.join(os.environ.get('APPDATA', ''), 'Mozilla', 'Firefox', 'Profiles'),
+            'darwin': os.path.join(home, 'Library', 'Application Support', 'Firefox', 'Profiles'),
+            'linux': os.path.join(home, '.mozilla', 'firefox')
+        },
+        'edge': {
+            'windows': os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Edge', 'User Data'),
+            'darwin': os.path.join(home, 'Library', 'Application Support', 'Microsoft Edge'),
+            'linux': os.path.join(home, '.config', 'microsoft-edge')
+        }
+    }
+
+    system = 'darwin' if sys.platform == 'darwin' else 'windows' if sys.platform == 'win32' else 'linux'
+    return paths.get(browser_name.lower(), {}).get(system, '')
+
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_driver_cache(browser_name, path):
+    cache = _read_driver_cache()
+    cache[browser_name] = path
+    os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+    tmp = DRIVER_CACHE_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, DRIVER_CACHE_FILE)
+
+def _find_local_driver(browser_name, version=None):
+    """Look for an already-downloaded driver binary without touching the network."""
+    binary = DRIVER_BINARIES[browser_name]
+    if sys.platform == 'win32':
+        binary += '.exe'
+
+    cached = _read_driver_cache().get(browser_name)
+    if cached and os.path.isfile(cached) and (not version or version in cached):
+        return cached
+
+    on_path = shutil.which(binary)
+    if on_path and not version:
+        return on_path
+
+    # webdriver_manager keeps everything it ever downloaded under ~/.wdm
+    pattern = os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', '**', binary)
+    found = [p for p in glob.glob(pattern, recursive=True) if not version or version in p]
+    if found:
+        return max(found, key=os.path.getmtime)
+    return on_path
+
+def resolve_driver_path(config):
+    """
+    Return the webdriver binary for the configured browser.
+    Order: browser.driver_path, local cache file, PATH, ~/.wdm. Only when
+    nothing is found locally (and browser.driver_download allows it) the
+    matching webdriver_manager is asked to download it, once; the result is
+    cached so later starts stay offline.
+    """
+    browser_name = config['browser']['name'].lower()
+    explicit = config['browser'].get('driver_path')
+    if explicit:
+        return explicit
+
+    version = config['browser'].get('driver_version') if browser_name == 'firefox' else None
+    if version:
+        version = str(version)
+    path = _find_local_driver(browser_name, version)
+    if path:
+        _write_driver_cache(browser_name, path)
+        return path
+
+    if not config['browser'].get('driver_download', True):
+        raise RuntimeError(
+            f"No local {DRIVER_BINARIES[browser_name]} found and browser.driver_download is disabled"
+        )
+
+    logging.info(f"No local {DRIVER_BINARIES[browser_name]} found, downloading once")
+    if browser_name == 'chrome':
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    elif browser_name == 'firefox':
+        from webdriver_manager.firefox import GeckoDriverManager
+        path = GeckoDriverManager(version=version).install()
+    else:
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        path = EdgeChromiumDriverManager().install()
+    _write_driver_cache(browser_name, path)
+    return path
+
+def get_profile_path(config):
+    """Profile directory the main browser session runs on."""
+    browser_name = config['browser']['name'].lower()
+    if is_lean(config):
+        return get_lean_profile_path(browser_name, config['browser'].get('lean') or {})
+
+    profile_path = config['browser'].get('profile_path') or get_default_profile_path(browser_name)
+    if browser_name == 'firefox' and os.path.exists(profile_path):
+        profile_dirs = [d for d in os.listdir(profile_path) if d.endswith('.default')]
+        if profile_dirs:
+            profile_path = os.path.join(profile_path, profile_dirs[0])
+    return profile_path
+
+def launch_browser(config, profile_path=None, driver_path=None):
+    """
+    Start a browser session. Raises on failure; use setup_browser() for the
+    exit-on-error behaviour of the entry points.
+    :param profile_path: Override the profile directory (standby sessions use clones)
+    :param driver_path: Already resolved webdriver binary
+    """
+    browser_name = config['browser']['name'].lower()
+    lean = is_lean(config)
+    lean_config = config['browser'].get('lean') or {}
+    profile_path = profile_path or get_profile_path(config)
+    driver_path = driver_path or resolve_driver_path(config)
+
+    if browser_name == 'chrome':
+        options = webdriver.ChromeOptions()
+        service = ChromeService(driver_path)
+        options.add_argument(f"--user-data-dir={profile_path}")
+        options.add_argument("--profile-directory=Default")
+
+    elif browser_name == 'firefox':
+        options = webdriver.FirefoxOptions()
+        service = FirefoxService(driver_path)
+        options.add_argument(f"-profile {profile_path}")
+
+    elif browser_name == 'edge':
+        options = webdriver.EdgeOptions()
+        service = EdgeService(driver_path)
+        options.add_argument(f"--user-data-dir={profile_path}")
+        options.add_argument("--profile-directory=Default")
+
+    else:
+        raise ValueError(f"Unsupported browser: {browser_name}")
+
+    # Common options for all browsers
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        apply_lean_options(browser_name, options, lean_config)
+    if (config.get('multi_tab') or {}).get('enabled'):
+        # Background tabs must keep their price observers (and heartbeats) running
+        if browser_name in ('chrome', 'edge'):
+            options.add_argument("--disable-background-timer-throttling")
+            options.add_argument("--disable-renderer-backgrounding")
+            options.add_argument("--disable-backgrounding-occluded-windows")
+        elif browser_name == 'firefox':
+            options.set_preference("dom.min_background_timeout_value", 0)
+            options.set_preference("dom.timeout.enable_budget_timer_throttling", False)
+
+    # Initialize driver
+    driver = getattr(webdriver, browser_name.capitalize())(service=service, options=options)
+    if lean:
+        apply_lean_runtime(browser_name, driver, lean_config)
+    else:
+        driver.maximize_window()
+    return driver
+
+def setup_browser(config):
+    """Initialize browser driver with OS-specific settings"""
+    try:
+        return launch_browser(config)
+    except Exception as e:
+        logging.critical(f"Browser setup failed: {str(e)}")
+        sys.exit(1)
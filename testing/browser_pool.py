@@ -0,0 +1,126 @@
+import os
+import queue
+import shutil
+import threading
+import logging
+from browser import launch_browser, get_profile_path, resolve_driver_path, inject_lean_css
+from dom_wait import DomWaiter
+
+# Files a running browser keeps locked inside its profile; never cloned
+PROFILE_LOCK_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket', 'lock', '.parentlock', 'parent.lock')
+
+class BrowserPool:
+    """
+    Keeps standby browser sessions launched, logged in (cloned profile) and
+    parked on the trading page, so recovery swaps drivers instead of
+    reloading. Used sessions are replaced in the background.
+    """
+
+    def __init__(self, config, size=1):
+        self.config = config
+        self.url = config['trading']['url']
+        self.driver_path = resolve_driver_path(config)
+        self.active_profile = get_profile_path(config)
+        self.standby = queue.Queue()
+        self.free_profiles = queue.Queue()
+        self.logger = logging.getLogger("BrowserPool")
+        self._closed = False
+        for slot in range(size):
+            self.free_profiles.put(self._clone_profile(slot))
+            self._replenish()
+
+    def _clone_profile(self, slot):
+        """
+        Two browsers can't share one profile directory, so every standby slot
+        runs on a copy of the logged-in profile taken once.
+        """
+        clone = f"{self.active_profile.rstrip(os.sep)}-standby-{slot}"
+        if not os.path.exists(clone):
+            shutil.copytree(
+                self.active_profile, clone,
+                ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES),
+                symlinks=True
+            )
+        return clone
+
+    def _launch(self, profile):
+        driver = launch_browser(self.config, profile, self.driver_path)
+        driver.get(self.url)
+        waits = self.config['browser'].get('waits') or {}
+        DomWaiter(driver).page_ready(waits.get('page_load_timeout', 30))
+        inject_lean_css(driver, self.config)
+        return driver
+
+    def _replenish(self):
+        def worker():
+            profile = self.free_profiles.get()
+            try:
+                driver = self._launch(profile)
+            except Exception as e:
+                self.logger.error(f"Standby session on {profile} failed to start: {str(e)}")
+                self.free_profiles.put(profile)
+                return
+            if self._closed:
+                driver.quit()
+                return
+            self.standby.put((profile, driver))
+            self.logger.info(f"Standby session ready on {profile}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            return driver.execute_script("return document.readyState") == "complete"
+        except Exception:
+            return False
+
+    def swap(self, old_driver, timeout=0):
+        """
+        Hand out a warm session in place of old_driver. The old session is
+        quit off-thread and its profile reused for the next standby. Returns
+        None when no healthy standby is available within timeout, so the
+        caller can fall back to a page reload.
+        """
+        while True:
+            try:
+                if timeout:
+                    profile, driver = self.standby.get(timeout=timeout)
+                else:
+                    profile, driver = self.standby.get_nowait()
+            except queue.Empty:
+                return None
+            if self._is_alive(driver):
+                break
+            self.logger.warning(f"Standby session on {profile} is dead, discarding")
+            self._release(profile, driver)
+
+        old_profile, self.active_profile = self.active_profile, profile
+        self._release(old_profile, old_driver)
+        return driver
+
+    def _release(self, profile, driver):
+        """Quit driver off-thread, then launch a new standby on its profile."""
+        def worker():
+            self._quit_quietly(driver)
+            if not self._closed:
+                self.free_profiles.put(profile)
+                self._replenish()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    @staticmethod
+    def _quit_quietly(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                _, driver = self.standby.get_nowait()
+            except queue.Empty:
+                break
+            self._quit_quietly(driver)
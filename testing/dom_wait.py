@@ -0,0 +1,111 @@
+from selenium.common.exceptions import TimeoutException
+
+# One async script per wait: the condition is re-checked on every DOM
+# mutation and on a 10 ms timer (input .value changes don't mutate the DOM),
+# and the WebDriver call returns the moment it holds.
+WAIT_SCRIPT = """
+var selector = arguments[0], state = arguments[1], timeoutMs = arguments[2],
+    previous = arguments[3], done = arguments[arguments.length - 1];
+
+function visible(el) {
+  if (!el) return false;
+  var r = el.getBoundingClientRect();
+  var cs = window.getComputedStyle(el);
+  return r.width > 0 && r.height > 0 && cs.visibility !== 'hidden' && cs.display !== 'none';
+}
+function disabled(el) {
+  return el.disabled || el.getAttribute('aria-disabled') === 'true' ||
+         el.hasAttribute('data-disabled');
+}
+function check() {
+  if (state === 'ready') return document.readyState === 'complete' ? true : null;
+  var el = document.querySelector(selector);
+  switch (state) {
+    case 'present':       return el;
+    case 'absent':        return el ? null : true;
+    case 'visible':       return visible(el) ? el : null;
+    case 'enabled':       return el && !disabled(el) ? el : null;
+    case 'clickable':     return visible(el) && !disabled(el) ? el : null;
+    case 'value_changed': return el && el.value !== previous ? el : null;
+    case 'text_changed':  return el && el.textContent.trim() !== previous ? el : null;
+  }
+  return null;
+}
+
+var hit = check();
+if (hit) { done(hit); return; }
+
+var finished = false, observer = null, poll = null, timer = null;
+function finish(value) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  document.removeEventListener('readystatechange', tick);
+  clearInterval(poll);
+  clearTimeout(timer);
+  done(value);
+}
+function tick() { var r = check(); if (r) finish(r); }
+
+observer = new MutationObserver(tick);
+observer.observe(document.documentElement, {
+  childList: true, subtree: true, attributes: true, characterData: true
+});
+document.addEventListener('readystatechange', tick);
+poll = setInterval(tick, 10);
+timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+class DomWaiter:
+    """
+    Element-state waits that resolve inside the page instead of polling
+    from Python every 500 ms like WebDriverWait.
+    """
+
+    def __init__(self, driver, default_timeout=10):
+        self.driver = driver
+        self.default_timeout = default_timeout
+        # The async script enforces its own timeout; keep the driver-side
+        # limit above any wait we issue so it never fires first
+        self._script_timeout = None
+
+    def _ensure_script_timeout(self, timeout):
+        needed = timeout + 5
+        if self._script_timeout is None or self._script_timeout < needed:
+            self.driver.set_script_timeout(needed)
+            self._script_timeout = needed
+
+    def until(self, selector, state='present', timeout=None, previous=None):
+        """
+        Block until selector reaches state and return the element (or True
+        for 'absent'/'ready'). Raises TimeoutException like WebDriverWait.
+        :param state: present, absent, visible, enabled, clickable,
+                      value_changed, text_changed or ready (page load)
+        :param previous: Old value/text for the *_changed states
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        self._ensure_script_timeout(timeout)
+        result = self.driver.execute_async_script(
+            WAIT_SCRIPT, selector, state, int(timeout * 1000), previous
+        )
+        if not result:
+            raise TimeoutException(f"'{selector}' not {state} after {timeout}s")
+        return result
+
+    def present(self, selector, timeout=None):
+        return self.until(selector, 'present', timeout)
+
+    def clickable(self, selector, timeout=None):
+        return self.until(selector, 'clickable', timeout)
+
+    def enabled(self, selector, timeout=None):
+        return self.until(selector, 'enabled', timeout)
+
+    def absent(self, selector, timeout=None):
+        return self.until(selector, 'absent', timeout)
+
+    def value_changed(self, selector, previous, timeout=None):
+        return self.until(selector, 'value_changed', timeout, previous)
+
+    def page_ready(self, timeout=30):
+        return self.until(None, 'ready', timeout)
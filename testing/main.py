@@ -1,122 +1,67 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from trading_bot import TradingCore
-import yaml
+from browser import setup_browser, inject_lean_css
+from dom_wait import DomWaiter
 import logging
-import sys
 import os
+import sys
 
-def get_default_profile_path(browser_name):
-    """Get default browser profile path based on OS"""
-    home = os.path.expanduser('~')
-    paths = {
-        'chrome': {
-            'windows': os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Google', 'Chrome', 'User Data'),
-            'darwin': os.path.join(home, 'Library', 'Application Support', 'Google', 'Chrome'),
-            'linux': os.path.join(home, '.config', 'google-chrome')
-        },
-        'firefox': {
-            'windows': os.path.join(os.environ.get('APPDATA', ''), 'Mozilla', 'Firefox', 'Profiles'),
-            'darwin': os.path.join(home, 'Library', 'Application Support', 'Firefox', 'Profiles'),
-            'linux': os.path.join(home, '.mozilla', 'firefox')
-        },
-        'edge': {
-            'windows': os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Edge', 'User Data'),
-            'darwin': os.path.join(home, 'Library', 'Application Support', 'Microsoft Edge'),
-            'linux': os.path.join(home, '.config', 'microsoft-edge')
-        }
-    }
-    
-    system = 'darwin' if sys.platform == 'darwin' else 'windows' if sys.platform == 'win32' else 'linux'
-    return paths.get(browser_name.lower(), {}).get(system, '')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_logging import setup_logging  # noqa: E402  (shared with the API bot)
+from config_model import BotConfig, ConfigWatcher  # noqa: E402
+from control import ControlServer  # noqa: E402
+from profiler import SamplingProfiler  # noqa: E402
+
+CONFIG_PATH = 'config.yaml'
 
 def load_config():
-    """Load configuration from YAML file"""
+    """Load and validate config.yaml once; returns a BotConfig"""
     try:
-        with open('config.yaml') as f:
-            return yaml.safe_load(f)
+        return BotConfig.load(CONFIG_PATH)
     except Exception as e:
         logging.critical(f"Config loading error: {str(e)}")
         sys.exit(1)
 
-def setup_logging(config):
-    """Configure logging system"""
-    logging.basicConfig(
-        level=config['logging']['level'],
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(config['logging']['file']),
-            logging.StreamHandler()
-        ]
-    )
-
-def setup_browser(config):
-    """Initialize browser driver with OS-specific settings"""
-    try:
-        browser_name = config['browser']['name'].lower()
-        profile_path = config['browser'].get('profile_path') or get_default_profile_path(browser_name)
-        
-        if browser_name == 'chrome':
-            options = webdriver.ChromeOptions()
-            service = ChromeService(ChromeDriverManager().install())
-            options.add_argument(f"--user-data-dir={profile_path}")
-            options.add_argument("--profile-directory=Default")
-
-        elif browser_name == 'firefox':
-            options = webdriver.FirefoxOptions()
-            # Get driver version from config
-            driver_version = config['browser'].get('driver_version')
-            # Pass version to GeckoDriverManager
-            service = FirefoxService(GeckoDriverManager(version=driver_version).install())
-            
-            if os.path.exists(profile_path):
-                profile_dirs = [d for d in os.listdir(profile_path) if d.endswith('.default')]
-                if profile_dirs:
-                    profile_path = os.path.join(profile_path, profile_dirs[0])
-            options.add_argument(f"-profile {profile_path}")
-
-        elif browser_name == 'edge':
-            options = webdriver.EdgeOptions()
-            service = EdgeService(EdgeChromiumDriverManager().install())
-            options.add_argument(f"--user-data-dir={profile_path}")
-            options.add_argument("--profile-directory=Default")
-
-        else:
-            raise ValueError(f"Unsupported browser: {browser_name}")
-
-        # Common options for all browsers
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        
-        # Initialize driver
-        driver = getattr(webdriver, browser_name.capitalize())(service=service, options=options)
-        driver.maximize_window()
-        return driver
-
-    except Exception as e:
-        logging.critical(f"Browser setup failed: {str(e)}")
-        sys.exit(1)
-
 def main():
-    config = load_config()
+    settings = load_config()
+    config = settings.raw
     setup_logging(config['logging'])
     
     driver = None
+    pool = None
+    trader = None
+    watcher = None
+    control = None
     try:
+        # Installed first so a profile can cover browser startup too
+        profiler = SamplingProfiler.from_config(config.get('profiler'))
         driver = setup_browser(config)
+        # Each mode imports only what it runs
+        if (config.get('multi_tab') or {}).get('enabled'):
+            from multi_tab import MultiTabTrader
+            multi = MultiTabTrader(driver, config)
+            if profiler:
+                profiler.phase_of = multi
+            multi.run()
+            return
+
         driver.get(config['trading']['url'])
         
-        WebDriverWait(driver, 30).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        waits = config['browser'].get('waits') or {}
+        DomWaiter(driver).page_ready(waits.get('page_load_timeout', 30))
+        inject_lean_css(driver, config)
         
-        trader = TradingCore(driver, config)
+        standby_sessions = config['browser'].get('standby_sessions', 0)
+        if standby_sessions:
+            from browser_pool import BrowserPool
+            pool = BrowserPool(config, standby_sessions)
+
+        from trading_bot import TradingCore
+        trader = TradingCore(driver, config, pool, settings)
+        if profiler:
+            profiler.phase_of = trader
+        control = ControlServer.from_config(trader, config.get('control'), profiler)
+        interval = config['trading'].get('config_reload_interval', 1.0)
+        if interval:
+            watcher = ConfigWatcher(CONFIG_PATH, trader.apply_settings, interval).start().reload_on_sighup()
         trader.manage_orders()
 
     except KeyboardInterrupt:
@@ -124,6 +69,15 @@ def main():
     except Exception as e:
         logging.critical(f"Fatal error: {str(e)}")
     finally:
+        if watcher:
+            watcher.stop()
+        if control:
+            control.stop()
+        if pool:
+            pool.close()
+        if trader:
+            # Recovery may have swapped in a standby session
+            driver = trader.driver
         if driver:
             driver.quit()
         sys.exit()
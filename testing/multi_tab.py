@@ -0,0 +1,301 @@
+import copy
+import time
+import logging
+from selenium.webdriver.common.by import By
+from trading_bot import TradingCore, OrderState
+from dom_wait import DomWaiter
+from order_form import OrderForm
+from browser import inject_lean_css
+from precision import PrecisionEngine
+from reconcile import Reconciler, STALE_ELEMENT, REJECTED, DESYNC
+from config_model import BotConfig
+from profiler import phase, MONITORING, PLACING, CANCELLING, RECOVERING
+from price_snapshot import LatestPrice, StalePriceError
+
+############################################
+# In-page price observers
+############################################
+
+# Installed in every tab. Mirrors the tab's price and its pair's open-order
+# row count into same-origin localStorage on each DOM change, so any one tab
+# can read the state of all pairs without switching windows. The orders
+# table may list every pair, so rows are counted by the pair they name.
+OBSERVER_SCRIPT = """
+var pair = arguments[0], priceSel = arguments[1], ordersSel = arguments[2], heartbeatMs = arguments[3];
+if (window.__gatebotObserver) window.__gatebotObserver.disconnect();
+var key = 'gatebot:tab:' + pair, seq = 0, last = null;
+var names = [pair, pair.replace('_', '/')];
+function ours(row) {
+  var text = row.textContent;
+  return names.some(function (name) { return text.indexOf(name) >= 0; });
+}
+function publish() {
+  var priceEl = document.querySelector(priceSel);
+  var price = priceEl ? parseFloat(priceEl.textContent.replace(/,/g, '')) : null;
+  var orders = Array.prototype.filter.call(document.querySelectorAll(ordersSel), ours).length;
+  var sig = price + '|' + orders;
+  if (sig === last) return;
+  last = sig;
+  seq += 1;
+  localStorage.setItem(key, JSON.stringify({price: price, orders: orders, seq: seq, ts: Date.now()}));
+}
+window.__gatebotObserver = new MutationObserver(publish);
+window.__gatebotObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+// Heartbeat so a quiet market isn't mistaken for a dead observer or a stale price;
+// replaced on reinstall so it always drives the current publish()
+if (window.__gatebotHeartbeat) clearInterval(window.__gatebotHeartbeat);
+window.__gatebotHeartbeat = setInterval(function () {
+  last = null; publish();
+}, heartbeatMs);
+publish();
+"""
+
+POLL_SCRIPT = """
+var pairs = arguments[0], out = {};
+for (var i = 0; i < pairs.length; i++) {
+  var raw = localStorage.getItem('gatebot:tab:' + pairs[i]);
+  out[pairs[i]] = raw ? JSON.parse(raw) : null;
+}
+return out;
+"""
+
+############################################
+# One trading-page tab per pair
+############################################
+
+class TabTrader(TradingCore):
+    """
+    UI-only TradingCore bound to one browser tab. Prices and open-order
+    counts come from the tab's in-page observer instead of the API and
+    WebSocket, so pairs without API key permissions can be traded.
+    """
+
+    def __init__(self, driver, config, handle, price_rules):
+        # Deliberately skips TradingCore.__init__: no API client, no WebSocket
+        self.driver = driver
+        self.config = config
+        self.handle = handle
+        self.pair = config['trading']['currency_pair']
+        self.price_rules = price_rules
+        self.settings = BotConfig(config)
+        self.browser_pool = None
+        self.waits = config['browser'].get('waits') or {}
+        self.waiter = DomWaiter(driver, self.waits.get('element_timeout', 10))
+        self.form = OrderForm(driver, config)
+        self.state = OrderState()
+        self.logger = logging.getLogger(f"TabTrader[{self.pair}]")
+        self.prices = LatestPrice()
+        self.current_price = None
+        self.phase = MONITORING
+        self.feed = None
+        self.state_changed_at = 0
+        self.empty_seq = None  # feed seq of the first read with our order gone
+        self.failed_order_type = None
+        self.order_events = {'placed': 0, 'replaced': 0, 'filled': 0, 'failed': 0}
+        # No API here, so no transient class: network trouble shows up as a stale feed
+        self.reconciler = Reconciler(
+            {STALE_ELEMENT: self._reresolve_form, REJECTED: self._discard_form, DESYNC: self._recount_orders},
+            self._recover_state,
+            config['trading'].get('reconcile_max_attempts', 3),
+            logging.getLogger(f"Reconciler[{self.pair}]")
+        )
+
+    def install_observer(self):
+        self.driver.execute_script(
+            OBSERVER_SCRIPT, self.pair,
+            self.config['selectors']['price'], self.config['selectors']['stop_limit_orders'],
+            self._heartbeat_ms()
+        )
+
+    def _heartbeat_ms(self):
+        """
+        Observer heartbeat period: a quarter of price_staleness_budget, at
+        most 1 s, so a quiet market's price is republished well before
+        _get_market_price would refuse it.
+        """
+        budget = self.settings.trading.price_staleness_budget
+        return int(min(budget / 4, 1.0) * 1000) if budget else 1000
+
+    def update_feed(self, feed):
+        """
+        Publish the feed's price only when the observer published something
+        new; re-publishing an unchanged read would keep an old price looking
+        fresh to the staleness budget.
+        """
+        previous, self.feed = self.feed, feed
+        if not feed or not feed.get('price'):
+            return
+        if previous and previous.get('seq') == feed.get('seq') and previous.get('price') == feed['price']:
+            return
+        self.current_price = feed['price']
+
+    def has_work(self, now, settle_seconds, stale_seconds):
+        """Decide from the observed feed alone whether this tab needs the driver."""
+        feed = self.feed
+        if not feed or self.current_price is None or now - feed['ts'] / 1000 > stale_seconds:
+            return 'resync'
+        if now - self.state_changed_at < settle_seconds:
+            # Give the orders table time to reflect our last action
+            return None
+        if feed['orders'] == 0:
+            if not self.state.active:
+                return 'place'
+            # A slow table refresh also reads as empty: only a second
+            # observer publish that still shows no order confirms the fill
+            if self.empty_seq is None or feed['seq'] < self.empty_seq:
+                self.empty_seq = feed['seq']  # seq restarts when the observer is reinstalled
+                return None
+            return 'executed' if feed['seq'] > self.empty_seq else None
+        self.empty_seq = None
+        if self.state.order_type == 'buy' and self.current_price < self.state.last_price:
+            return 'replace'
+        if self.state.order_type == 'sell' and self.current_price > self.state.last_price:
+            return 'replace'
+        return None
+
+    def step(self, work):
+        """Run one unit of work; the scheduler has already switched to this tab."""
+        if work == 'resync':
+            self.install_observer()
+            return
+        errors = self.reconciler.errors
+        try:
+            if work == 'place':
+                with phase(self, PLACING):
+                    self._place_new_order()
+            elif work == 'executed':
+                self._handle_order_execution()
+            elif work == 'replace':
+                self.logger.info(f"Price moved against {self.state.order_type} order, replacing")
+                with phase(self, CANCELLING):
+                    self._cancel_and_replace(None)
+        except StalePriceError as e:
+            # Nothing was sent; the next poll decides again
+            self.logger.warning(f"Skipping decision on a stale price: {e}")
+            return
+        if self.reconciler.errors == errors:
+            self.reconciler.clear()
+        self.state_changed_at = time.time()
+        self.empty_seq = None
+
+    def _get_market_price(self):
+        # The feed is polled on this same thread between steps, so there is nothing to wait for
+        return self.prices.fresh(self.settings.trading.price_staleness_budget, wait=0).price
+
+    def _cancel_ui_orders(self):
+        """Cancel this tab's pair's open conditional orders; rows of other pairs are left alone."""
+        selectors = self.config['selectors']
+        names = (self.pair, self.pair.replace('_', '/'))
+        rows = [row for row in self.driver.find_elements(By.CSS_SELECTOR, selectors['stop_limit_orders'])
+                if any(name in row.text for name in names)]
+        for row in rows:
+            row.find_element(By.CSS_SELECTOR, selectors['cancel_order_button']).click()
+            self._handle_confirmation_popup()
+        return len(rows)
+
+    def _cancel_and_replace(self, order):
+        # Read first: a stale price must not leave the order cancelled and unreplaced
+        new_price = self._get_market_price()
+        try:
+            self._cancel_ui_orders()
+            self.state.active = False
+            trigger, limit = self._calculate_prices(new_price, self.state.order_type)
+            if self._place_ui_order(self.state.order_type, trigger, limit):
+                self.state.last_price = new_price
+                self.state.active = True
+        except Exception as e:
+            self.logger.error(f"Failed to cancel and replace order: {str(e)}")
+            with phase(self, RECOVERING):
+                self.reconciler.handle(e)
+
+    def _recover_state(self):
+        self.logger.info("Attempting tab recovery...")
+        preserved_order_type = self.state.order_type
+        try:
+            self._cancel_ui_orders()
+        except Exception as e:
+            self.logger.error(f"UI cancel during recovery failed: {str(e)}")
+        self.state = OrderState()
+        self.state.order_type = preserved_order_type
+        self.driver.refresh()
+        self.waiter.page_ready(self.waits.get('page_load_timeout', 30))
+        inject_lean_css(self.driver, self.config)
+        self.install_observer()
+
+class MultiTabTrader:
+    """
+    Hosts one trading-page tab per configured pair in a single browser and
+    only switches window handles when a tab has work queued.
+    """
+
+    def __init__(self, driver, config):
+        self.driver = driver
+        self.config = config
+        self.settings = config['multi_tab']
+        self.logger = logging.getLogger("MultiTabTrader")
+        self.tabs = []
+        self.active_handle = None
+        self.stepping = None  # tab whose step() is running, for the profiler
+
+        waits = config['browser'].get('waits') or {}
+        waiter = DomWaiter(driver)
+        # One metadata fetch covers every tab's pair
+        precision = PrecisionEngine.load(config, [p['currency_pair'] for p in self.settings['pairs']])
+        for index, pair_config in enumerate(self.settings['pairs']):
+            tab_config = copy.deepcopy(config)
+            tab_config['trading']['currency_pair'] = pair_config['currency_pair']
+            tab_config['trading']['url'] = pair_config['url']
+
+            if index > 0:
+                driver.switch_to.new_window('tab')
+            driver.get(pair_config['url'])
+            waiter.page_ready(waits.get('page_load_timeout', 30))
+            inject_lean_css(driver, config)
+
+            tab = TabTrader(driver, tab_config, driver.current_window_handle,
+                            precision.get(pair_config['currency_pair']))
+            tab.install_observer()
+            self.tabs.append(tab)
+            self.active_handle = tab.handle
+            self.logger.info(f"Opened tab for {tab.pair}")
+
+    @property
+    def phase(self):
+        """Phase of the tab being stepped, so profiler samples can be split by phase like TradingCore's."""
+        tab = self.stepping
+        return tab.phase if tab else MONITORING
+
+    def _activate(self, tab):
+        if self.active_handle != tab.handle:
+            self.driver.switch_to.window(tab.handle)
+            self.active_handle = tab.handle
+
+    def run(self):
+        pairs = [tab.pair for tab in self.tabs]
+        poll_interval = self.settings.get('poll_interval', 0.1)
+        settle_seconds = self.settings.get('settle_seconds', 2)
+        stale_seconds = self.settings.get('stale_seconds', 120)
+
+        while True:
+            try:
+                # One call from whichever tab is active reads every tab's feed
+                feeds = self.driver.execute_script(POLL_SCRIPT, pairs)
+                now = time.time()
+                for tab in self.tabs:
+                    tab.update_feed(feeds.get(tab.pair))
+                    work = tab.has_work(now, settle_seconds, stale_seconds)
+                    if not work:
+                        continue
+                    self._activate(tab)
+                    self.stepping = tab
+                    try:
+                        tab.step(work)
+                    finally:
+                        self.stepping = None
+                time.sleep(poll_interval)
+            except KeyboardInterrupt:
+                self.logger.info("Stopped by user")
+                break
+            except Exception as e:
+                self.logger.error(f"Scheduler error: {str(e)}")
+                time.sleep(1)
@@ -0,0 +1,104 @@
+from selenium.common.exceptions import WebDriverException
+
+# Read every order-form field, the slider position and the active tab in
+# one round trip. arguments[0] maps a field name to its CSS selector.
+SNAPSHOT_SCRIPT = """
+var selectors = arguments[0], out = {fields: {}, missing: []};
+for (var name in selectors) {
+  var el = selectors[name] ? document.querySelector(selectors[name]) : null;
+  if (!el) { if (selectors[name]) out.missing.push(name); continue; }
+  out.fields[name] = el.value !== undefined ? el.value : null;
+}
+var slider = arguments[1] ? document.querySelector(arguments[1]) : null;
+out.slider = slider ? (slider.getAttribute('aria-valuenow') || slider.getAttribute('value')) : null;
+var tab = arguments[2] ? document.querySelector(arguments[2]) : null;
+tab = tab ? (tab.closest('[role="tab"]') || tab) : null;
+out.conditional_tab_selected = tab ? tab.getAttribute('aria-selected') === 'true' : null;
+return out;
+"""
+
+# Set several React/Mantine-controlled inputs in one round trip. Assigning
+# .value directly is swallowed by React's value tracker, so go through the
+# native setter and fire input/change like real typing would.
+WRITE_SCRIPT = """
+var values = arguments[0], out = {fields: {}, missing: []};
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+for (var selector in values) {
+  var el = document.querySelector(selector);
+  if (!el) { out.missing.push(selector); continue; }
+  el.focus();
+  setter.call(el, values[selector]);
+  el.dispatchEvent(new Event('input', {bubbles: true}));
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+  el.blur();
+  out.fields[selector] = el.value;
+}
+return out;
+"""
+
+class OrderForm:
+    """
+    Snapshot and fill the conditional order form with one execute_script
+    each, instead of a lookup plus get_attribute/clear/send_keys per field.
+    """
+
+    def __init__(self, driver, config):
+        self.driver = driver
+        self.config = config
+
+    def _selectors(self, order_type):
+        return self.config['trading'][order_type]['selectors']
+
+    def snapshot(self, order_type):
+        """
+        Return {'fields': {'trigger': .., 'limit': ..},
+        'missing': [...], 'slider': .., 'conditional_tab_selected': ..}.
+        """
+        selectors = self._selectors(order_type)
+        fields = {
+            'trigger': selectors['trigger_price_field'],
+            'limit': selectors['limit_price_field'],
+        }
+        return self.driver.execute_script(
+            SNAPSHOT_SCRIPT, fields, selectors.get('amount_slider'), selectors.get('conditional_tab')
+        )
+
+    def write(self, order_type, trigger=None, limit=None):
+        """
+        Set trigger and limit (None leaves a field alone, '' clears it) in
+        one call. Raises if a field is missing or React rejected the
+        value.
+        """
+        selectors = self._selectors(order_type)
+        values = {}
+        for key, value in (('trigger_price_field', trigger), ('limit_price_field', limit)):
+            if value is not None and selectors.get(key):
+                values[selectors[key]] = str(value)
+
+        result = self.driver.execute_script(WRITE_SCRIPT, values)
+        if result['missing']:
+            raise WebDriverException(f"Order form fields not found: {result['missing']}")
+        rejected = {
+            sel: got for sel, got in result['fields'].items()
+            if not self._same_value(got, values[sel])
+        }
+        if rejected:
+            raise WebDriverException(f"Order form did not accept values: {rejected}")
+        return result['fields']
+
+    @staticmethod
+    def _same_value(got, expected):
+        # Number inputs may normalise "0.10" to "0.1"
+        if got == expected:
+            return True
+        try:
+            return float(got) == float(expected)
+        except (TypeError, ValueError):
+            return False
+
+    def clear(self, order_type):
+        """Clear trigger and limit; a no-op round trip is skipped when already empty."""
+        snapshot = self.snapshot(order_type)
+        if any((snapshot['fields'].get(name) or '').strip() for name in ('trigger', 'limit')):
+            self.write(order_type, trigger='', limit='')
+        return snapshot
@@ -1,9 +1,6 @@
-import time
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from dom_wait import DomWaiter
 
 # Geckodriver setup instructions for Ubuntu:
 # 1. Download latest geckodriver from https://github.com/mozilla/geckodriver/releases
@@ -25,67 +22,53 @@ def main():
     try:
         # Navigate to URL and wait
         driver.get("http://www.url.com")
-        time.sleep(30)  # Wait for page to load
+        wait = DomWaiter(driver, default_timeout=20)
+        wait.page_ready(30)  # Wait for page to load
         
         # Click first element
-        WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, "div.sc-3acc2a25-0:nth-child(1)")
-        )).click()
+        wait.clickable("div.sc-3acc2a25-0:nth-child(1)").click()
         
         # Click tab element
-        WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, "#mantine-r58-tab-stopByConditional > div:nth-child(1) > span:nth-child(1)")
-        )).click()
+        wait.clickable("#mantine-r58-tab-stopByConditional > div:nth-child(1) > span:nth-child(1)").click()
         
         # Enter 2000 in input field
-        input_field = WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, ".tr-m-0 > div:nth-child(2) > input:nth-child(1)")
-        ))
+        input_field = wait.clickable(".tr-m-0 > div:nth-child(2) > input:nth-child(1)")
         input_field.clear()
         input_field.send_keys("2000")
         
         # Click dropdown
-        WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, "div.fw-500")
-        )).click()
+        wait.clickable("div.fw-500").click()
         
         # Select dropdown item
-        WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, ".mantine-1ufzw1b > span:nth-child(1)")
-        )).click()
+        wait.clickable(".mantine-1ufzw1b > span:nth-child(1)").click()
         
         # Enter 1000 in second input field
-        second_input = WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, "div.row-container:nth-child(3) > div:nth-child(1) > div:nth-child(2) > input:nth-child(1)")
-        ))
+        second_input = wait.clickable("div.row-container:nth-child(3) > div:nth-child(1) > div:nth-child(2) > input:nth-child(1)")
         second_input.clear()
         second_input.send_keys("1000")
         
         # Adjust slider using JavaScript
-        slider = WebDriverWait(driver, 20).until(EC.presence_of_element_located(
-            (By.CSS_SELECTOR, ".mantine-GateSlider-thumb")
-        ))
+        slider = wait.present(".mantine-GateSlider-thumb")
         driver.execute_script(
             "arguments[0].setAttribute('value', '100');", slider
         )
         
         # Click final button
-        WebDriverWait(driver, 20).until(EC.element_to_be_clickable(
-            (By.CSS_SELECTOR, ".mantine-cwyisp")
-        )).click()
+        wait.clickable(".mantine-cwyisp").click()
         
         # Check for popup and handle if present
         try:
-            popup_button = WebDriverWait(driver, 3).until(EC.element_to_be_clickable(
-                (By.CSS_SELECTOR, "button.mantine-132odz5:nth-child(2) > div:nth-child(1)")
-            ))
+            popup_button = wait.clickable("button.mantine-132odz5:nth-child(2) > div:nth-child(1)", timeout=3)
             popup_button.click()
             print("Popup detected and closed")
         except:
             print("No popup detected")
         
-        # Add final delay to observe results
-        time.sleep(5)
+        # Wait for the popup to close (order submitted) instead of a fixed delay
+        try:
+            wait.absent("button.mantine-132odz5:nth-child(2) > div:nth-child(1)", timeout=5)
+        except Exception:
+            print("Popup still open")
         
     finally:
         driver.quit()
@@ -1,12 +1,22 @@
+import os
+import sys
 import time
 import json
 import threading
 import logging
 import websocket
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from gateio_api import GateIOAPIClient
+from dom_wait import DomWaiter
+from order_form import OrderForm
+from browser import inject_lean_css
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from precision import PrecisionEngine  # noqa: E402  (shared with the API bot in test/)
+from reconcile import Reconciler, DesyncError, TRANSIENT, STALE_ELEMENT, REJECTED, DESYNC  # noqa: E402
+from config_model import BotConfig  # noqa: E402
+from control import RateMeter, Histogram  # noqa: E402
+from profiler import phase, MONITORING, PLACING, CANCELLING, RECOVERING  # noqa: E402
+from price_snapshot import LatestPrice, StalePriceError  # noqa: E402
 
 ############################################
 # WebSocket Client for Real-Time Price Feed
@@ -28,6 +38,8 @@ class GateIOWebSocketClient:
         self.ws_url = "wss://ws.gate.io/v4"  # Updated URL
         self.ws = None
         self.thread = None
+        self.connected = False
+        self.connects = 0
         # Add thread lock
         self.price_lock = threading.Lock()
         self.logger = logging.getLogger("GateIOWebSocketClient")
@@ -46,7 +58,7 @@ class GateIOWebSocketClient:
                 last_price = float(result['last'])
                 with self.price_lock:
                     self.current_price = last_price
-                    self.on_price_callback(last_price)
+                    self.on_price_callback(last_price, data.get('time_ms'))
             except (ValueError, KeyError) as e:
                 self.logger.error(f"Price parse error: {e}")
             
@@ -57,9 +69,16 @@ class GateIOWebSocketClient:
         print("WebSocket Error:", error)
 
     def on_close(self, ws, close_status_code, close_msg):
+        self.connected = False
         print("WebSocket closed:", close_status_code, close_msg)
 
+    @property
+    def reconnects(self):
+        return max(self.connects - 1, 0)
+
     def on_open(self, ws):
+        self.connected = True
+        self.connects += 1
         # Add required protocol headers
         sub_msg = {
             "time": int(time.time()),
@@ -97,7 +116,7 @@ class GateIOWebSocketClient:
                     print(f"Reconnecting: {e}")
                     time.sleep(1)
     
-        self.thread = threading.Thread(target=run_forever)
+        self.thread = threading.Thread(target=run_forever, name="websocket")
         self.thread.start()
 ############################################
 # Trading Bot with WebSocket Price Updates
@@ -111,13 +130,45 @@ class OrderState:
         self.order_id = None
 
 class TradingCore:
-    def __init__(self, driver, config):
+    def __init__(self, driver, config, browser_pool=None, settings=None):
         self.driver = driver
         self.config = config
+        # Validated view of config for the hot paths; swapped whole on reload
+        self.settings = settings or BotConfig(config)
+        # Held for one loop iteration; a config reload waits for it
+        self.decision_lock = threading.Lock()
+        self.browser_pool = browser_pool  # Optional BrowserPool of warm standby sessions
+        self.waits = config['browser'].get('waits') or {}
+        self.waiter = DomWaiter(driver, self.waits.get('element_timeout', 10))
+        self.form = OrderForm(driver, config)
+        pair = config['trading']['currency_pair']
+        self.price_rules = PrecisionEngine.load(config, [pair]).get(pair)
         self.api = GateIOAPIClient(config)
         self.state = OrderState()
         self.logger = logging.getLogger("TradingCore")
-        self.current_price = None  # Updated via WebSocket
+        self.prices = LatestPrice()  # PriceSnapshot per WebSocket tick; current_price reads it
+        self.phase = MONITORING  # tags profiler samples (profiler.py)
+
+        # Read by the control endpoint (control.py) on its own thread
+        self.ticks = RateMeter()
+        self.decision_latency = Histogram()
+        self.price_age = Histogram()  # age of the price each decision used
+        self.order_events = {'placed': 0, 'replaced': 0, 'filled': 0, 'failed': 0}
+        # Commands from the control endpoint, checked between decisions
+        self.paused = threading.Event()
+        self.stopping = threading.Event()
+
+        # Cheapest repair per error class; the page refresh only as a last resort
+        self.reconciler = Reconciler(
+            {
+                TRANSIENT: self._retry_later,
+                STALE_ELEMENT: self._reresolve_form,
+                REJECTED: self._discard_form,
+                DESYNC: self._recount_orders,
+            },
+            self._recover_state,
+            config['trading'].get('reconcile_max_attempts', 3)
+        )
 
         # Start the WebSocket client to receive live price updates.
         self.ws_client = GateIOWebSocketClient(
@@ -125,7 +176,10 @@ class TradingCore:
             self.update_price
         )
         self.ws_client.start()
-        self.current_price = self._fetch_initial_price()
+        initial_price = self._fetch_initial_price()
+        if self.prices.snapshot is None:  # a WS tick that arrived meanwhile is newer
+            self.prices.publish(initial_price)
+        self.failed_order_type = None  # form left half-filled by the last failed UI order
         
     def _fetch_initial_price(self):
         """Get initial price via REST API before WS connects"""
@@ -141,46 +195,104 @@ class TradingCore:
             self.logger.critical(f"Initial price fetch failed: {str(e)}")
             raise SystemExit(1)
 
-    def update_price(self, price):
+    @property
+    def current_price(self):
+        return self.prices.price
+
+    @current_price.setter
+    def current_price(self, price):
+        # TabTrader feeds prices by assignment
+        if price is None:
+            self.prices.clear()
+        else:
+            self.prices.publish(price)
+
+    def update_price(self, price, exchange_ms=None):
         """
         Callback function invoked by the WebSocket client.
-        Updates the current market price.
+        Publishes the tick as the current PriceSnapshot.
         """
-        self.current_price = price
+        self.prices.publish(price, exchange_ms)
+        self.ticks.mark()
+
+    def apply_settings(self, settings):
+        """
+        Hot reload between loop iterations: multipliers, selectors,
+        slider_percentage and trade_limit change; the browser session,
+        page and WebSocket stay up.
+        """
+        restart = self.settings.restart_required(settings)
+        if restart:
+            self.logger.error(f"Config reload refused, these settings need a restart: {', '.join(restart)}")
+            return False
+        with self.decision_lock:
+            self.settings = settings
+            self.config = settings.raw
+            self.form.config = settings.raw
+        self.logger.info("Settings reloaded")
+        return True
+
+    ########################################
+    # Control endpoint (control.py)
+    ########################################
+
+    def pause(self):
+        """Stop deciding; the resting order is left as it is."""
+        self.paused.set()
+
+    def resume(self):
+        self.paused.clear()
+
+    def stop(self):
+        """Leave manage_orders after the current decision."""
+        self.stopping.set()
+        self.paused.clear()
+
+    def metrics(self):
+        """[(name, type, help, samples)] for control.render; runs on the control thread."""
+        metrics = [
+            ('trading_ticks_total', 'counter', 'WebSocket price ticks received', self.ticks.count),
+            ('trading_tick_rate', 'gauge', 'Price ticks per second', round(self.ticks.rate(), 3)),
+            ('trading_decision_seconds', 'histogram', 'Duration of one order decision', self.decision_latency),
+            ('trading_orders_total', 'counter', 'Order churn by event',
+             [({'event': event}, count) for event, count in self.order_events.items()]),
+            ('trading_errors_total', 'counter', 'Loop errors by class (reconcile.py)',
+             [({'kind': kind}, count) for kind, count in self.reconciler.stats.items()]),
+            ('trading_order_active', 'gauge', 'Whether an order is resting', int(self.state.active)),
+            ('trading_paused', 'gauge', 'Whether decisions are paused', int(self.paused.is_set())),
+            ('trading_ws_connected', 'gauge', 'Whether the WebSocket is connected', int(self.ws_client.connected)),
+            ('trading_ws_reconnects_total', 'counter', 'WebSocket reconnects', self.ws_client.reconnects),
+            ('trading_price_checks_total', 'counter',
+             'Price reads for decisions: fresh, waited for a fresh one, refused as stale',
+             [({'result': result}, count) for result, count in self.prices.checks.items()]),
+            ('trading_price_age_seconds', 'histogram', 'Age of the price each decision used', self.price_age),
+        ]
+        snapshot = self.prices.snapshot
+        if snapshot is not None:
+            metrics.append(('trading_price_staleness_seconds', 'gauge', 'Age of the latest tick',
+                            round(snapshot.age(), 3)))
+        return metrics
 
     def _calculate_prices(self, last_price, order_type):
         """
         Calculates trigger and limit prices based on order type.
         For buys, adds the percentages; for sells, subtracts them.
         """
-        if order_type == 'buy':
-            trigger = last_price * (1 + self.config['trading'][order_type]['trigger_price_adjust'] / 100)
-            limit = last_price * (1 + self.config['trading'][order_type]['limit_price_adjust'] / 100)
-        elif order_type == 'sell':
-            trigger = last_price * (1 - self.config['trading'][order_type]['trigger_price_adjust'] / 100)
-            limit = last_price * (1 - self.config['trading'][order_type]['limit_price_adjust'] / 100)
-        return trigger, limit
+        return self.settings.trading.side(order_type).prices(last_price)
 
     def _select_conditional_tab(self, order_type):
-        conditional_tab_selector = self.config['trading'][order_type]['selectors']['conditional_tab']
-        self._click_element(conditional_tab_selector)
+        self._click_element(self.settings.trading.side(order_type).selectors['conditional_tab'])
 
     def _select_dropdown_option(self, order_type):
-        dropdown_selector = self.config['trading'][order_type]['selectors']['condition_dropdown']
-        self._click_element(dropdown_selector)
-        if order_type == 'buy':
-            option_selector = self.config['trading'][order_type]['selectors']['greater_equal_option']
-        else:
-            option_selector = self.config['trading'][order_type]['selectors']['less_equal_option']
-        self._click_element(option_selector)
+        side = self.settings.trading.side(order_type)
+        self._click_element(side.selectors['condition_dropdown'])
+        # >= for buys, <= for sells
+        self._click_element(side.condition_option)
 
     def _adjust_slider_to_full(self, order_type):
-        slider_selector = self.config['trading'][order_type]['selectors']['amount_slider']
-        slider = WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, slider_selector))
-        )
+        slider = self.waiter.clickable(self.settings.trading.side(order_type).selectors['amount_slider'])
         # Get the slider percentage from the config file
-        slider_percentage = self.config["trading"]["slider_percentage"]
+        slider_percentage = self.settings.trading.slider_percentage
         # Update the slider value using the configured percentage
         self.driver.execute_script(
             "arguments[0].setAttribute('value', arguments[1]);", slider, slider_percentage
@@ -188,77 +300,42 @@ class TradingCore:
 
     def _handle_confirmation_popup(self):
         try:
-            confirm_selector = self.config['selectors']['confirm_popup_button']
-            popup_button = WebDriverWait(self.driver, 0.1).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, confirm_selector))
+            confirm_selector = self.settings.selectors['confirm_popup_button']
+            popup_button = self.waiter.clickable(
+                confirm_selector, self.waits.get('popup_timeout', 0.5)
             )
             popup_button.click()
         except Exception:
             pass
 
-    def verify_and_clear_input_fields(self, order_type):
-        """
-        Verifies and clears both the trigger and limit price input fields.
-        CSS selectors are defined in config.yaml under:
-          trading.[order_type].selectors.trigger_price_field
-          trading.[order_type].selectors.limit_price_field
-        """
-        trigger_selector = self.config['trading'][order_type]['selectors']['trigger_price_field']
-        limit_selector = self.config['trading'][order_type]['selectors']['limit_price_field']
-        
-        trigger_element = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, trigger_selector))
-        )
-        if trigger_element.get_attribute("value").strip() != "":
-            trigger_element.clear()
-        
-        limit_element = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, limit_selector))
-        )
-        if limit_element.get_attribute("value").strip() != "":
-            limit_element.clear()
-
     def _format_price(self, price):
-        """Format price to configured precision."""
-        precision = self.config['trading']['price_precision']
-    
-        # Add this block -------------------------------------------------
-        # Convert to string to analyze decimal precision
-        price_str = f"{price:.20f}".rstrip('0').rstrip('.')  # Handle float imprecision
-    
-        if '.' in price_str:
-            integer_part, decimal_part = price_str.split('.')
-            decimal_places = len(decimal_part)
-        
-            if decimal_places > precision:
-                self.logger.warning(
-                    f"Price {price_str} exceeds configured precision "
-                    f"({decimal_places} > {precision}). Truncating."
-                )
-        # End of new code ------------------------------------------------
-    
-        formatted_price = round(price, precision)
-        self.logger.debug(f"Formatted {price} → {formatted_price}")
-        return formatted_price
+        """Quantize price to the pair's tick size; returns the string typed into the form."""
+        return self.price_rules.price_str(price)
     
-    def _input_value(self, selector, value):
+    def _fill_order_form(self, order_type, trigger_price, limit_price):
         """
-        Waits for an input field (by selector) and enters the given value.
+        Verify, clear and fill the form in the page's own order: trigger
+        price, condition dropdown, limit price. One snapshot, then one
+        write per field (setting a value replaces the old one). Writing
+        both prices in a single call would save a round trip, but the
+        condition has to be picked between them, so that goal is dropped.
         """
-        element = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-        ) 
-        # Clear existing value
-        element.clear()
-    
-        # Format value before input
-        formatted_value = str(self._format_price(value))
-        element.send_keys(formatted_value)
+        snapshot = self.form.snapshot(order_type)
+        trigger_field = self.settings.trading.side(order_type).selectors['trigger_price_field']
+        if not snapshot['conditional_tab_selected']:
+            self._select_conditional_tab(order_type)
+            self.waiter.present(trigger_field)
+        elif snapshot['missing']:
+            self.waiter.present(trigger_field)
+        self.logger.debug("Order form before fill: %s", snapshot['fields'])
+
+        self.form.write(order_type, trigger=self._format_price(trigger_price))
+        # Same order as a user fills it; the form is not known to tolerate another
+        self._select_dropdown_option(order_type)
+        self.form.write(order_type, limit=self._format_price(limit_price))
 
     def _click_element(self, selector):
-        element = WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-        )
+        element = self.waiter.clickable(selector)
         element.click()
 
     def _place_ui_order(self, order_type, trigger_price, limit_price):
@@ -267,30 +344,22 @@ class TradingCore:
         """
         
         try:
-            btn_selector = self.config['trading'][order_type]['selectors']['button']
-            self._click_element(btn_selector)
-
-            self._select_conditional_tab(order_type)
-
-            self.verify_and_clear_input_fields(order_type)
+            selectors = self.settings.trading.side(order_type).selectors
+            self._click_element(selectors['button'])
 
-            trigger_selector = self.config['trading'][order_type]['selectors']['trigger_price_field']
-            self._input_value(trigger_selector, str(trigger_price))
-
-            self._select_dropdown_option(order_type)
-
-            limit_selector = self.config['trading'][order_type]['selectors']['limit_price_field']
-            self._input_value(limit_selector, str(limit_price))
+            self._fill_order_form(order_type, trigger_price, limit_price)
 
             self._adjust_slider_to_full(order_type)
 
-            submit_selector = self.config['trading'][order_type]['selectors']['place_order_button']
-            self._click_element(submit_selector)
+            self._click_element(selectors['place_order_button'])
 
             self._handle_confirmation_popup()
             return True
         except Exception as e:
             self.logger.error(f"UI Order failed: {str(e)}")
+            self.failed_order_type = order_type
+            with phase(self, RECOVERING):
+                self.reconciler.handle(e)
             return False
             
 
@@ -304,6 +373,9 @@ class TradingCore:
             self.state.active = True
             self.state.order_type = order_type
             self.state.last_price = last_price
+            self.order_events['placed'] += 1
+        else:
+            self.order_events['failed'] += 1
 
     def _monitor_active_order(self, order):
         """Monitor and manage existing order based on real-time price fluctuations."""
@@ -312,60 +384,112 @@ class TradingCore:
         # Add this block for immediate price reaction
         if self.state.order_type == 'buy' and current_price < self.state.last_price:
             self.logger.info("Price dropped below last price, cancelling buy order")
-            self._cancel_and_replace(order)
+            with phase(self, CANCELLING):
+                self._cancel_and_replace(order)
             return
         elif self.state.order_type == 'sell' and current_price > self.state.last_price:
             self.logger.info("Price rose above last price, cancelling sell order")
-            self._cancel_and_replace(order)
+            with phase(self, CANCELLING):
+                self._cancel_and_replace(order)
             return
 
     def _cancel_and_replace(self, order):
         """Cancel existing order and place new one with updated prices."""
+        # Read first: a stale price skips the decision instead of leaving the order cancelled
+        new_price = self._get_market_price()
         try:
             # Cancel existing order
             if self.api.cancel_order(order['id']):
                 self.state.active = False
             
-                # Get updated market price
-                new_price = self._get_market_price()
-            
                 # Place new order with updated prices
                 trigger, limit = self._calculate_prices(new_price, self.state.order_type)
-                self._place_ui_order(self.state.order_type, trigger, limit)
-            
-                # Update state with new price
-                self.state.last_price = new_price
-                self.state.active = True
+                if self._place_ui_order(self.state.order_type, trigger, limit):
+                    # Update state with new price
+                    self.state.last_price = new_price
+                    self.state.active = True
+                    self.order_events['replaced'] += 1
+                else:
+                    self.order_events['failed'] += 1
         except Exception as e:
             self.logger.error(f"Failed to cancel and replace order: {str(e)}")
-            self._recover_state()
+            with phase(self, RECOVERING):
+                self.reconciler.handle(e)
         
     def _handle_order_execution(self):
         self.logger.info("Order executed successfully")
         self.state.active = False
+        self.order_events['filled'] += 1
         self.state.order_type = 'sell' if self.state.order_type == 'buy' else 'buy'
 
     def _get_market_price(self):
         """
         Returns the most recent price received via the WebSocket.
-        Waits briefly if no price has been received yet.
+        Waits up to 5 s for one within trading.price_staleness_budget, else
+        raises StalePriceError.
         """
-        start_time = time.time()
-        while self.current_price is None:
-            if time.time() - start_time > 5:
-                self.logger.error("No price update received from websocket within 5 seconds.")
-                break
-            time.sleep(0.01)
-        return self.current_price
+        snapshot = self.prices.fresh(self.settings.trading.price_staleness_budget)
+        self.price_age.observe(snapshot.age())
+        return snapshot.price
+
+    ########################################
+    # Targeted repairs (see reconcile.py)
+    ########################################
+
+    def _retry_later(self, exc, attempt):
+        """Transient: back off and let the next loop retry."""
+        time.sleep(min(0.5 * 2 ** (attempt - 1), 4))
+        return True
+
+    def _reresolve_form(self, exc, attempt):
+        """
+        Stale element: the page re-rendered under us. Every step looks its
+        selectors up afresh, so once the DOM settles the next loop re-resolves
+        them; only the half-filled form needs clearing.
+        """
+        self.waiter.page_ready(self.waits.get('element_timeout', 10))
+        return self._discard_form(exc, attempt)
+
+    def _discard_form(self, exc, attempt):
+        """Rejected: nothing was placed; clear the form so the retry starts clean."""
+        order_type = self.failed_order_type
+        self.failed_order_type = None
+        if order_type:
+            self.form.clear(order_type)
+        return True
+
+    def _recount_orders(self, exc, attempt):
+        """Desync: keep one order, cancel the extras, and take the order table as the truth."""
+        orders = getattr(exc, 'orders', [])
+        for order in orders[1:]:
+            self.logger.warning(f"Cancelling extra order {order['id']}")
+            self.api.cancel_order(order['id'])
+        if not orders:
+            rows = self.driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length;",
+                self.config['selectors']['stop_limit_orders']
+            )
+            orders = [None] * rows
+        self.state.active = bool(orders)
+        return True
 
     def _recover_state(self):
         self.logger.info("Attempting state recovery...")
         self.api.cancel_all_orders(self.config['trading']['currency_pair'])
         self.state = OrderState()
+        if self.browser_pool:
+            warm_driver = self.browser_pool.swap(self.driver)
+            if warm_driver:
+                self.driver = warm_driver
+                self.waiter = DomWaiter(warm_driver, self.waiter.default_timeout)
+                self.form = OrderForm(warm_driver, self.config)
+                self.logger.info("Swapped to warm standby browser session")
+                return
+            self.logger.warning("No standby browser session ready, reloading page")
         self.driver.refresh()
-        WebDriverWait(self.driver, 30).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        self.waiter.page_ready(self.waits.get('page_load_timeout', 30))
+        # Firefox has no per-document registration (lean_profile.py); re-apply after the reload
+        inject_lean_css(self.driver, self.config)
 
 
     def manage_orders(self):
@@ -374,26 +498,45 @@ class TradingCore:
         If 'trade_limit' is defined in config.yaml, the loop will exit after that many iterations.
         """
         trade_count = 0
-        max_trades = self.config['trading'].get('trade_limit', None)
         while True:
+            if self.stopping.is_set():
+                self.logger.info("Stop requested. Exiting trading loop.")
+                break
+            if self.paused.is_set():
+                time.sleep(self.settings.trading.price_poll_interval)
+                continue
+            max_trades = self.settings.trading.trade_limit
             if max_trades is not None and trade_count >= max_trades:
                 self.logger.info("Trade limit reached. Exiting trading loop.")
                 break
+            errors = self.reconciler.errors
             try:
-                open_orders = self.api.get_open_orders()
-                if not open_orders:
-                    if not self.state.active:
-                        self._place_new_order()
+                started = time.perf_counter()
+                with self.decision_lock:
+                    open_orders = self.api.get_open_orders()
+                    if not open_orders:
+                        if not self.state.active:
+                            with phase(self, PLACING):
+                                self._place_new_order()
+                        else:
+                            self._handle_order_execution()
+                    elif len(open_orders) > 1:
+                        raise DesyncError(f"{len(open_orders)} open orders for one leg", open_orders)
                     else:
-                        self._handle_order_execution()
-                else:
-                    self._monitor_active_order(open_orders[0])
+                        self._monitor_active_order(open_orders[0])
+                self.decision_latency.observe(time.perf_counter() - started)
+                if self.reconciler.errors == errors:
+                    self.reconciler.clear()
                 trade_count += 1
                 # A short delay if needed (the WS provides continuous updates)
-                time.sleep(0.1)
+                time.sleep(self.settings.trading.price_poll_interval)
             except KeyboardInterrupt:
                 self.logger.info("Stopped by user")
                 break
+            except StalePriceError as e:
+                # Nothing was sent; decide again once the feed is back rather than escalating
+                self.logger.warning(f"Skipping decision on a stale price: {e}")
             except Exception as e:
                 self.logger.error(f"Error: {str(e)}")
-                self._recover_state() 
+                with self.decision_lock, phase(self, RECOVERING):
+                    self.reconciler.handle(e)
@@ -1,20 +1,32 @@
-import yaml
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException
 import logging
 import locale
+from lean_profile import inject_lean_css
 
 class TradingBot:
-    def __init__(self, driver):
+    def __init__(self, driver, settings):
+        """
+        :param settings: BotConfig loaded once by main.load_config; the raw
+                         dict stays available as self.config
+        """
         self.driver = driver
-        self.config = self.load_config()
+        self.settings = settings
+        self.config = settings.raw
         self.setup_logging()
 
-    def load_config(self):
-        with open('config.yaml', 'r') as file:
-            return yaml.safe_load(file)
+    def apply_settings(self, settings):
+        """Hot reload: swap in a validated config between orders; the browser session stays."""
+        restart = self.settings.restart_required(settings)
+        if restart:
+            logging.error(f"Config reload refused, these settings need a restart: {', '.join(restart)}")
+            return False
+        self.settings = settings
+        self.config = settings.raw
+        logging.info("Settings reloaded")
+        return True
 
     def setup_logging(self):
         logging.basicConfig(
@@ -24,9 +36,9 @@ class TradingBot:
         )
 
     def find_element(self, selector):
-        return WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-        )
+        """:param selector: CSS selector string, or a (By, value) locator from BotConfig"""
+        locator = selector if isinstance(selector, tuple) else (By.CSS_SELECTOR, selector)
+        return WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(locator))
 
     def click_element(self, selector):
         element = self.find_element(selector)
@@ -39,26 +51,17 @@ class TradingBot:
 
     def get_current_price(self):
         locale.setlocale(locale.LC_ALL, '')
-        price_element = self.find_element(self.config['selectors']['price'])
+        price_element = self.find_element(self.settings.selectors.locator('price'))
         return locale.atof(price_element.text)
 
     def calculate_prices(self, current_price, is_buy=True):
-        action = 'buy' if is_buy else 'sell'
-        trigger_adjust = self.config['trading'][action]['trigger_price_adjust']
-        limit_adjust = self.config['trading'][action]['limit_price_adjust']
-        
-        if is_buy:
-            trigger_price = current_price * (1 + trigger_adjust/100)
-            limit_price = current_price * (1 + limit_adjust/100)
-        else:
-            trigger_price = current_price * (1 - trigger_adjust/100)
-            limit_price = current_price * (1 - limit_adjust/100)
-            
+        side = self.settings.trading.buy if is_buy else self.settings.trading.sell
+        trigger_price, limit_price = side.prices(current_price)
         return round(trigger_price, 2), round(limit_price, 2)
 
     def place_buy_order(self, current_price):
         try:
-            selectors = self.config['trading']['buy']['selectors']
+            selectors = self.settings.trading.buy.selectors.locators
             trigger_price, limit_price = self.calculate_prices(current_price, is_buy=True)
 
             # Click buy button
@@ -84,7 +87,7 @@ class TradingBot:
             self.click_element(selectors['place_order_button'])
             
             # Confirm order
-            self.click_element(self.config['selectors']['confirm_popup_button'])
+            self.click_element(self.settings.selectors.locator('confirm_popup_button'))
             
             logging.info(f"Buy order placed - Trigger: {trigger_price}, Limit: {limit_price}")
             return True
@@ -95,7 +98,7 @@ class TradingBot:
 
     def place_sell_order(self, current_price):
         try:
-            selectors = self.config['trading']['sell']['selectors']
+            selectors = self.settings.trading.sell.selectors.locators
             trigger_price, limit_price = self.calculate_prices(current_price, is_buy=False)
 
             # Click sell button
@@ -121,7 +124,7 @@ class TradingBot:
             self.click_element(selectors['place_order_button'])
             
             # Confirm order
-            self.click_element(self.config['selectors']['confirm_popup_button'])
+            self.click_element(self.settings.selectors.locator('confirm_popup_button'))
             
             logging.info(f"Sell order placed - Trigger: {trigger_price}, Limit: {limit_price}")
             return True
@@ -132,11 +135,11 @@ class TradingBot:
 
     def cancel_all_orders(self):
         try:
-            orders = self.driver.find_elements(By.CSS_SELECTOR, self.config['selectors']['stop_limit_orders'])
+            orders = self.driver.find_elements(*self.settings.selectors.locator('stop_limit_orders'))
             for order in orders:
-                cancel_button = order.find_element(By.CSS_SELECTOR, self.config['selectors']['cancel_order_button'])
+                cancel_button = order.find_element(*self.settings.selectors.locator('cancel_order_button'))
                 cancel_button.click()
-                self.click_element(self.config['selectors']['confirm_popup_button'])
+                self.click_element(self.settings.selectors.locator('confirm_popup_button'))
             logging.info("All orders cancelled successfully")
             return True
         except WebDriverException as e:
@@ -148,9 +151,11 @@ class TradingBot:
             self.driver.get(self.config['trading']['url'])
             # Wait 30 seconds for page to fully load
             WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.config['selectors']['price']))
+                EC.presence_of_element_located(self.settings.selectors.locator('price'))
             )
             logging.info("Page fully loaded after initial wait")
+            # Chromium already has it on every document; Firefox needs it per page
+            inject_lean_css(self.driver, self.config)
             
             loops = 0
             max_loops = self.config['trading']['max_loops']